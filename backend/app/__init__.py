@@ -2,15 +2,21 @@ from flask import Flask
 from flask_restful import Api, Resource
 from .config import Config
 from .routes.groups import GroupsAPI
-from .routes.analysis import AnalysisAPI  
+from .routes.analysis import AnalysisAPI, AnalysisDataAPI
 from .routes.students import StudentsAPI
+from .routes.roster import RosterBulkAPI
 from flask_cors import CORS
 from .routes.repositories_groups import GroupRepositoriesAPI
 from .routes.repositories_students import StudentRepositoriesAPI
 from .utils.dir_manager import DirManager
 from .utils.json_to_db import JSONToDB
-from .routes.stats import StatsAPI
+from .routes.stats import StatsAPI, StatsPlanAPI
 from .routes.audit import AuditAPI
+from .routes.cache import CacheStatsAPI
+from .routes.metrics import MetricsAPI
+from .routes.git_report import GitReportAPI
+from .routes.group_stats import GroupStatsAPI
+from .utils.instrumentation import init_instrumentation
 import logging
 import sys
 
@@ -35,15 +41,25 @@ def create_app():
             stream_handler.setFormatter(formatter)
             app.logger.addHandler(stream_handler)
 
+    # Mesure du temps par requête (en-tête Server-Timing + log structuré)
+    init_instrumentation(app)
+
     # Ajout des routes API
     api.add_resource(GroupsAPI, '/api/groups', '/api/groups/<int:gr_id>')
     api.add_resource(StudentsAPI, '/api/students', '/api/students/<int:st_id>')
+    api.add_resource(RosterBulkAPI, '/api/roster/bulk', '/api/students/bulk', '/api/groups/bulk')
     api.add_resource(AnalysisAPI, '/api/analyze')
+    api.add_resource(AnalysisDataAPI, '/api/analysis/<int:analysis_id>/data')
     api.add_resource(DirManager, '/api/clone')
     api.add_resource(StatsAPI, '/api/stats')
+    api.add_resource(StatsPlanAPI, '/api/stats/plan')
     api.add_resource(GroupRepositoriesAPI, '/api/groups/<int:group_id>/repositories')
     api.add_resource(StudentRepositoriesAPI, '/api/students/<int:student_id>/repositories')
     api.add_resource(AuditAPI, '/api/audit')
+    api.add_resource(CacheStatsAPI, '/api/cache/stats')
+    api.add_resource(MetricsAPI, '/metrics')
+    api.add_resource(GitReportAPI, '/api/git/report')
+    api.add_resource(GroupStatsAPI, '/api/groups/stats', '/api/groups/<int:group_id>/stats')
 
     with app.app_context():
         if JSONToDB.import_json_data():
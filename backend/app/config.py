@@ -13,3 +13,71 @@ class Config:
     DB_PASSWORD = os.getenv("DB_PASSWORD", "")
     DB_NAME = os.getenv("DB_NAME", "gitanalyser")
     DB_PORT = int(os.getenv("DB_PORT", 3306))
+
+    # Service Node.js « archeologist »
+    ARCHEOLOGIST_URL = os.getenv("ARCHEOLOGIST_URL", "http://archeologist:3000")
+    ARCHEOLOGIST_CONNECT_TIMEOUT = float(os.getenv("ARCHEOLOGIST_CONNECT_TIMEOUT", 5))
+    ARCHEOLOGIST_READ_TIMEOUT = float(os.getenv("ARCHEOLOGIST_READ_TIMEOUT", 900))
+    ARCHEOLOGIST_RETRIES = int(os.getenv("ARCHEOLOGIST_RETRIES", 3))
+    ARCHEOLOGIST_BACKOFF = float(os.getenv("ARCHEOLOGIST_BACKOFF", 0.5))
+
+    # Analyses par lot (/api/analyze avec repo_ids / group_id / student_id)
+    ANALYSIS_MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", 4))
+
+    # /api/stats : parcourir toutes les branches (et non la seule branche par défaut)
+    ANALYSIS_ALL_BRANCHES = os.getenv("ANALYSIS_ALL_BRANCHES", "false").lower() in ("1", "true", "yes")
+
+    # Historique du template des TDs, exclu des statistiques de chaque étudiant :
+    # "auto" (TEMPLATE_REPO_URL s'il est renseigné, sinon commits communs à au moins
+    # TEMPLATE_MIN_SHARE des dépôts de la cohorte) ou "off"
+    TEMPLATE_HISTORY_MODE = os.getenv("TEMPLATE_HISTORY_MODE", "auto").lower()
+    TEMPLATE_REPO_URL = os.getenv("TEMPLATE_REPO_URL")
+    TEMPLATE_MIN_SHARE = float(os.getenv("TEMPLATE_MIN_SHARE", 0.5))
+    TEMPLATE_CACHE_TTL = float(os.getenv("TEMPLATE_CACHE_TTL", 3600))
+
+    # Analyse des projets de groupe : fichier mailmap commun (en plus du .mailmap de
+    # chaque dépôt) pour rattacher les identités git aux étudiants
+    MAILMAP_FILE = os.getenv("MAILMAP_FILE")
+
+    # Chemins ignorés dans les comptes de lignes / fichiers (voir utils/path_filters.py) :
+    # exclusions par défaut (node_modules, lockfiles, binaires...), motifs supplémentaires
+    # séparés par des virgules, et surcharges par dépôt dans un fichier JSON
+    PATH_FILTERS_DEFAULTS = os.getenv("PATH_FILTERS_DEFAULTS", "true").lower() in ("1", "true", "yes")
+    PATH_EXCLUDES = os.getenv("PATH_EXCLUDES", "")
+    PATH_INCLUDES = os.getenv("PATH_INCLUDES", "")
+    PATH_FILTERS_FILE = os.getenv("PATH_FILTERS_FILE")
+
+    # Audits et statistiques approchés sur les très gros dépôts (voir utils/sampling.py) :
+    # mode par défaut ("exact", "auto", "stride", "time"), taille d'échantillon visée
+    # (et seuil du mode "auto"), nombre de périodes du mode "time"
+    SAMPLING_MODE = os.getenv("SAMPLING_MODE", "exact").lower()
+    SAMPLING_TARGET_COMMITS = int(os.getenv("SAMPLING_TARGET_COMMITS", 2000))
+    SAMPLING_STRATA = int(os.getenv("SAMPLING_STRATA", 10))
+
+    # Indicateurs GitHub de /api/stats (branches, PR, reviews, CI) : "github" (API, repli
+    # sur les données locales en cas d'échec) ou "local" (clone + dernier instantané de
+    # l'API, aucun appel réseau) ; instantanés dans GITHUB_SNAPSHOT_DIR (défaut CLONES_DIR/.github)
+    GITHUB_METRICS_SOURCE = os.getenv("GITHUB_METRICS_SOURCE", "github").lower()
+    GITHUB_SNAPSHOT_DIR = os.getenv("GITHUB_SNAPSHOT_DIR")
+
+    # Cache mémoire des listes de repositories par groupe / étudiant (secondes)
+    REPOSITORY_CACHE_TTL = float(os.getenv("REPOSITORY_CACHE_TTL", 60))
+
+    # /api/roster/bulk : nombre de lignes par lot (une transaction et un executemany par lot)
+    ROSTER_BATCH_SIZE = int(os.getenv("ROSTER_BATCH_SIZE", 500))
+
+    # Dossier des fichiers JSON importés au démarrage (défaut : backend/data)
+    DATA_DIR = os.getenv("DATA_DIR")
+    # Fichier où écrire les rattachements dépôt → groupe / étudiant ambigus de l'import
+    # (seulement s'il y en a ; hors du dossier des données, suivi par git). Sans valeur :
+    # journal seulement
+    AMBIGUOUS_LINKS_FILE = os.getenv("AMBIGUOUS_LINKS_FILE")
+
+    # Instrumentation : log structuré par requête, profilage cProfile à la demande
+    # (en-tête « X-Profile: 1 ») quand PROFILING_ENABLED est activé
+    REQUEST_LOG_ENABLED = os.getenv("REQUEST_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+    # /metrics : la taille du dossier des clones est recalculée au plus toutes les N secondes
+    CLONE_STORE_SIZE_TTL = float(os.getenv("CLONE_STORE_SIZE_TTL", 300))
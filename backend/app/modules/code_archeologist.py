@@ -1,16 +1,18 @@
 import requests
 from flask import current_app as app
 from ..utils.database import get_db_connection
+from ..utils.archeologist_client import get_archeologist_client
+from ..utils.cache import invalidate_repository_listings
 
 def code_archeologist_analysis(repoUrl, id_repo):
-    analyze_url = "http://archeologist:3000/api/analyze"
-    full_data_url = "http://archeologist:3000/api/analysis-data"
-    commit_processing_url = "http://archeologist:3000/api/process-commits"
-    blame_url = "http://archeologist:3000/api/blame-evolution"
-    
+    client = get_archeologist_client()
+
     # Lancer l'analyse du repo
-    initial_response = requests.post(analyze_url, json={"repoUrl": repoUrl, "local": True})
-  
+    try:
+        initial_response = client.analyze(repoUrl, local=True)
+    except requests.exceptions.RequestException as e:
+        return f"Erreur de communication avec le service archeologist : {e}"
+
     try:
         initial_data = initial_response.json()
         #app.logger.debug(f"Réponse analyse : {data}")
@@ -22,18 +24,9 @@ def code_archeologist_analysis(repoUrl, id_repo):
     analysis_id = initial_data["analysisId"]
     update_analysis_id_in_db(analysis_id, id_repo)
 
-    # Récupérer les données de l'analyse complète
-    params = {"analysisId": analysis_id}
-    full_data_response = requests.get(full_data_url, params=params)
-    try:
-        analysis_full_data = full_data_response.json()
-    except Exception:
-        return f"Erreur JSONDecode lors de la récupération des données : contenu reçu = {full_data_response.text}"
-    if not full_data_response.ok or analysis_full_data.get("status") != "success":
-        return f"Erreur lors de la récupération des données d'analyse : {full_data_response.text}"
-
-    # Renvoie les données complètes de l'analyse
-    return analysis_full_data
+    # Seul l'identifiant est renvoyé : le post-traitement lit la liste des fichiers
+    # en flux, et le payload complet est relayé tel quel par AnalysisDataAPI.
+    return {"status": "success", "analysisId": analysis_id}
 
 
 def update_analysis_id_in_db(analysis_id, id_repo):
@@ -50,6 +43,7 @@ def update_analysis_id_in_db(analysis_id, id_repo):
             (analysis_id, id_repo)
         )
         conn.commit()
+        invalidate_repository_listings()
         app.logger.debug(f"Enregistrement du mapping repo-analysis | analysisId : {analysis_id}, repo: {id_repo}")
 
     except Exception as e:
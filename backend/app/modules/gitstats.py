@@ -1,16 +1,12 @@
 import subprocess
+from ..utils.git_runner import run_tool
 
 def gitstats_analysis(repo_path, output_dir):
     """
     Analyse un dépôt Git avec GitStats.
     """
     try:
-        result = subprocess.run(
-            ["gitstats", repo_path, output_dir],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        result = run_tool(["gitstats", repo_path, output_dir], repo=repo_path, text=True)
         return f"Analyse GitStats terminée. Les résultats sont dans : {output_dir}"
     except subprocess.CalledProcessError as e:
         return f"Erreur lors de l'analyse GitStats : {e.stderr}"
@@ -0,0 +1,304 @@
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app as app
+
+from ..utils.database import get_db_connection
+from ..utils.dir_manager import DirManager
+from ..utils.git_reader import GitReader
+from ..utils.instrumentation import timed
+from ..utils.path_filters import path_filter_for
+from ..utils.template_history import detect_template, present_tips
+
+# Pondérations du score, identiques à celles d'analyze_student (TDs)
+DEFAULT_WEIGHTS = {"commits": 1.0, "ligne": 0.5, "fichier": 0.2}
+
+# <id>+<login>@users.noreply.github.com ou <login>@users.noreply.github.com
+_NOREPLY = re.compile(r"^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$", re.IGNORECASE)
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Minuscules, sans accents ni séparateurs : « Élise Le-Roy » → « eliseleroy »."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text.lower() if c.isalnum())
+
+
+class AliasIndex:
+    """
+    Index des identités git connues d'un groupe → id étudiant, construit une fois
+    à partir de student_git_accounts (comptes git) et du nom des étudiants.
+    Une identité (nom, email) est reconnue par, dans l'ordre :
+      - le login d'un email noreply GitHub, ou la partie locale de l'email ;
+      - le nom d'auteur égal à un compte git ;
+      - le nom d'auteur égal à « prénom nom » ou « nom prénom ».
+    Un alias partagé par plusieurs étudiants est ignoré (ambigu).
+    """
+
+    def __init__(self, members: Iterable[Dict[str, Any]], accounts: Iterable[Tuple[int, str]]):
+        self._accounts: Dict[str, Optional[int]] = {}
+        self._names: Dict[str, Optional[int]] = {}
+        for student_id, username in accounts:
+            self._add(self._accounts, _normalize(username), student_id)
+        for member in members:
+            name, surname = member["student_name"], member["student_surname"]
+            self._add(self._names, _normalize(f"{name}{surname}"), member["student_id"])
+            self._add(self._names, _normalize(f"{surname}{name}"), member["student_id"])
+
+    @staticmethod
+    def _add(index: Dict[str, Optional[int]], key: str, student_id: int):
+        if not key:
+            return
+        # None : alias ambigu (plusieurs étudiants)
+        index[key] = student_id if index.get(key, student_id) == student_id else None
+
+    def resolve(self, author_name: str, author_email: str) -> Optional[int]:
+        email = (author_email or "").strip()
+        match = _NOREPLY.match(email)
+        login = match.group(1) if match else email.split("@", 1)[0]
+        for key, index in ((_normalize(login), self._accounts),
+                           (_normalize(author_name), self._accounts),
+                           (_normalize(author_name), self._names)):
+            student_id = index.get(key)
+            if student_id is not None:
+                return student_id
+        return None
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"commits": 0, "additions": 0, "deletions": 0, "files": 0, "late_commits": 0,
+            "first_commit": None, "last_commit": None}
+
+
+def _merge_totals(into: Dict[str, Any], other: Dict[str, Any]):
+    for key in ("commits", "additions", "deletions", "files", "late_commits"):
+        into[key] += other[key]
+    if other["first_commit"] and (into["first_commit"] is None or other["first_commit"] < into["first_commit"]):
+        into["first_commit"] = other["first_commit"]
+    if other["last_commit"] and (into["last_commit"] is None or other["last_commit"] > into["last_commit"]):
+        into["last_commit"] = other["last_commit"]
+
+
+def analyze_group_repository(
+    repo_url: str,
+    members: List[Dict[str, Any]],
+    index: AliasIndex,
+    deadline: Optional[datetime] = None,
+    weights: Optional[Dict[str, float]] = None,
+    template: Optional[Dict[str, Any]] = None,
+    all_branches: bool = False
+) -> Dict[str, Any]:
+    """
+    Parcourt une seule fois l'historique du dépôt (un `git log`, auteurs corrigés par
+    .mailmap / MAILMAP_FILE) en agrégeant par identité git, puis rattache chaque
+    identité à un membre via `index`. Un email déjà rattaché à un membre rattache aussi
+    les autres noms sous lesquels il apparaît.
+    Retourne, par membre, des métriques du même type que les TDs (commits, lignes,
+    fichiers, score, part des lignes, commits après `deadline`), et les identités
+    non rattachées.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    repo_path = DirManager.clone_update_repo(repo_url)
+
+    identities: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    with timed("history"), GitReader(repo_path) as reader:
+        template_tips = present_tips(reader, template)
+        path_filter = path_filter_for(DirManager.name_from_url(repo_url))
+        for commit in reader.iter_commits(all_refs=all_branches, exclude=template_tips,
+                                          mailmap=app.config["MAILMAP_FILE"] or True,
+                                          paths=path_filter.pathspecs(), sparse=True):
+            totals = identities.setdefault((commit.author_name, commit.author_email.lower()), _empty_totals())
+            totals["commits"] += 1
+            for mod in commit.modified_files:
+                totals["additions"] += mod.added_lines
+                totals["deletions"] += mod.deleted_lines
+                totals["files"] += 1
+            # Heure locale de l'auteur, comme les deadlines saisies en base
+            local_date = commit.author_date.replace(tzinfo=None)
+            if deadline is not None and local_date > deadline:
+                totals["late_commits"] += 1
+            if totals["first_commit"] is None:
+                totals["first_commit"] = local_date
+            totals["last_commit"] = local_date
+
+    resolved = {identity: index.resolve(*identity) for identity in identities}
+    by_email: Dict[str, Optional[int]] = {}
+    for (_, email), student_id in resolved.items():
+        if student_id is not None and email:
+            by_email[email] = student_id if by_email.get(email, student_id) == student_id else None
+
+    per_member = {m["student_id"]: _empty_totals() for m in members}
+    unattributed = {}
+    for (name, email), totals in identities.items():
+        student_id = resolved[(name, email)]
+        if student_id is None:
+            student_id = by_email.get(email)
+        if student_id in per_member:
+            _merge_totals(per_member[student_id], totals)
+        else:
+            unattributed[f"{name} <{email}>"] = _finalize(totals, weights)
+
+    total_lines = sum(t["additions"] + t["deletions"] for t in identities.values())
+    result_members = {}
+    for member in members:
+        totals = _finalize(per_member[member["student_id"]], weights)
+        lines = totals["additions"] + totals["deletions"]
+        totals["percentage"] = round(100.0 * lines / total_lines, 2) if total_lines else 0.0
+        totals["on_time"] = totals["late_commits"] == 0
+        result_members[f"student_{member['student_id']}"] = dict(totals, **member)
+
+    result = {
+        "repo_url": repo_url,
+        "total_commits": sum(t["commits"] for t in identities.values()),
+        "total_lines": total_lines,
+        "members": result_members,
+        "unattributed": unattributed,
+    }
+    if template_tips:
+        result["template_excluded"] = {
+            k: template[k] for k in ("source", "commits", "additions", "deletions", "files")
+        }
+    return result
+
+
+def _finalize(totals: Dict[str, Any], weights: Dict[str, float]) -> Dict[str, Any]:
+    out = dict(totals)
+    out["score"] = round(
+        totals["commits"] * weights.get("commits", 1.0)
+        + (totals["additions"] + totals["deletions"]) * weights.get("ligne", 0.5)
+        + totals["files"] * weights.get("fichier", 0.2), 2
+    )
+    for key in ("first_commit", "last_commit"):
+        out[key] = totals[key].strftime("%Y-%m-%d %H:%M") if totals[key] else None
+    return out
+
+
+def load_groups(group_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Charge en trois requêtes les groupes, leurs membres (avec comptes git) et leurs
+    dépôts de projet : [{group_id, group_name, members, accounts, repositories}].
+    """
+    where, params = "", ()
+    if group_ids:
+        where = f" WHERE g.id IN ({','.join(['%s'] * len(group_ids))})"
+        params = tuple(group_ids)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT g.id AS group_id, g.name AS group_name FROM `groups` g{where} ORDER BY g.id", params)
+        groups = {row["group_id"]: dict(row, members=[], accounts=[], repositories=[]) for row in cursor.fetchall()}
+        if not groups:
+            return []
+
+        cursor.execute(f"""
+            SELECT gs.id_group, s.id AS student_id, s.name AS student_name, s.surname AS student_surname,
+                   sga.git_username
+            FROM groups_students gs
+            JOIN `groups` g ON g.id = gs.id_group
+            JOIN students s ON s.id = gs.id_student
+            LEFT JOIN student_git_accounts sga ON sga.id_student = s.id{where}
+            ORDER BY gs.id_group, s.id
+        """, params)
+        for row in cursor.fetchall():
+            group = groups[row["id_group"]]
+            if not any(m["student_id"] == row["student_id"] for m in group["members"]):
+                group["members"].append({
+                    "student_id": row["student_id"],
+                    "student_name": row["student_name"],
+                    "student_surname": row["student_surname"],
+                })
+            if row["git_username"]:
+                group["accounts"].append((row["student_id"], row["git_username"]))
+
+        cursor.execute(f"""
+            SELECT rg.id_group, r.id, r.name, r.repo_url
+            FROM repositories_groups rg
+            JOIN `groups` g ON g.id = rg.id_group
+            JOIN repositories r ON r.id = rg.id_repo{where}
+            ORDER BY rg.id_group, r.id
+        """, params)
+        for row in cursor.fetchall():
+            groups[row["id_group"]]["repositories"].append(
+                {"id": row["id"], "name": row["name"], "repo_url": row["repo_url"]}
+            )
+        return list(groups.values())
+    finally:
+        if conn:
+            conn.close()
+
+
+def load_project_deadline() -> Optional[datetime]:
+    """Dernière deadline de type PROJECT (configurable_deadlines), ou None."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT event_date, event_time FROM configurable_deadlines
+            WHERE type = 'PROJECT' ORDER BY event_date DESC, event_time DESC LIMIT 1
+        """)
+        row = cursor.fetchone()
+    finally:
+        if conn:
+            conn.close()
+    if not row:
+        return None
+    event_time = row["event_time"]
+    if not isinstance(event_time, timedelta):  # datetime.time
+        event_time = timedelta(hours=event_time.hour, minutes=event_time.minute, seconds=event_time.second)
+    return datetime.combine(row["event_date"], datetime.min.time()) + event_time
+
+
+def analyze_group(group: Dict[str, Any], deadline: Optional[datetime] = None,
+                  template: Optional[Dict[str, Any]] = None, all_branches: bool = False) -> Dict[str, Any]:
+    """Analyse les dépôts de projet d'un groupe (voir load_groups), chacun une seule fois."""
+    index = AliasIndex(group["members"], group["accounts"])
+    repositories = {}
+    for repo in group["repositories"]:
+        try:
+            repositories[repo["name"]] = analyze_group_repository(
+                repo["repo_url"], group["members"], index, deadline, template=template, all_branches=all_branches
+            )
+        except Exception as e:
+            app.logger.error(f"Échec de l'analyse du dépôt {repo['name']} (groupe {group['group_id']}) : {e}")
+            repositories[repo["name"]] = {"error": str(e)}
+    return {
+        "group_id": group["group_id"],
+        "group_name": group["group_name"],
+        "members": group["members"],
+        "repositories": repositories,
+    }
+
+
+def analyze_groups(group_ids: Optional[List[int]] = None, all_branches: bool = False) -> Dict[str, Any]:
+    """
+    Analyse les projets de tous les groupes (ou de `group_ids`) : les données de la base
+    sont chargées une fois, puis les groupes sont analysés en parallèle
+    (au plus ANALYSIS_MAX_WORKERS à la fois).
+    """
+    groups = load_groups(group_ids)
+    if not groups:
+        return {}
+    deadline = load_project_deadline()
+    # Tous les dépôts dans la réserve d'objets avant de repérer leur historique commun
+    repo_urls = [repo["repo_url"] for group in groups for repo in group["repositories"]]
+    DirManager.update_pool(repo_urls)
+    template = detect_template(DirManager.name_from_url(url) for url in repo_urls)
+
+    flask_app = app._get_current_object()
+
+    def run(group):
+        # Chaque thread a son propre contexte applicatif (et donc son propre `g`)
+        with flask_app.app_context():
+            return analyze_group(group, deadline, template, all_branches)
+
+    max_workers = max(1, min(flask_app.config["ANALYSIS_MAX_WORKERS"], len(groups)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="group-analysis") as executor:
+        results = list(executor.map(run, groups))
+    return {f"group_{r['group_id']}": r for r in results}
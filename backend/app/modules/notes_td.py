@@ -1,11 +1,14 @@
 import os
-import json
 from collections import Counter
 from datetime import datetime
-import subprocess
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, Iterable
 import requests
 from flask import current_app as app 
+from ..utils.archeologist_client import get_archeologist_client
+from ..utils.instrumentation import timed
+from ..utils.git_reader import GitReader
+from ..utils.git_runner import repo_name
+from ..utils.path_filters import path_filter_for
 
 # For cyclomatic complexity (Radon)
 try:
@@ -22,46 +25,46 @@ def perform_post_processing_analysis(analysis_data: Dict[str, Any], clone_path:
     """
     Performs post-processing analysis on data retrieved from Node.js /api/analysis-data.
     Calculates:
-      - Most modified files
       - Cyclomatic complexity per .py file
     Does NOT recalculate: commits per author, temporal evolution, co-modifications.
     """
-    post_processed_metrics: Dict[str, Any] = {}
-
-    # 1. Get raw commit data for file modifications from Node.js analysis_data
-    # The 'codeEvolution' key in analysis_data contains the full commit objects (sha, commit, parents)
-    all_commits_from_api = analysis_data.get("codeEvolution", [])
-    
-    complexites = {}
+    # Use the pre-calculated `file_changes` from the Node.js API: only its keys
+    # (the paths of every modified file) are needed, not the commit list.
+    return compute_post_processing_metrics(analysis_data.get("file_changes", {}).keys(), clone_path)
 
-    # Iterate through the commits from the API response
-    # We still need to use local git commands to get the *modified files per commit*
-    # because the API provides commit metadata but not the file changes within each commit.
-    # However, if the API *were* to provide `file_changes` directly in the `codeEvolution` object,
-    # we wouldn't need to run `git diff-tree` again for that purpose.
-    # Given your `fetchFileChangesAllBranches` in Node.js already calculates this,
-    # we should ideally use that pre-calculated `file_changes` data.
-    
-    # Use the pre-calculated `file_changes` from the Node.js API
-    pre_calculated_file_changes = analysis_data.get("file_changes", {})
 
+def compute_post_processing_metrics(
+    file_paths: Iterable[str],
+    clone_path: str,
+    snapshot_complexities: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Post-processing metrics computed from the list of modified file paths alone,
+    so the caller can stream them out of the analysis payload.
+    When `snapshot_complexities` (see compute_snapshot_complexities) is given,
+    complexities are looked up there instead of reading the working tree.
+    """
+    post_processed_metrics: Dict[str, Any] = {}
+    complexites = {}
+    # Fichiers vendorisés / générés / binaires (voir path_filters) : ignorés
+    path_filter = path_filter_for(repo_name(clone_path))
+    file_paths = path_filter.filter(file_paths)
 
-    # 2. Calculate Cyclomatic Complexity for Python files
+    # Calculate Cyclomatic Complexity for Python files
     # This requires access to the local clone
-    if cc_visit and clone_path:
-        for file_path in pre_calculated_file_changes.keys(): # Iterate through all files that were modified
+    if cc_visit and snapshot_complexities is not None:
+        for file_path in file_paths:
+            if file_path.endswith(".py"):
+                # -2: file not present in the analyzed snapshot (e.g., deleted)
+                complexites[file_path] = snapshot_complexities.get(file_path, -2)
+    elif cc_visit and clone_path:
+        for file_path in file_paths: # Iterate through all files that were modified
             if file_path.endswith(".py"):
                 full_path = os.path.join(clone_path, file_path)
                 if os.path.exists(full_path):
                     try:
                         with open(full_path, 'r', encoding='utf-8') as f_code:
-                            code = f_code.read()
-                            if code.strip():
-                                res = cc_visit(code)
-                                score = sum(c.complexity for c in res)
-                                complexites[file_path] = score
-                            else:
-                                complexites[file_path] = 0 # Empty file, complexity 0
+                            complexites[file_path] = _complexity_of(f_code.read())
                     except Exception as e:
                         complexites[file_path] = -1 # Indicate error
                         print(f"Error calculating complexity for {file_path}: {e}")
@@ -72,38 +75,72 @@ def perform_post_processing_analysis(analysis_data: Dict[str, Any], clone_path:
 
     return post_processed_metrics
 
+
+def compute_snapshot_complexities(clone_path: str, revision: str) -> Dict[str, int]:
+    """
+    Cyclomatic complexity of every .py file of `revision`, read from the git object
+    database instead of the working tree. It only needs the clone, so it can run
+    while the archeologist service (which checks out other commits in the same
+    clone) is still analyzing the repository.
+    """
+    complexites: Dict[str, int] = {}
+    if not cc_visit:
+        return complexites
+
+    with GitReader(clone_path) as reader:
+        path_filter = path_filter_for(repo_name(clone_path))
+        py_files = [p for p in reader.list_tree(revision) if p.endswith(".py") and path_filter.allows(p)]
+        for file_path, content in reader.read_blobs(revision, py_files):
+            if content is None:
+                continue
+            try:
+                complexites[file_path] = _complexity_of(content.decode("utf-8"))
+            except Exception as e:
+                complexites[file_path] = -1 # Indicate error
+                print(f"Error calculating complexity for {file_path}: {e}")
+    return complexites
+
+
+def _complexity_of(code: str) -> int:
+    if not code.strip():
+        return 0 # Empty file, complexity 0
+    with timed("radon"):
+        return sum(c.complexity for c in cc_visit(code))
+
+
 # --- Main function to orchestrate the post-processing ---
-def process_post_analysis_request(analysis_id: int, clone_path: str) -> str:
+def process_post_analysis_request(
+    analysis_id: int,
+    clone_path: str,
+    snapshot_complexities: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
     """
-    Fetches analysis data from the Node.js API and performs post-processing.
+    Fetches the modified file paths of an analysis from the Node.js API
+    (streamed, see ArcheologistClient.get_analysis_file_paths) and performs post-processing.
+    Returns a dict, with an "error" key on failure.
     """
-    full_data_url = "http://archeologist:3000/api/analysis-data"
-    app.logger.info(f"Fetching analysis data for ID {analysis_id} from Node.js API at {full_data_url}")
+    client = get_archeologist_client()
+    app.logger.info(f"Fetching analysis data for ID {analysis_id} from Node.js API at {client.base_url}")
     try:
-        
-        params = {"analysisId": analysis_id}
-        full_data_response = requests.get(full_data_url, params=params)
-        full_data_response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        full_analysis_data = full_data_response.json()
-
-        if full_analysis_data.get("status") != "success":
-            return json.dumps({"error": f"Error fetching analysis data from Node.js: {full_analysis_data.get('message', 'Unknown error')}"})
+        analysis_summary = client.get_analysis_file_paths(analysis_id)
 
-        # The actual data is under 'data' key in the response
-        repo_analysis_data = full_analysis_data.get("data", {})
+        if analysis_summary.get("status") != "success":
+            return {"error": f"Error fetching analysis data from Node.js: {analysis_summary.get('message') or 'Unknown error'}"}
 
         # Perform the post-processing
-        post_processed_results = perform_post_processing_analysis(repo_analysis_data, clone_path)
+        post_processed_results = compute_post_processing_metrics(
+            analysis_summary["file_paths"], clone_path, snapshot_complexities
+        )
         
-        return json.dumps({
+        return {
             "status": "success",
             "analysisId": analysis_id,
             "post_processed_metrics": post_processed_results
-        }, indent=2)
+        }
 
     except requests.exceptions.RequestException as e:
-        return json.dumps({"error": f"Network or API error when fetching analysis data: {e}"})
-    except json.JSONDecodeError:
-        return json.dumps({"error": f"Invalid JSON response from Node.js API: {full_data_response.text}"})
+        return {"error": f"Network or API error when fetching analysis data: {e}"}
+    except ValueError as e:
+        return {"error": f"Invalid JSON response from Node.js API: {e}"}
     except Exception as e:
-        return json.dumps({"error": f"An unexpected error occurred during post-processing: {e}"})
+        return {"error": f"An unexpected error occurred during post-processing: {e}"}
@@ -1,17 +1,13 @@
 import subprocess
 import os
+from ..utils.git_runner import run_tool
 
 def analyze_repo(repo_path):
     """
     Analyse un dépôt Git en utilisant l'outil Repo Analyzer.
     """
     try:
-        result = subprocess.run(
-            ["repo-analyzer", "--path", repo_path],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        result = run_tool(["repo-analyzer", "--path", repo_path], repo=repo_path, text=True)
         return result.stdout
     except subprocess.CalledProcessError as e:
         return f"Erreur lors de l'analyse : {e.stderr}"
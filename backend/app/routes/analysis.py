@@ -2,6 +2,11 @@
 
 from flask_restful import Resource, reqparse
 from flask import current_app as app # Keep current_app for logging, remove jsonify if it's still there
+from flask import request, Response, stream_with_context
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import time
+from typing import Any, Dict, List, Tuple
 import requests
 from app.utils.node_analyzer_client import analyze_repo_with_node_service
 import json
@@ -12,7 +17,23 @@ from ..modules.git_statistic import git_statistics
 from ..modules.gitstats import gitstats_analysis
 from ..modules.code_archeologist import code_archeologist_analysis
 from ..utils.dir_manager import DirManager
-from ..modules.notes_td import process_post_analysis_request
+from ..modules.notes_td import process_post_analysis_request, compute_snapshot_complexities
+from ..utils.database import get_db_connection
+from ..utils.archeologist_client import get_archeologist_client
+from ..utils.metrics import track_in_flight_analysis
+
+# Clés du corps de requête qui déclenchent une analyse par lot
+BATCH_KEYS = ("repo_ids", "group_id", "student_id")
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str):
+    """Mesure la durée d'une étape du pipeline d'analyse dans timings["<name>_ms"]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 1)
 
 
 
@@ -21,7 +42,14 @@ class AnalysisAPI(Resource):
     """API pour lancer les analyses de projet."""
 
     def post(self):
-        """Lance une analyse sur un dépôt Git."""
+        """
+        Lance une analyse sur un dépôt Git, ou sur un lot de dépôts si le corps
+        contient `repo_ids`, `group_id` ou `student_id` (voir post_batch).
+        """
+        payload = request.get_json(silent=True) or {}
+        if any(payload.get(key) is not None for key in BATCH_KEYS):
+            return self.post_batch(payload)
+
         parser = reqparse.RequestParser()
         parser.add_argument("repo_url", type=str, required=True, help="URL du dépôt Git requise")
         parser.add_argument("tool", type=str, required=True, help="Outil d'analyse requis")
@@ -40,14 +68,43 @@ class AnalysisAPI(Resource):
         id_repo = args["id_repo"]
         history = args["history"]
         factor = args["factor"]'''
-        
+
+        return self.run_analysis(repo_url, tool, id_repo)
+
+    @staticmethod
+    @track_in_flight_analysis
+    def run_analysis(repo_url: str, tool: str, id_repo: int) -> Tuple[Dict[str, Any], int]:
+        """
+        Clone/met à jour le dépôt, lance l'outil puis le post-traitement. Retourne (payload, status).
+        Les étapes indépendantes se chevauchent : dès que le clone est prêt, la complexité
+        (radon) du commit cloné est calculée en parallèle de l'analyse archeologist ;
+        le post-traitement n'attend plus que la liste des fichiers modifiés.
+        La durée de chaque étape est renvoyée dans `timings` (ms).
+        """
         result = None
+        post_processing = None
         error_message = None
         status_code = 200
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
 
-        clone_path = DirManager.clone_update_repo(repo_url)
+        with _stage(timings, "clone"):
+            clone_path = DirManager.clone_update_repo(repo_url)
+            # Le service archeologist fait des checkouts dans ce même clone :
+            # on fige le commit analysé localement.
+            revision = DirManager.head_commit(clone_path)
         #app.logger.debug(f"Clone path: {clone_path}")
 
+        flask_app = app._get_current_object()
+
+        def snapshot_complexities():
+            # Le thread n'a pas de contexte applicatif (path_filter_for, timed lisent la config)
+            with flask_app.app_context(), _stage(timings, "complexity"):
+                return compute_snapshot_complexities(clone_path, revision)
+
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="complexity")
+        complexity_future = pool.submit(snapshot_complexities)
+
         try:           
             '''if tool == "git_statistic":
                 result = git_statistics(repo_url)
@@ -56,7 +113,8 @@ class AnalysisAPI(Resource):
             if tool == "general_stats":
                 return''' 
             if tool == "code_archeologist":
-                result = code_archeologist_analysis(repo_url, id_repo)              
+                with _stage(timings, "archeologist"):
+                    result = code_archeologist_analysis(repo_url, id_repo)
             
             else:
                 error_message = "Outil d'analyse non supporté."
@@ -69,9 +127,15 @@ class AnalysisAPI(Resource):
                     history=history,
                     factor=factor
                 )'''
-            app.logger.info(f"Analysis result: {result['data']['id']}")
-            result2 = process_post_analysis_request(result['data']['id'], clone_path)
-            #app.logger.debug(f"Post-processed results: {result2}")
+            app.logger.info(f"Analysis result: {result['analysisId']}")
+            try:
+                complexities = complexity_future.result()
+            except Exception as e:
+                app.logger.warning(f"Complexité du snapshot indisponible, lecture du clone : {e}")
+                complexities = None
+            with _stage(timings, "post_processing"):
+                post_processing = process_post_analysis_request(result['analysisId'], clone_path, complexities)
+            #app.logger.debug(f"Post-processed results: {post_processing}")
             
 
         except requests.exceptions.HTTPError as e:
@@ -111,9 +175,135 @@ class AnalysisAPI(Resource):
             status_code = 500
             app.logger.error(f"Unexpected error during analysis: {e}", exc_info=True)
             return {"error": error_message}, status_code
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
 
         # Final return for successful analysis or non-Node.js tool
         if error_message:
             return {"error": error_message}, status_code
         else:
-            return {"result": result}, status_code
\ No newline at end of file
+            return {"result": result, "post_processing": post_processing, "timings": timings}, status_code
+
+    def post_batch(self, payload: Dict[str, Any]):
+        """
+        Analyse plusieurs dépôts en un seul appel.
+        Les dépôts sont désignés par `repo_ids` (liste d'IDs), `group_id` ou `student_id`
+        (résolus via repositories_groups / repositories_students).
+        Les analyses tournent en parallèle (au plus ANALYSIS_MAX_WORKERS à la fois) et
+        chaque résultat est renvoyé dès qu'il est prêt, une ligne JSON par dépôt
+        (application/x-ndjson), suivie d'une ligne de synthèse.
+        """
+        tool = payload.get("tool") or "code_archeologist"
+        try:
+            repos = self.resolve_batch_repositories(
+                repo_ids=payload.get("repo_ids"),
+                group_id=payload.get("group_id"),
+                student_id=payload.get("student_id"),
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            app.logger.error(f"Erreur lors de la résolution des dépôts du lot : {e}", exc_info=True)
+            return {"error": str(e)}, 500
+
+        if not repos:
+            return {"error": "Aucun dépôt à analyser pour ces critères."}, 404
+
+        flask_app = app._get_current_object()
+        max_workers = max(1, min(flask_app.config["ANALYSIS_MAX_WORKERS"], len(repos)))
+
+        def analyze(repo):
+            # Chaque thread a son propre contexte applicatif (et donc son propre `g`)
+            with flask_app.app_context():
+                try:
+                    result, status_code = AnalysisAPI.run_analysis(repo["repo_url"], tool, repo["id"])
+                except Exception as e:
+                    flask_app.logger.error(f"Échec de l'analyse du dépôt {repo['id']} : {e}", exc_info=True)
+                    result, status_code = {"error": str(e)}, 500
+            return {"id_repo": repo["id"], "name": repo["name"], "status_code": status_code, **result}
+
+        def generate():
+            failed = 0
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+            try:
+                futures = [executor.submit(analyze, repo) for repo in repos]
+                for future in as_completed(futures):
+                    line = future.result()
+                    if line["status_code"] != 200:
+                        failed += 1
+                    yield json.dumps(line) + "\n"
+                yield json.dumps({"done": True, "total": len(repos), "failed": failed}) + "\n"
+            finally:
+                # Client déconnecté : on n'exécute pas les analyses encore en attente
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    @staticmethod
+    def resolve_batch_repositories(repo_ids=None, group_id=None, student_id=None) -> List[Dict[str, Any]]:
+        """Retourne les dépôts (id, name, repo_url) à analyser, sans doublons."""
+        if repo_ids is not None:
+            if not isinstance(repo_ids, list) or not all(isinstance(i, int) for i in repo_ids):
+                raise ValueError("'repo_ids' doit être une liste d'entiers.")
+            if not repo_ids:
+                return []
+            format_strings = ','.join(['%s'] * len(repo_ids))
+            query = f"SELECT r.id, r.name, r.repo_url FROM repositories r WHERE r.id IN ({format_strings})"
+            params = tuple(repo_ids)
+        elif group_id is not None:
+            query = """
+                SELECT r.id, r.name, r.repo_url
+                FROM repositories_groups rg
+                INNER JOIN repositories r ON rg.id_repo = r.id
+                WHERE rg.id_group = %s
+            """
+            params = (int(group_id),)
+        else:
+            query = """
+                SELECT r.id, r.name, r.repo_url
+                FROM repositories_students rs
+                INNER JOIN repositories r ON rs.id_repo = r.id
+                WHERE rs.id_student = %s
+            """
+            params = (int(student_id),)
+        query += " ORDER BY r.id"
+
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, params)
+            repos = {row["id"]: row for row in cursor.fetchall()}
+            return list(repos.values())
+        finally:
+            if conn:
+                conn.close()
+
+
+class AnalysisDataAPI(Resource):
+    """Relaie en flux le payload /api/analysis-data du service archeologist."""
+
+    def get(self, analysis_id: int):
+        """
+        Payload complet d'une analyse (activité des commits, évolution du code...),
+        transmis par blocs sans être décodé ni gardé en mémoire côté Flask.
+        """
+        client = get_archeologist_client()
+        try:
+            upstream = client.get("/api/analysis-data", params={"analysisId": analysis_id}, stream=True)
+        except requests.exceptions.RequestException as e:
+            app.logger.error(f"analysis-data {analysis_id} indisponible : {e}")
+            return {"error": f"Erreur de communication avec le service archeologist : {e}"}, 502
+
+        def generate():
+            try:
+                yield from upstream.iter_content(chunk_size=64 * 1024)
+            finally:
+                upstream.close()
+
+        return Response(
+            stream_with_context(generate()),
+            status=upstream.status_code,
+            mimetype=upstream.headers.get("Content-Type", "application/json"),
+        )
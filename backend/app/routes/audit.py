@@ -1,24 +1,37 @@
-import os
 import time
-from flask_restful import Resource, reqparse
-from typing import Optional, Dict, Any
+from flask_restful import Resource, reqparse, inputs
+from typing import Optional, Dict, Any, List
 from collections import defaultdict, Counter
-from pydriller import Repository
 from radon.complexity import cc_visit
 from flask import current_app as app # Keep current_app for logging, remove jsonify if it's still there
 from ..utils.dir_manager import DirManager
+from ..utils.instrumentation import timed
+from ..utils.git_reader import GitReader
+from ..utils.template_history import detect_template, present_tips
+from ..utils.path_filters import path_filter_for
+from ..utils.sampling import Sampling, SampledHistory
 
 class AuditAPI(Resource):
     def post(self):
         parser = reqparse.RequestParser()
         parser.add_argument("repo_url", type=str, required=True)
         parser.add_argument("deadline")
+        parser.add_argument("all_branches", type=inputs.boolean, default=False)
+        parser.add_argument("path", action="append", dest="paths")
+        parser.add_argument("sample", type=str)
+        parser.add_argument("sample_every", type=int)
+        parser.add_argument("sample_size", type=int)
         args = parser.parse_args()
 
         repo_url = args["repo_url"]
         deadline = args["deadline"]
+        try:
+            sampling = Sampling.from_args(args["sample"], args["sample_every"], args["sample_size"])
+        except ValueError as e:
+            return {"status": "error", "error": str(e)}, 400
 
-        result = self.lancer_audit(repo_url, deadline)
+        result = self.lancer_audit(repo_url, deadline, all_branches=args["all_branches"], paths=args["paths"],
+                                   sampling=sampling)
 
         status_code = 200
         return {"status": "success", "result": result}, status_code
@@ -26,8 +39,21 @@ class AuditAPI(Resource):
     def lancer_audit( self,
         repo_url: str,
         token: Optional[str] = None,
-        deadline: Optional[str] = None
+        deadline: Optional[str] = None,
+        all_branches: bool = False,
+        paths: Optional[List[str]] = None,
+        sampling: Optional[Sampling] = None
     ) -> Dict[str, Any]:
+        """
+        `all_branches` : audite l'union des commits de toutes les branches (chaque
+        commit une seule fois) et ajoute leur répartition dans `commits_par_branche`.
+        L'historique du template (voir detect_template) est exclu de l'audit.
+        `paths` : limite l'audit aux commits et lignes touchant ces chemins (dossier d'un
+        module par exemple).
+        `sampling` : audit approché des très gros dépôts (voir utils/sampling.py) ; les
+        comptes de commits restent exacts, les lignes et fichiers modifiés sont extrapolés
+        depuis l'échantillon et `echantillonnage` donne les marges d'erreur.
+        """
         timestamp = int(time.time())
         base_name = DirManager.name_from_url(repo_url)     
         repo_path = DirManager.clone_update_repo(repo_url)
@@ -41,58 +67,83 @@ class AuditAPI(Resource):
         auteur_fichiers            = defaultdict(set)
         lignes_ajoutees_par_auteur = Counter()
         lignes_supprimees_par_auteur = Counter()
+        commits_par_branche        = Counter()
+        template                   = detect_template()  # dépôt seul : TEMPLATE_REPO_URL uniquement
+        template_tips              = []
 
         try:
-            for commit in Repository(repo_path).traverse_commits():
-                au = commit.author.name or "Inconnu"
-                dstr = commit.author_date.strftime("%Y-%m-%d")
-
-                commits_par_auteur[au] += 1
-                evolution_par_auteur[au][dstr] += 1
-
-                for mod in commit.modified_files:
-                    # fichiers
-                    f = mod.new_path or mod.old_path
-                    if not f:
-                        continue
-                    fichiers_modifies[f] += 1
-                    auteur_fichiers[au].add(f)
-
-                    # co-modifs
-                    for autre, s in auteur_fichiers.items():
-                        if autre != au and f in s:
-                            co_modification[f][au]    += 1
-                            co_modification[f][autre] += 1
-
-                        # … à l’intérieur du for commit … for mod in commit.modified_files: …
-                        # Complexité cyclomatique : on tente systématiquement (radon ne lira
-                        # que le Python, et lèvera une exception sinon)
-                        full_path = os.path.join(repo_path, f)
-                        if os.path.exists(full_path):
-                            try:
-                                with open(full_path, 'r', encoding='utf-8') as f_code:
-                                    code = f_code.read()
-                                    res = cc_visit(code)
-                                    complexites[f] = sum(c.complexity for c in res)
-                            except Exception:
-                                # pas un fichier Python ou parse error → on ignore
-                                pass
-
-                    # … fin de la boucle Repository(traverse_commits()) …
-
-                    # Après avoir collecté TOUTES les complexités, on ne conserve QUE le Top 10
-                    if complexites:
-                        top10 = sorted(complexites.items(), key=lambda x: x[1], reverse=True)[:10]
-                        complexites = dict(top10)
-
-
-                    # lignes ajoutées/supprimées
-                    a = getattr(mod, "added_lines", 0)
-                    d = getattr(mod, "deleted_lines", 0)
-                    if a:
-                        lignes_ajoutees_par_auteur[au] += a
-                    if d:
-                        lignes_supprimees_par_auteur[au] += d
+            with timed("history"), GitReader(repo_path) as reader:
+                # Les complexités sont lues dans le commit cloné (objets git), une fois par fichier
+                head = reader.resolve("HEAD")
+                complexite_courante = {}
+                membership = reader.branch_membership() if all_branches else {}
+                template_tips = present_tips(reader, template)
+                # Les commits hors `paths` sont écartés ; sans `paths`, tous sont gardés
+                # mais les fichiers exclus par path_filters ne sont pas comptés
+                path_filter = path_filter_for(DirManager.name_from_url(repo_url), include=paths or ())
+                history = SampledHistory(reader, sampling, all_refs=all_branches, exclude=template_tips,
+                                         paths=path_filter.pathspecs(), sparse=not paths)
+                for commit, weight in history:
+                    au = commit.author_name or "Inconnu"
+                    dstr = commit.author_date.strftime("%Y-%m-%d")
+
+                    commits_par_auteur[au] += 1
+                    evolution_par_auteur[au][dstr] += 1
+                    for branche in membership.get(commit.hash, ()):
+                        commits_par_branche[branche] += 1
+
+                    for mod in commit.modified_files:
+                        # fichiers
+                        f = mod.new_path or mod.old_path
+                        if not f:
+                            continue
+                        fichiers_modifies[f] += weight
+                        history.add(("fichier", f))
+                        auteur_fichiers[au].add(f)
+
+                        # co-modifs
+                        for autre, s in auteur_fichiers.items():
+                            if autre != au and f in s:
+                                co_modification[f][au]    += 1
+                                co_modification[f][autre] += 1
+
+                            # … à l’intérieur du for commit … for mod in commit.modified_files: …
+                            # Complexité cyclomatique : on tente systématiquement (radon ne lira
+                            # que le Python, et lèvera une exception sinon)
+                            if f not in complexite_courante:
+                                complexite_courante[f] = None
+                                code = reader.read_blob(head, f) if head else None
+                                if code is not None:
+                                    try:
+                                        with timed("radon"):
+                                            res = cc_visit(code.decode("utf-8"))
+                                        complexite_courante[f] = sum(c.complexity for c in res)
+                                    except Exception:
+                                        # pas un fichier Python ou parse error → on ignore
+                                        pass
+                            if complexite_courante[f] is not None:
+                                complexites[f] = complexite_courante[f]
+
+                        # … fin de la boucle iter_commits() …
+
+                        # Après avoir collecté TOUTES les complexités, on ne conserve QUE le Top 10
+                        if complexites:
+                            top10 = sorted(complexites.items(), key=lambda x: x[1], reverse=True)[:10]
+                            complexites = dict(top10)
+
+
+                        # lignes ajoutées/supprimées
+                        a = getattr(mod, "added_lines", 0)
+                        d = getattr(mod, "deleted_lines", 0)
+                        if a:
+                            lignes_ajoutees_par_auteur[au] += a * weight
+                            history.add(("ajoutees", au), a)
+                        if d:
+                            lignes_supprimees_par_auteur[au] += d * weight
+                            history.add(("supprimees", au), d)
+                        if a or d:
+                            history.add(("lignes", au), a + d)
+                            history.add("lignes", a + d)
 
         except Exception as e:
             return {"error": f"Erreur pendant l'analyse des commits : {e}"}
@@ -106,20 +157,22 @@ class AuditAPI(Resource):
         contributions = {}
         total_changed = 0
         for au in set(lignes_ajoutees_par_auteur) | set(lignes_supprimees_par_auteur):
-            A = lignes_ajoutees_par_auteur.get(au, 0)
-            D = lignes_supprimees_par_auteur.get(au, 0)
+            A = round(lignes_ajoutees_par_auteur.get(au, 0))
+            D = round(lignes_supprimees_par_auteur.get(au, 0))
             T = A + D
             total_changed += T
             contributions[au] = {"added": A, "deleted": D, "total": T}
+            if not history.exact:
+                contributions[au]["margin"] = round(history.margin(("lignes", au)))
 
         # pourcentages
         for au, info in contributions.items():
             pct = round(100 * info["total"] / total_changed, 2) if total_changed > 0 else 0.0
             info["percent"] = pct        
 
-        fichiers_critiques = fichiers_modifies.most_common(5)
+        fichiers_critiques = [(f, round(n)) for f, n in fichiers_modifies.most_common(5)]
 
-        return {
+        result = {
             "base_name":                base_name,
             "deadline":                 deadline,
             "total_commits":            sum(commits_par_auteur.values()),
@@ -130,4 +183,16 @@ class AuditAPI(Resource):
             "co_modification":          {f: dict(a) for f,a in co_modification.items()},
             "evolution_par_auteur":     evolution_par_auteur
             #"gitstats_url":            gitstats_url
-        }
\ No newline at end of file
+        }
+        # Complexités et co-modifications ne portent que sur les fichiers des commits tirés
+        result["echantillonnage"] = history.report(
+            dict({"lignes": "lignes"}, **{f: ("fichier", f) for f, _ in fichiers_critiques}),
+            sample_only=("complexites", "co_modification"),
+        )
+        if all_branches:
+            result["commits_par_branche"] = dict(commits_par_branche)
+        if template_tips:
+            result["historique_template"] = {
+                k: template[k] for k in ("source", "commits", "additions", "deletions", "files")
+            }
+        return result
\ No newline at end of file
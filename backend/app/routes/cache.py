@@ -0,0 +1,9 @@
+from flask_restful import Resource
+from ..utils.cache import all_cache_stats
+
+class CacheStatsAPI(Resource):
+    """API exposant les statistiques (hits/misses) des caches mémoire."""
+
+    def get(self):
+        """Retourne les compteurs de chaque cache, pour régler les TTL."""
+        return {"caches": all_cache_stats()}, 200
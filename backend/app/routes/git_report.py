@@ -0,0 +1,16 @@
+from flask_restful import Resource, reqparse
+from ..utils.git_runner import git_report
+
+class GitReportAPI(Resource):
+    """API exposant le coût des commandes git / outils externes par dépôt (processus courant : un rapport par worker gunicorn)."""
+
+    def get(self):
+        """
+        Dépôts triés par temps git cumulé, avec l'agrégat par commande et les
+        opérations les plus coûteuses. `repo` (nom du clone) filtre sur un dépôt.
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument("repo", type=str, location="args")
+        parser.add_argument("limit", type=int, default=20, location="args")
+        args = parser.parse_args()
+        return git_report.snapshot(args["repo"], max(1, args["limit"])), 200
@@ -0,0 +1,28 @@
+from flask import current_app as app
+from flask_restful import Resource, reqparse, inputs
+from ..modules.group_analysis import analyze_groups
+
+class GroupStatsAPI(Resource):
+    """API d'analyse des dépôts de projet des groupes, avec contributions par membre."""
+
+    def post(self, group_id=None):
+        """
+        Analyse le groupe `group_id`, ou tous les groupes (en parallèle).
+        Chaque dépôt est cloné ou mis à jour puis parcouru une fois (d'où un POST, comme
+        /api/stats) ; les commits sont rattachés aux membres via leurs comptes git, les
+        emails noreply GitHub et le mailmap.
+        `all_branches: true` (corps JSON) parcourt toutes les branches.
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument("all_branches", type=inputs.boolean, default=False)
+        args = parser.parse_args()
+
+        try:
+            results = analyze_groups([group_id] if group_id is not None else None, args["all_branches"])
+        except Exception as e:
+            app.logger.error(f"Erreur lors de l'analyse des groupes : {e}", exc_info=True)
+            return {"error": str(e)}, 500
+
+        if not results:
+            return {"error": "Aucun groupe trouvé."}, 404
+        return results, 200
@@ -3,6 +3,7 @@
 from flask_restful import Resource
 from flask import request
 from ..utils.database import get_db_connection
+from ..utils.versioning import GROUPS_TABLES, get_version_stamp, is_not_modified, not_modified, cache_headers
 
 class GroupsAPI(Resource):
     """API pour gérer les groupes."""
@@ -38,12 +39,16 @@ class GroupsAPI(Resource):
                 conn.close()
 
     def get(self, gr_id=None):
-        """Récupère un ou plusieurs groupes avec leurs étudiants associés."""
+        """Récupère un ou plusieurs groupes avec leurs étudiants associés (GET conditionnel via ETag)."""
         conn = None
         try:
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
 
+            etag, last_modified = get_version_stamp(cursor, GROUPS_TABLES, scope=gr_id or "")
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
+
             query = """
             SELECT
                 g.id AS group_id,
@@ -88,11 +93,11 @@ class GroupsAPI(Resource):
 
             if gr_id:
                 if groups_data:
-                    return list(groups_data.values())[0], 200
+                    return list(groups_data.values())[0], 200, cache_headers(etag, last_modified)
                 else:
                     return {"message": "Groupe non trouvé"}, 404
             else:
-                return list(groups_data.values()), 200
+                return list(groups_data.values()), 200, cache_headers(etag, last_modified)
         except Exception as e:
             return {"error": str(e)}, 500
         finally:
@@ -0,0 +1,15 @@
+from flask_restful import Resource
+from flask import Response, current_app as app
+from ..utils.dir_manager import CLONES_DIR
+from ..utils.metrics import render_latest, refresh_clone_store_size
+
+class MetricsAPI(Resource):
+    """Exposition des métriques au format Prometheus (agrégées sur tous les workers gunicorn)."""
+
+    def get(self):
+        """Retourne les métriques à scraper (501 si prometheus_client n'est pas installé)."""
+        refresh_clone_store_size(CLONES_DIR, app.config["CLONE_STORE_SIZE_TTL"])
+        body, content_type = render_latest()
+        if body is None:
+            return {"error": "prometheus_client n'est pas installé"}, 501
+        return Response(body, mimetype=None, content_type=content_type)
@@ -1,5 +1,7 @@
 from flask_restful import Resource
 from ..utils.database import get_db_connection
+from ..utils.cache import get_cache
+from ..utils.versioning import GROUP_REPOSITORIES_TABLES, fetch_version_stamp, is_not_modified, not_modified, cache_headers
 from flask import current_app as app
 
 class GroupRepositoriesAPI(Resource):
@@ -12,6 +14,36 @@ class GroupRepositoriesAPI(Resource):
         Récupère tous les repositories appartenant au groupe spécifié par group_id.
         Retourne une liste de dictionnaires {id, name, category}.
         """
+        try:
+            etag, last_modified = fetch_version_stamp(GROUP_REPOSITORIES_TABLES, scope=group_id)
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
+
+            # La version fait partie de la clé : une modification faite par un autre
+            # worker rend l'entrée obsolète sans attendre la fin du TTL.
+            cache = get_cache("group_repositories", app.config["REPOSITORY_CACHE_TTL"])
+            repos = cache.get_or_load((group_id, etag), lambda: self._load_repositories(group_id))
+
+            # Log the repositories.
+            # It's better to log the entire 'repos' list or a representation of it,
+            # rather than a single 'repo' variable which might not exist if 'repos' is empty.
+            if repos:
+                app.logger.debug(f"Repositories du groupe {group_id} : {len(repos)} trouvés.")
+                # If you want to see the actual content, consider logging a slice or iterating.
+                # app.logger.debug(f"Détails : {repos}")
+            else:
+                app.logger.debug(f"Aucun repository trouvé pour le groupe {group_id}.")
+                
+            return repos, 200, cache_headers(etag, last_modified)
+
+        except Exception as e:
+            # Corrected the error message to reflect "group" instead of "student"
+            app.logger.error(f"Erreur dans la récupération des repositories du groupe : {e}")
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def _load_repositories(group_id):
+        """Lecture en base (appelée seulement en cas de miss du cache)."""
         conn = None
         try:
             conn = get_db_connection()
@@ -31,23 +63,7 @@ class GroupRepositoriesAPI(Resource):
             # Process repos to combine owner and name
             for repo in repos:
                 repo['name'] = f"{repo['owner']}/{repo['name']}"
-            
-            # Log the repositories.
-            # It's better to log the entire 'repos' list or a representation of it,
-            # rather than a single 'repo' variable which might not exist if 'repos' is empty.
-            if repos:
-                app.logger.debug(f"Repositories du groupe {group_id} : {len(repos)} trouvés.")
-                # If you want to see the actual content, consider logging a slice or iterating.
-                # app.logger.debug(f"Détails : {repos}")
-            else:
-                app.logger.debug(f"Aucun repository trouvé pour le groupe {group_id}.")
-                
-            return repos, 200
-
-        except Exception as e:
-            # Corrected the error message to reflect "group" instead of "student"
-            app.logger.error(f"Erreur dans la récupération des repositories du groupe : {e}")
-            return {"error": str(e)}, 500
+            return repos
         finally:
             if conn:
                 conn.close()
\ No newline at end of file
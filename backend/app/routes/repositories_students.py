@@ -1,6 +1,8 @@
 from flask_restful import Resource, reqparse
 from flask import request, jsonify
 from ..utils.database import get_db_connection
+from ..utils.cache import get_cache
+from ..utils.versioning import STUDENT_REPOSITORIES_TABLES, fetch_version_stamp, is_not_modified, not_modified, cache_headers
 from flask import current_app as app
 
 class StudentRepositoriesAPI(Resource):
@@ -10,6 +12,28 @@ class StudentRepositoriesAPI(Resource):
     def get(self, student_id):
         """
         """
+        try:
+            etag, last_modified = fetch_version_stamp(STUDENT_REPOSITORIES_TABLES, scope=student_id)
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
+
+            # La version fait partie de la clé : une modification faite par un autre
+            # worker rend l'entrée obsolète sans attendre la fin du TTL.
+            cache = get_cache("student_repositories", app.config["REPOSITORY_CACHE_TTL"])
+            repos = cache.get_or_load((student_id, etag), lambda: self._load_repositories(student_id))
+            for repo in repos:
+                app.logger.debug(f"Repository found: {repo['name']} | Analysis ID: {repo['analysisId']})")
+
+            app.logger.debug(f"Repositories de l'étudiant {student_id} : {len(repos)} trouvés.")
+            return repos, 200, cache_headers(etag, last_modified)
+
+        except Exception as e:
+            app.logger.error(f"Erreur dans la récupération des repositories de l'étudiant : {e}")
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def _load_repositories(student_id):
+        """Lecture en base (appelée seulement en cas de miss du cache)."""
         conn = None
         try:
             conn = get_db_connection()
@@ -27,14 +51,7 @@ class StudentRepositoriesAPI(Resource):
             repos = cursor.fetchall()
             for repo in repos:
                 repo['name'] = f"{repo['owner']}/{repo['name']}"
-                app.logger.debug(f"Repository found: {repo['name']} | Analysis ID: {repo['analysisId']})")
-                
-            app.logger.debug(f"Repositories de l'étudiant {student_id} : {repo}")
-            return repos, 200
-
-        except Exception as e:
-            app.logger.error(f"Erreur dans la récupération des repositories de l'étudiant : {e}")
-            return {"error": str(e)}, 500
+            return repos
         finally:
             if conn:
-                conn.close()
\ No newline at end of file
+                conn.close()
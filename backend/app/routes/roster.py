@@ -0,0 +1,324 @@
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import mysql.connector
+from flask import current_app as app, request
+from flask_restful import Resource
+
+from ..utils.database import get_db_connection
+
+CLASSES = ("MIAGE-FA", "MIAGE-FI", "IM")
+SECTIONS = ("students", "groups", "memberships", "git_accounts")
+
+
+class RosterBulkAPI(Resource):
+    """Synchronisation en masse du référentiel (étudiants, groupes, appartenances, comptes git)."""
+
+    def post(self):
+        """
+        Crée ou met à jour des lignes par lots, chaque lot dans une transaction :
+          {"students":     [{"no_etudiant", "surname", "name", "class", "years": [2025]?}],
+           "groups":       [{"name", "year"}],
+           "memberships":  [{"no_etudiant", "group", "year"}],
+           "git_accounts": [{"no_etudiant", "git_username"}]}
+        Toutes les listes sont facultatives ; elles sont traitées dans cet ordre (une
+        appartenance peut donc viser un étudiant ou un groupe du même appel).
+        Chaque ligne reçoit un statut : "created", "updated", "unchanged" ou "error"
+        (avec "error"). Réponse 200 si tout a réussi, 207 sinon.
+        """
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict) or not any(isinstance(payload.get(s), list) for s in SECTIONS):
+            return {"error": f"Corps JSON attendu avec au moins une liste parmi : {', '.join(SECTIONS)}"}, 400
+
+        conn = get_db_connection()
+        if conn is None:
+            return {"error": "Base de données indisponible"}, 503
+        batch_size = app.config["ROSTER_BATCH_SIZE"]
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        try:
+            cursor = conn.cursor(dictionary=True)
+            _ensure_years(conn, cursor, payload)
+            results["students"] = _upsert_students(conn, cursor, payload.get("students") or [], batch_size)
+            results["groups"] = _upsert_groups(conn, cursor, payload.get("groups") or [], batch_size)
+            results["memberships"] = _upsert_memberships(conn, cursor, payload.get("memberships") or [], batch_size)
+            results["git_accounts"] = _upsert_git_accounts(conn, cursor, payload.get("git_accounts") or [],
+                                                           batch_size)
+        except Exception as e:
+            conn.rollback()
+            app.logger.error(f"Erreur pendant la synchronisation du référentiel : {e}", exc_info=True)
+            return {"error": str(e)}, 500
+        finally:
+            conn.close()
+
+        summary = {section: dict(Counter(row["status"] for row in rows)) for section, rows in results.items()}
+        failed = any(row["status"] == "error" for rows in results.values() for row in rows)
+        return dict(results, summary=summary), 207 if failed else 200
+
+
+# --- Sections -------------------------------------------------------------------
+
+def _upsert_students(conn, cursor, rows: List[Any], batch_size: int) -> List[Dict[str, Any]]:
+    results = []
+    valid = []
+    seen = set()
+    for index, row in enumerate(rows):
+        result = {"index": index, "no_etudiant": row.get("no_etudiant") if isinstance(row, dict) else None}
+        results.append(result)
+        error = _check(row, ("no_etudiant", "surname", "name", "class"))
+        if not error and len(str(row["no_etudiant"])) > 8:
+            error = "no_etudiant : 8 caractères au plus"
+        elif not error and row["class"] not in CLASSES:
+            error = f"class doit valoir {', '.join(CLASSES)}"
+        elif not error and not all(isinstance(y, int) for y in row.get("years") or []):
+            error = "years : liste d'années (entiers) attendue"
+        elif not error and str(row["no_etudiant"]) in seen:
+            error = "no_etudiant en double dans la requête"
+        if error:
+            result.update(status="error", error=error)
+            continue
+        seen.add(str(row["no_etudiant"]))
+        valid.append((index, row))
+
+    for batch in _chunks(valid, batch_size):
+        numbers = [str(row["no_etudiant"]) for _, row in batch]
+        existing = {r["no_etudiant"]: r for r in _select_in(
+            cursor, "SELECT id, no_etudiant, surname, name, class FROM students WHERE no_etudiant IN ({})", numbers)}
+        writes = []
+        for index, row in batch:
+            current = existing.get(str(row["no_etudiant"]))
+            if current is None:
+                results[index]["status"] = "created"
+            elif (current["surname"], current["name"], current["class"]) == (row["surname"], row["name"], row["class"]):
+                results[index]["status"] = "unchanged"
+            else:
+                results[index]["status"] = "updated"
+            writes.append((index, [(str(row["no_etudiant"]), row["surname"], row["name"], row["class"])]
+                           + [(year, str(row["no_etudiant"])) for year in row.get("years") or []]))
+        _execute_batch(conn, cursor, writes, results, [
+            """INSERT INTO students (no_etudiant, surname, name, class) VALUES (%s, %s, %s, %s)
+               ON DUPLICATE KEY UPDATE surname = VALUES(surname), name = VALUES(name), class = VALUES(class)""",
+            """INSERT IGNORE INTO years_students (id_annee, id_student)
+               SELECT %s, id FROM students WHERE no_etudiant = %s""",
+        ])
+        ids = _student_ids(cursor, numbers)
+        for index, row in batch:
+            if results[index]["status"] != "error":
+                results[index]["id"] = ids.get(str(row["no_etudiant"]))
+    return results
+
+
+def _upsert_groups(conn, cursor, rows: List[Any], batch_size: int) -> List[Dict[str, Any]]:
+    results = []
+    valid = []
+    for index, row in enumerate(rows):
+        result = {"index": index}
+        results.append(result)
+        error = _check(row, ("name", "year"))
+        if not error and not isinstance(row["year"], int):
+            error = "year : entier attendu"
+        if error:
+            result.update(status="error", error=error)
+            continue
+        result.update(name=str(row["name"]), year=row["year"])
+        valid.append((index, row))
+
+    for batch in _chunks(valid, batch_size):
+        keys = [(str(row["name"]), row["year"]) for _, row in batch]
+        existing = _group_ids(cursor, keys)
+        writes = []
+        for index, row in batch:
+            key = (str(row["name"]), row["year"])
+            results[index]["status"] = "unchanged" if key in existing else "created"
+            if key not in existing:
+                writes.append((index, [key]))
+        _execute_batch(conn, cursor, writes, results, ["INSERT IGNORE INTO `groups` (name, year) VALUES (%s, %s)"],
+                       counted=0)
+        ids = _group_ids(cursor, keys)
+        for index, row in batch:
+            if results[index]["status"] != "error":
+                results[index]["id"] = ids.get((str(row["name"]), row["year"]))
+    return results
+
+
+def _upsert_memberships(conn, cursor, rows: List[Any], batch_size: int) -> List[Dict[str, Any]]:
+    results = []
+    valid = []
+    for index, row in enumerate(rows):
+        result = {"index": index}
+        results.append(result)
+        error = _check(row, ("no_etudiant", "group", "year"))
+        if not error and not isinstance(row["year"], int):
+            error = "year : entier attendu"
+        if error:
+            result.update(status="error", error=error)
+            continue
+        result.update(no_etudiant=str(row["no_etudiant"]), group=str(row["group"]), year=row["year"])
+        valid.append((index, row))
+
+    for batch in _chunks(valid, batch_size):
+        students = _student_ids(cursor, [str(row["no_etudiant"]) for _, row in batch])
+        groups = _group_ids(cursor, [(str(row["group"]), row["year"]) for _, row in batch])
+        existing = {(r["id_group"], r["id_student"]) for r in _select_in(
+            cursor, "SELECT id_group, id_student FROM groups_students WHERE id_student IN ({})",
+            sorted(set(students.values())))}
+        writes = []
+        for index, row in batch:
+            student_id = students.get(str(row["no_etudiant"]))
+            group_id = groups.get((str(row["group"]), row["year"]))
+            if student_id is None or group_id is None:
+                results[index].update(status="error",
+                                      error="étudiant inconnu" if student_id is None else "groupe inconnu")
+                continue
+            if (group_id, student_id) in existing:
+                results[index]["status"] = "unchanged"
+                continue
+            results[index]["status"] = "created"
+            existing.add((group_id, student_id))
+            # Le trigger de groups_students exige que l'étudiant soit inscrit sur l'année du groupe
+            writes.append((index, [(row["year"], student_id), (group_id, student_id)]))
+        _execute_batch(conn, cursor, writes, results, [
+            "INSERT IGNORE INTO years_students (id_annee, id_student) VALUES (%s, %s)",
+            "INSERT IGNORE INTO groups_students (id_group, id_student) VALUES (%s, %s)",
+        ], counted=1)
+    return results
+
+
+def _upsert_git_accounts(conn, cursor, rows: List[Any], batch_size: int) -> List[Dict[str, Any]]:
+    results = []
+    valid = []
+    for index, row in enumerate(rows):
+        result = {"index": index}
+        results.append(result)
+        error = _check(row, ("no_etudiant", "git_username"))
+        if error:
+            result.update(status="error", error=error)
+            continue
+        result.update(no_etudiant=str(row["no_etudiant"]), git_username=str(row["git_username"]))
+        valid.append((index, row))
+
+    for batch in _chunks(valid, batch_size):
+        students = _student_ids(cursor, [str(row["no_etudiant"]) for _, row in batch])
+        existing = {(r["id_student"], r["git_username"].lower()) for r in _select_in(
+            cursor, "SELECT id_student, git_username FROM student_git_accounts WHERE id_student IN ({})",
+            sorted(set(students.values())))}
+        writes = []
+        for index, row in batch:
+            student_id = students.get(str(row["no_etudiant"]))
+            if student_id is None:
+                results[index].update(status="error", error="étudiant inconnu")
+                continue
+            if (student_id, str(row["git_username"]).lower()) in existing:
+                results[index]["status"] = "unchanged"
+                continue
+            results[index]["status"] = "created"
+            existing.add((student_id, str(row["git_username"]).lower()))
+            writes.append((index, [(student_id, str(row["git_username"]))]))
+        _execute_batch(conn, cursor, writes, results, [
+            "INSERT IGNORE INTO student_git_accounts (id_student, git_username) VALUES (%s, %s)",
+        ], counted=0)
+    return results
+
+
+# --- Outils -----------------------------------------------------------------------
+
+def _ensure_years(conn, cursor, payload: Dict[str, Any]):
+    """Crée en une requête les années citées (étudiants, groupes, appartenances)."""
+    years = set()
+    for row in payload.get("students") or []:
+        if isinstance(row, dict) and isinstance(row.get("years"), list):
+            years.update(y for y in row["years"] if isinstance(y, int))
+    for section in ("groups", "memberships"):
+        for row in payload.get(section) or []:
+            if isinstance(row, dict) and isinstance(row.get("year"), int):
+                years.add(row["year"])
+    if years:
+        cursor.executemany("INSERT IGNORE INTO years (id) VALUES (%s)", [(y,) for y in sorted(years)])
+        conn.commit()
+
+
+def _execute_batch(conn, cursor, writes: List[Tuple[int, List[tuple]]], results: List[Dict[str, Any]],
+                   statements: Sequence[str], counted: Optional[int] = None):
+    """
+    Applique un lot en une transaction : pour chaque requête de `statements`, un
+    executemany sur les paramètres de toutes les lignes (`writes` : [(indice, [paramètres
+    de chaque requête])], une ligne pouvant en avoir plusieurs pour la 2e requête).
+    Si le lot échoue, il est annulé puis rejoué ligne par ligne, chaque ligne dans un
+    point de sauvegarde : les lignes fautives passent en "error", les autres sont validées.
+    `counted` : indice de la requête (INSERT IGNORE) qui crée la ligne. Si elle en ignore
+    certaines (créées entre-temps, ou refusées en avertissement), le lot est aussi rejoué
+    ligne par ligne, et les lignes ignorées passent en "unchanged".
+    """
+    if not writes:
+        return
+    try:
+        for position, statement in enumerate(statements):
+            params = [p for _, row_params in writes for p in _params_for(row_params, position, len(statements))]
+            if not params:
+                continue
+            cursor.executemany(statement, params)
+            if position == counted and cursor.rowcount < len(params):
+                break
+        else:
+            conn.commit()
+            return
+    except mysql.connector.Error:
+        pass
+    conn.rollback()
+
+    for index, row_params in writes:
+        cursor.execute("SAVEPOINT roster_row")
+        try:
+            for position, statement in enumerate(statements):
+                for params in _params_for(row_params, position, len(statements)):
+                    cursor.execute(statement, params)
+                    if position == counted and cursor.rowcount == 0:
+                        results[index]["status"] = "unchanged"
+        except mysql.connector.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT roster_row")
+            results[index].update(status="error", error=str(e))
+            results[index].pop("id", None)
+    conn.commit()
+
+
+def _params_for(row_params: List[tuple], position: int, count: int) -> List[tuple]:
+    """Paramètres d'une ligne pour la requête n° `position` : un jeu par requête, les jeux en trop vont à la dernière."""
+    if position < count - 1:
+        return row_params[position:position + 1]
+    return row_params[position:]
+
+
+def _student_ids(cursor, numbers: Sequence[str]) -> Dict[str, int]:
+    return {r["no_etudiant"]: r["id"] for r in _select_in(
+        cursor, "SELECT id, no_etudiant FROM students WHERE no_etudiant IN ({})", sorted(set(numbers)))}
+
+
+def _group_ids(cursor, keys: Sequence[Tuple[str, int]]) -> Dict[Tuple[str, int], int]:
+    keys = sorted(set(keys))
+    if not keys:
+        return {}
+    cursor.execute(
+        f"SELECT id, name, year FROM `groups` WHERE (name, year) IN ({', '.join(['(%s, %s)'] * len(keys))})",
+        tuple(v for key in keys for v in key)
+    )
+    return {(r["name"], r["year"]): r["id"] for r in cursor.fetchall()}
+
+
+def _select_in(cursor, query: str, values: Sequence[Any]) -> List[Dict[str, Any]]:
+    if not values:
+        return []
+    cursor.execute(query.format(", ".join(["%s"] * len(values))), tuple(values))
+    return cursor.fetchall()
+
+
+def _check(row: Any, fields: Sequence[str]) -> str:
+    """Message d'erreur si `row` n'est pas un objet ou s'il lui manque un champ obligatoire, sinon ""."""
+    if not isinstance(row, dict):
+        return "objet JSON attendu"
+    missing = [f for f in fields if row.get(f) in (None, "")]
+    return f"champ(s) manquant(s) : {', '.join(missing)}" if missing else ""
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
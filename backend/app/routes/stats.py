@@ -1,11 +1,19 @@
-from flask_restful import Resource
-from typing import Optional, Dict, Any
-from flask import current_app as app
-from urllib.parse import urlparse
+from flask_restful import Resource, inputs
+import os
+from typing import Optional, Dict, Any, List
+from flask import current_app as app, request
 from datetime import datetime, timedelta 
-from pydriller import Repository
-from ..utils.dir_manager import DirManager
+from collections import Counter
+from ..utils.dir_manager import DirManager, CLONES_DIR
+from ..utils.git_runner import run_git
 from ..utils.database import get_db_connection
+from ..utils.instrumentation import timed
+from ..utils.git_reader import GitReader
+from ..utils.template_history import detect_template, present_tips
+from ..utils.path_filters import path_filter_for
+from ..utils.sampling import Sampling, SampledHistory
+from ..utils.github_metrics import repository_metrics, FIELDS as GITHUB_FIELDS, SOURCES as METRICS_SOURCES
+
 
 class StatsAPI(Resource):
     def post(self):
@@ -14,7 +22,25 @@ class StatsAPI(Resource):
         # based on what the frontend sends.
         # For now, we'll assume it's a request to analyze a class.
         class_name_to_analyze = None # You might get this from the request body
-        results_class = self.analyze_class(class_name_to_analyze)
+        payload = request.get_json(silent=True) or {}
+        all_branches = payload.get("all_branches", app.config["ANALYSIS_ALL_BRANCHES"])
+        try:
+            # Comme AuditAPI : "false" / "0" valent False, une valeur non booléenne est refusée
+            all_branches = inputs.boolean(all_branches if isinstance(all_branches, bool) else str(all_branches))
+        except ValueError as e:
+            return {"status": "error", "error": f"all_branches : {e}"}, 400
+        try:
+            sampling = Sampling.from_args(payload.get("sample"), payload.get("sample_every"),
+                                          payload.get("sample_size"))
+        except (TypeError, ValueError) as e:
+            return {"status": "error", "error": str(e)}, 400
+        metrics_source = payload.get("metrics_source")
+        if metrics_source is not None and metrics_source not in METRICS_SOURCES:
+            return {"status": "error",
+                    "error": f"metrics_source doit valoir {' ou '.join(METRICS_SOURCES)}"}, 400
+        results_class = self.analyze_class(class_name_to_analyze, all_branches=all_branches,
+                                           paths=payload.get("paths"), sampling=sampling,
+                                           metrics_source=metrics_source)
 
         status_code = 200
         return {"status": "success", "resultsClass": results_class}, status_code
@@ -28,9 +54,24 @@ class StatsAPI(Resource):
         repo_url: str,
         token: Optional[str],
         deadlines_student: Dict[str, str],
-        weights: Optional[Dict[str, float]]
+        weights: Optional[Dict[str, float]],
+        all_branches: bool = False,
+        template: Optional[Dict[str, Any]] = None,
+        paths: Optional[List[str]] = None,
+        sampling: Optional[Sampling] = None,
+        metrics_source: Optional[str] = None
     ) -> Dict[str, Any]:
-        
+        """
+        `all_branches` : compte aussi les commits poussés sur les autres branches
+        (chaque commit une seule fois), avec leur répartition dans `commits_by_branch`.
+        `template` : historique du template (voir detect_template), exclu des comptes
+        et résumé dans `template_excluded`.
+        `paths` : ne compte que les commits et lignes touchant ces chemins.
+        `sampling` : lignes et fichiers extrapolés depuis un échantillon de commits (voir
+        utils/sampling.py), marges d'erreur dans `sampling` ; les commits restent exacts.
+        `metrics_source` : "github" (API) ou "local" (refs et merges du clone, aucun appel
+        réseau) pour les indicateurs nb_* ; voir utils/github_metrics.py.
+        """
         repo_path = DirManager.clone_update_repo(repo_url)
 
         # 2) Initialisation des compteurs
@@ -40,6 +81,8 @@ class StatsAPI(Resource):
         total_deletions = 0
         total_files = 0
         global_score = 0.0
+        commits_by_branch: Counter = Counter()
+        template_tips = []
 
         # 3) Pondérations par défaut si non fournies
         if weights is None:
@@ -51,78 +94,102 @@ class StatsAPI(Resource):
             w_l = weights.get("ligne", 0.5)
             w_f = weights.get("fichier", 0.2)
 
-        # 4) Itérer sur tous les commits avec PyDriller
+        # 4) Itérer sur tous les commits (un seul `git log`, du plus ancien au plus récent)
         try:
-            for commit in Repository(repo_path).traverse_commits():
-                dt = commit.author_date
-                # Ne retenir que les samedis (weekday()==5)
-                if dt.weekday() != 5:
-                    continue
-
-                week_date = dt.strftime("%Y-%m-%d")
-                if week_date not in TDs:
-                    TDs[week_date] = {
-                        "commit_date": dt.strftime("%Y-%m-%d %H:%M"),
-                        "commits": 0,
-                        "additions": 0,
-                        "deletions": 0,
-                        "files": 0,
-                        "score": 0.0,
-                        "percentage": 0.0,
-                        "on_time": True
-                    }
-
-                # Incrémenter le nombre de commits
-                TDs[week_date]["commits"] += 1
-
-                # Parcourir les modifications de fichiers
-                additions = 0
-                deletions = 0
-                touched_files = 0
-                for mod in commit.modified_files:
-                    a = getattr(mod, "added_lines", 0)
-                    d = getattr(mod, "deleted_lines", 0)
-                    additions += a
-                    deletions += d
-                    touched_files += 1
-
-                TDs[week_date]["additions"] += additions
-                TDs[week_date]["deletions"] += deletions
-                TDs[week_date]["files"] += touched_files
-
-                # 5) Vérifier la deadline pour ce samedi
-                #    deadlines_student : { "YYYY-MM-DD": "HH:MM", … } ou {"global": "HH:MM"}
-                if week_date in deadlines_student:
-                    limit_str = f"{week_date} {deadlines_student[week_date]}"
-                    try:
-                        dt_limit = datetime.strptime(limit_str, "%Y-%m-%d %H:%M")
-                        if dt > dt_limit:
-                            TDs[week_date]["on_time"] = False
-                    except Exception:
-                        pass
-                elif "global" in deadlines_student:
-                    limit_str = f"{week_date} {deadlines_student['global']}"
-                    try:
-                        dt_limit = datetime.strptime(limit_str, "%Y-%m-%d %H:%M")
-                        if dt > dt_limit:
-                            TDs[week_date]["on_time"] = False
-                    except Exception:
-                        pass
-
-                # 6) Calcul du score pour ce TD
-                score_TD = (
-                    TDs[week_date]["commits"] * w_c
-                    + (TDs[week_date]["additions"] + TDs[week_date]["deletions"]) * w_l
-                    + TDs[week_date]["files"] * w_f
-                )
-                TDs[week_date]["score"] = round(score_TD, 2)
-
-                # Maj totaux
-                total_commits += TDs[week_date]["commits"]
-                total_additions += TDs[week_date]["additions"]
-                total_deletions += TDs[week_date]["deletions"]
-                total_files += TDs[week_date]["files"]
-                global_score += score_TD
+            with timed("history"), GitReader(repo_path) as reader:
+                membership = reader.branch_membership() if all_branches else {}
+                template_tips = present_tips(reader, template)
+                # Les commits hors `paths` sont écartés ; sans `paths`, tous sont gardés
+                # mais les fichiers exclus par path_filters ne sont pas comptés
+                path_filter = path_filter_for(DirManager.name_from_url(repo_url), include=paths or ())
+                history = SampledHistory(reader, sampling, all_refs=all_branches, exclude=template_tips,
+                                         paths=path_filter.pathspecs(), sparse=not paths)
+                for commit, weight in history:
+                    dt = commit.author_date
+                    # Ne retenir que les samedis (weekday()==5)
+                    if dt.weekday() != 5:
+                        continue
+
+                    week_date = dt.strftime("%Y-%m-%d")
+                    if week_date not in TDs:
+                        TDs[week_date] = {
+                            "commit_date": dt.strftime("%Y-%m-%d %H:%M"),
+                            "commits": 0,
+                            "additions": 0,
+                            "deletions": 0,
+                            "files": 0,
+                            "score": 0.0,
+                            "percentage": 0.0,
+                            "on_time": True
+                        }
+
+                    # Incrémenter le nombre de commits
+                    TDs[week_date]["commits"] += 1
+                    for branch in membership.get(commit.hash, ()):
+                        commits_by_branch[branch] += 1
+
+                    # Parcourir les modifications de fichiers
+                    additions = 0
+                    deletions = 0
+                    touched_files = 0
+                    for mod in commit.modified_files:
+                        a = getattr(mod, "added_lines", 0)
+                        d = getattr(mod, "deleted_lines", 0)
+                        additions += a
+                        deletions += d
+                        touched_files += 1
+
+                    TDs[week_date]["additions"] += additions * weight
+                    TDs[week_date]["deletions"] += deletions * weight
+                    TDs[week_date]["files"] += touched_files * weight
+                    history.add("additions", additions)
+                    history.add("deletions", deletions)
+                    history.add("files", touched_files)
+                    history.add(("lines", week_date), additions + deletions)
+
+                    # 5) Vérifier la deadline pour ce samedi
+                    #    deadlines_student : { "YYYY-MM-DD": "HH:MM", … } ou {"global": "HH:MM"}
+                    if week_date in deadlines_student:
+                        limit_str = f"{week_date} {deadlines_student[week_date]}"
+                        try:
+                            dt_limit = datetime.strptime(limit_str, "%Y-%m-%d %H:%M")
+                            if dt > dt_limit:
+                                TDs[week_date]["on_time"] = False
+                        except Exception:
+                            pass
+                    elif "global" in deadlines_student:
+                        limit_str = f"{week_date} {deadlines_student['global']}"
+                        try:
+                            dt_limit = datetime.strptime(limit_str, "%Y-%m-%d %H:%M")
+                            if dt > dt_limit:
+                                TDs[week_date]["on_time"] = False
+                        except Exception:
+                            pass
+
+                    # 6) Calcul du score pour ce TD
+                    score_TD = (
+                        TDs[week_date]["commits"] * w_c
+                        + (TDs[week_date]["additions"] + TDs[week_date]["deletions"]) * w_l
+                        + TDs[week_date]["files"] * w_f
+                    )
+                    TDs[week_date]["score"] = round(score_TD, 2)
+
+                    # Maj totaux
+                    total_commits += TDs[week_date]["commits"]
+                    total_additions += TDs[week_date]["additions"]
+                    total_deletions += TDs[week_date]["deletions"]
+                    total_files += TDs[week_date]["files"]
+                    global_score += score_TD
+
+            # Comptes extrapolés (échantillonnage) : ramenés à des entiers
+            if not history.exact:
+                for week_date, info in TDs.items():
+                    for field in ("additions", "deletions", "files"):
+                        info[field] = round(info[field])
+                    info["lines_margin"] = round(history.margin(("lines", week_date)))
+                total_additions = round(total_additions)
+                total_deletions = round(total_deletions)
+                total_files = round(total_files)
 
             # 7) Calculer les pourcentages par TD (par rapport au total de lignes modifiées)
             total_lines = total_additions + total_deletions
@@ -137,73 +204,12 @@ class StatsAPI(Resource):
         except Exception as e:
             return {"error": f"Erreur pendant l’analyse des TDs de {student_name} {student_surname}: {e}"}
 
-            # 8) Récupérer quelques indicateurs GitHub (branches, PR, issues, reviews, CI/CD)
-        nb_branches = nb_pr_total = nb_pr_open = nb_pr_closed = nb_pr_merged = 0
-        nb_reviews = 0
-        nb_ci_total = nb_ci_success = nb_ci_failure = 0
-
+        # 8) Indicateurs GitHub (branches, PR, reviews, CI/CD) : API ou données locales
         try:
-            from requests import get as _get
-            parsed = urlparse(repo_url)
-            owner, repo = parsed.path.strip("/").replace(".git", "").split("/", 1)
-            headers = {"Accept": "application/vnd.github.v3+json"}
-            if token:
-                headers["Authorization"] = f"token {token}"
-
-            # -- Branches
-            bres = _get(f"https://api.github.com/repos/{owner}/{repo}/branches", headers=headers)
-            if bres.ok:
-                nb_branches = len(bres.json())
-
-            # -- Pull‐requests (toutes)
-            prs = []
-            page = 1
-            while True:
-                r = _get(
-                    f"https://api.github.com/repos/{owner}/{repo}/pulls?state=all&per_page=100&page={page}",
-                    headers=headers
-                )
-                if not r.ok:
-                    break
-                batch = r.json()
-                if not batch:
-                    break
-                prs.extend(batch)
-                page += 1
-            nb_pr_total = len(prs)
-            nb_pr_open = sum(1 for pr in prs if pr.get("state") == "open")
-            nb_pr_closed = sum(1 for pr in prs if pr.get("state") == "closed")
-            nb_pr_merged = sum(1 for pr in prs if pr.get("merged_at") is not None)
-
-            # -- Code reviews
-            for pr in prs:
-                num = pr.get("number")
-                rr = _get(f"https://api.github.com/repos/{owner}/{repo}/pulls/{num}/reviews", headers=headers)
-                if rr.ok:
-                    nb_reviews += len(rr.json())
-
-            # -- CI/CD via GitHub Actions
-            runs = []
-            page = 1
-            while True:
-                cr = _get(
-                    f"https://api.github.com/repos/{owner}/{repo}/actions/runs?per_page=100&page={page}",
-                    headers=headers
-                )
-                if not cr.ok:
-                    break
-                data = cr.json().get("workflow_runs", [])
-                if not data:
-                    break
-                runs.extend(data)
-                page += 1
-            nb_ci_total = len(runs)
-            nb_ci_success = sum(1 for run in runs if run.get("conclusion") == "success")
-            nb_ci_failure = sum(1 for run in runs if run.get("conclusion") not in (None, "success"))
-
+            github = repository_metrics(repo_url, token, metrics_source, repo_path=repo_path)
         except Exception as e:
-            # en cas d’erreur, on laisse tout à 0
-            print(f"❌ Erreur GitHub API pour {owner}/{repo} : {e}")
+            app.logger.warning(f"Indicateurs GitHub indisponibles pour {repo_url} : {e}")
+            github = dict({field: 0 for field in GITHUB_FIELDS}, metrics_source="unavailable")
 
         # 9) Nettoyage du clone (Ne pas nettoyer le clone car cela
         # permet de ne pas le retélécharger à chaque fois)
@@ -215,7 +221,7 @@ class StatsAPI(Resource):
 
 
         # 10) Retour avec les nouveaux champs
-        return {
+        result = {
             "student_id": student_id,
             "student_name": student_name,
             "student_surname": student_surname,
@@ -225,19 +231,133 @@ class StatsAPI(Resource):
             "total_deletions": total_deletions,
             "total_files": total_files,
             "global_score": round(global_score, 2),
-            "nb_branches": nb_branches,
-            "nb_pr_total": nb_pr_total,
-            "nb_pr_open": nb_pr_open,
-            "nb_pr_closed": nb_pr_closed,
-            "nb_pr_merged": nb_pr_merged,
-            "nb_reviews": nb_reviews,
-            "nb_ci_total": nb_ci_total,
-            "nb_ci_success": nb_ci_success,
-            "nb_ci_failure": nb_ci_failure
+            **github,
+            "sampling": history.report({"additions": "additions", "deletions": "deletions", "files": "files"})
         }
-
-
-    def analyze_class(self, class_name: Optional[str] = None) -> Dict[str, Any]:
+        if all_branches:
+            result["commits_by_branch"] = dict(commits_by_branch)
+        if template_tips:
+            result["template_excluded"] = {
+                k: template[k] for k in ("source", "commits", "additions", "deletions", "files")
+            }
+        return result
+
+
+    @staticmethod
+    def _student_deadlines(student_class: str, deadlines_map: Dict[str, Any]) -> Dict[str, str]:
+        """Deadlines {date: heure} applicables à un étudiant, selon sa classe (IM ou MIAGE)."""
+        student_deadlines = {}
+        if 'IM' in student_class and 'im' in deadlines_map:
+            for dl_entry in deadlines_map['im']:
+                student_deadlines[dl_entry['event_date']] = dl_entry['event_time']
+        elif 'MIAGE' in student_class and 'miage' in deadlines_map:
+            for dl_entry in deadlines_map['miage']:
+                student_deadlines[dl_entry['event_date']] = dl_entry['event_time']
+        return student_deadlines
+
+    @staticmethod
+    def plan_class_analysis(students_repos, deadlines_map) -> List[Dict[str, Any]]:
+        """
+        Regroupe les lignes (étudiant, repo) de la base en dépôts à analyser une seule fois :
+        un étudiant avec plusieurs comptes git revient plusieurs fois, un dépôt partagé
+        par plusieurs étudiants aussi. Chaque élément :
+          {"repo_url", "token", "deadlines", "students": [{student_id, student_name, student_surname}]}
+        Deux étudiants d'un même dépôt mais de classes aux deadlines différentes donnent
+        deux éléments (le résultat dépend des deadlines).
+        """
+        plan: Dict[Any, Dict[str, Any]] = {}
+        for row in students_repos:
+            student_class = row['student_class'] or ""
+            deadlines = StatsAPI._student_deadlines(student_class, deadlines_map)
+            key = (row['repo_url'], tuple(sorted(deadlines.items())))
+            item = plan.setdefault(key, {
+                "repo_url": row['repo_url'],
+                "token": None,
+                "deadlines": deadlines,
+                "students": [],
+            })
+            # git_username sert de jeton (voir _fetch_class_rows) : la dernière ligne renseignée l'emporte
+            if row['token']:
+                item["token"] = row['token']
+            if all(st["student_id"] != row['student_id'] for st in item["students"]):
+                item["students"].append({
+                    "student_id": row['student_id'],
+                    "student_name": row['student_name'],
+                    "student_surname": row['student_surname'],
+                })
+        return list(plan.values())
+
+    @staticmethod
+    def _fetch_class_rows(cursor, class_name: Optional[str] = None):
+        """(lignes étudiant/repo TD, deadlines par type de classe) lues en base."""
+        # Étape 1: Récupérer les étudiants et leurs repos TD
+        query_students = """
+        SELECT
+            s.id AS student_id,
+            s.surname AS student_surname,
+            s.name AS student_name,
+            s.class AS student_class,
+            r.repo_url,
+            sga.git_username AS token # Assuming git_username can be used as a token, or fetch actual tokens if available
+        FROM
+            students s
+        JOIN
+            repositories_students rs ON s.id = rs.id_student
+        JOIN
+            repositories r ON rs.id_repo = r.id
+        LEFT JOIN
+            student_git_accounts sga ON s.id = sga.id_student
+        WHERE
+            r.category = 'TD'
+        """
+        params_students = ()
+        if class_name:
+            query_students += " AND s.class = %s"
+            params_students = (class_name,)
+
+        cursor.execute(query_students, params_students)
+        students_repos = cursor.fetchall()
+
+        # Étape 2: Récupérer les deadlines configurables
+        query_deadlines = """
+        SELECT
+            type, event_date, event_time, description
+        FROM
+            configurable_deadlines
+        """
+        cursor.execute(query_deadlines)
+        deadlines_data = cursor.fetchall()
+
+        deadlines_map = {}
+        for dl in deadlines_data:
+            deadline_type = dl['type'].lower()
+            event_date = dl['event_date'].strftime('%Y-%m-%d')
+            
+            # Handle timedelta for event_time
+            event_time_obj = dl['event_time']
+            if isinstance(event_time_obj, timedelta):
+                total_seconds = int(event_time_obj.total_seconds())
+                hours, remainder = divmod(total_seconds, 3600)
+                minutes, seconds = divmod(remainder, 60)
+                event_time = f"{hours:02d}:{minutes:02d}"
+            else: # Assuming it's already a datetime.time object
+                event_time = event_time_obj.strftime('%H:%M')
+            
+            description = dl['description']
+
+            if deadline_type not in deadlines_map:
+                deadlines_map[deadline_type] = []
+            deadlines_map[deadline_type].append({
+                "event_date": event_date,
+                "event_time": event_time,
+                "description": description
+            })
+
+        return students_repos, deadlines_map
+
+    def analyze_class(self, class_name: Optional[str] = None, all_branches: bool = False,
+                      paths: Optional[List[str]] = None, sampling: Optional[Sampling] = None,
+                      metrics_source: Optional[str] = None) -> Dict[str, Any]:
         """
         Iterates over all students, fetches their TD repositories and deadlines
         from the database, calls analyze_student, and returns the results.
@@ -248,105 +368,48 @@ class StatsAPI(Resource):
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
 
-            # Étape 1: Récupérer les étudiants et leurs repos TD
-            query_students = """
-            SELECT
-                s.id AS student_id,
-                s.surname AS student_surname,
-                s.name AS student_name,
-                s.class AS student_class,
-                r.repo_url,
-                sga.git_username AS token # Assuming git_username can be used as a token, or fetch actual tokens if available
-            FROM
-                students s
-            JOIN
-                repositories_students rs ON s.id = rs.id_student
-            JOIN
-                repositories r ON rs.id_repo = r.id
-            LEFT JOIN
-                student_git_accounts sga ON s.id = sga.id_student
-            WHERE
-                r.category = 'TD'
-            """
-            params_students = ()
-            if class_name:
-                query_students += " AND s.class = %s"
-                params_students = (class_name,)
-
-            cursor.execute(query_students, params_students)
-            students_repos = cursor.fetchall()
-
-            # Étape 2: Récupérer les deadlines configurables
-            query_deadlines = """
-            SELECT
-                type, event_date, event_time, description
-            FROM
-                configurable_deadlines
-            """
-            cursor.execute(query_deadlines)
-            deadlines_data = cursor.fetchall()
-
-            deadlines_map = {}
-            for dl in deadlines_data:
-                deadline_type = dl['type'].lower()
-                event_date = dl['event_date'].strftime('%Y-%m-%d')
-                
-                # Handle timedelta for event_time
-                event_time_obj = dl['event_time']
-                if isinstance(event_time_obj, timedelta):
-                    total_seconds = int(event_time_obj.total_seconds())
-                    hours, remainder = divmod(total_seconds, 3600)
-                    minutes, seconds = divmod(remainder, 60)
-                    event_time = f"{hours:02d}:{minutes:02d}"
-                else: # Assuming it's already a datetime.time object
-                    event_time = event_time_obj.strftime('%H:%M')
-                
-                description = dl['description']
-
-                if deadline_type not in deadlines_map:
-                    deadlines_map[deadline_type] = []
-                deadlines_map[deadline_type].append({
-                    "event_date": event_date,
-                    "event_time": event_time,
-                    "description": description
-                })
+            students_repos, deadlines_map = self._fetch_class_rows(cursor, class_name)
+
+            # Étape 3: Plan de travail dédupliqué (un dépôt analysé une seule fois)
+            plan = self.plan_class_analysis(students_repos, deadlines_map)
 
+            # Historique du template commun à la cohorte, repéré une fois pour tous les étudiants,
+            # après avoir récupéré tous les dépôts du plan dans la réserve d'objets : sinon, au
+            # premier passage, la cohorte serait incomplète et le template compté chez chacun
+            DirManager.update_pool(item["repo_url"] for item in plan)
+            template = detect_template(DirManager.name_from_url(item["repo_url"]) for item in plan)
 
             results_total: Dict[str, Any] = {}
             weights = None # You might want to get weights from another source or make them configurable
 
-            # Analyse des étudiants et de leurs TDs
-            for student_repo_info in students_repos:
-                student_id = student_repo_info['student_id']
-                student_name = student_repo_info['student_name']
-                student_surname = student_repo_info['student_surname']
-                repo_url = student_repo_info['repo_url']
-                token = student_repo_info['token'] # This assumes git_username can serve as a token, which is unlikely. You'll need a proper token management.
-                student_class = student_repo_info['student_class']
-
-                # Determine deadlines for the student based on their class
-                student_deadlines = {}
-                if 'IM' in student_class and 'im' in deadlines_map:
-                    for dl_entry in deadlines_map['im']:
-                        student_deadlines[dl_entry['event_date']] = dl_entry['event_time']
-                elif 'MIAGE' in student_class and 'miage' in deadlines_map:
-                    for dl_entry in deadlines_map['miage']:
-                        student_deadlines[dl_entry['event_date']] = dl_entry['event_time']
-
+            # Analyse de chaque dépôt, puis copie du résultat pour chacun de ses étudiants
+            for item in plan:
+                first = item["students"][0]
+                names = ", ".join(f"{st['student_name']} {st['student_surname']}" for st in item["students"])
                 try:
-                    print(f"▶️ Analyse du TD de {student_name} {student_surname} ({repo_url}) …")
+                    print(f"▶️ Analyse du TD de {names} ({item['repo_url']}) …")
                     res = self.analyze_student(
-                        student_id,
-                        student_name,
-                        student_surname,
-                        repo_url,
-                        token,
-                        student_deadlines,
-                        weights
+                        first["student_id"],
+                        first["student_name"],
+                        first["student_surname"],
+                        item["repo_url"],
+                        item["token"],
+                        item["deadlines"],
+                        weights,
+                        all_branches=all_branches,
+                        template=template,
+                        paths=paths,
+                        sampling=sampling,
+                        metrics_source=metrics_source
                     )
-                    results_total[f"student_{student_id}"] = res
                 except Exception as e:
-                    results_total[f"student_{student_id}"] = {"error": f"Exception inattendue pour {student_name} {student_surname} : {e}"}
+                    res = {"error": f"Exception inattendue pour {names} : {e}"}
+
+                for st in item["students"]:
+                    if "error" in res:
+                        results_total[f"student_{st['student_id']}"] = res
+                    else:
+                        results_total[f"student_{st['student_id']}"] = dict(res, **st)
 
             # The section for 'Analyse des groupes et de leurs projets' has been removed.
             # This ensures only TD repositories are processed.
@@ -368,7 +431,52 @@ class StatsAPI(Resource):
             if conn:
                 conn.close()
 
-    # You might want to add a similar analyze_group method here
-    # def analyze_group(self, group_id: int, group_name: str, repo_url: str, token: Optional[str], deadlines_group: Dict[str, str], weights: Optional[Dict[str, float]]) -> Dict[str, Any]:
-    #     # This method would be similar to analyze_student but tailored for group project analysis
-    #     pass
\ No newline at end of file
+    # Projets de groupe : voir modules/group_analysis.py (POST /api/groups/stats)
+
+
+class StatsPlanAPI(Resource):
+    def get(self):
+        """
+        Plan (sans rien lancer) de l'analyse d'une classe : dépôts uniques à analyser,
+        étudiants de chacun et coût estimé (clone à faire, commits déjà présents en local).
+        """
+        class_name = request.args.get("class_name")
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            students_repos, deadlines_map = StatsAPI._fetch_class_rows(cursor, class_name)
+        except Exception as e:
+            app.logger.error(f"Erreur lors de la préparation du plan d'analyse : {e}")
+            return {"error": str(e)}, 500
+        finally:
+            if conn:
+                conn.close()
+
+        plan = StatsAPI.plan_class_analysis(students_repos, deadlines_map)
+        items = []
+        for item in plan:
+            clone_path = os.path.join(CLONES_DIR, DirManager.name_from_url(item["repo_url"]))
+            cloned = os.path.isdir(clone_path) and DirManager.is_valid_git_repo(clone_path)
+            commits = None
+            if cloned:
+                count = run_git(["rev-list", "--count", "--all"], repo=clone_path, check=False, text=True)
+                commits = int(count.stdout) if count.returncode == 0 and count.stdout.strip().isdigit() else None
+            items.append({
+                "repo_url": item["repo_url"],
+                "students": item["students"],
+                "deadlines": item["deadlines"],
+                "cloned": cloned,
+                "commits": commits,
+            })
+
+        return {
+            "class_name": class_name,
+            "rows": len(students_repos),
+            "students": len({row['student_id'] for row in students_repos}),
+            "repositories": len(plan),
+            "analyses_avoided": len(students_repos) - len(plan),
+            "to_clone": sum(1 for i in items if not i["cloned"]),
+            "known_commits": sum(i["commits"] or 0 for i in items),
+            "plan": items,
+        }, 200
@@ -2,7 +2,11 @@ from flask_restful import Resource, reqparse
 from flask import request, jsonify
 from ..utils.database import get_db_connection
 from ..utils.json_to_db import JSONToDB
+from ..utils.versioning import STUDENTS_TABLES, get_version_stamp, is_not_modified, not_modified, cache_headers
 from flask import current_app as app
+import json
+import mysql.connector
+from mysql.connector import errorcode
 
 class StudentsAPI(Resource):
     """API pour gérer les étudiants."""
@@ -55,124 +59,161 @@ class StudentsAPI(Resource):
         """
         Récupère tous les étudiants avec leurs groupes, années associées,
         et tous les repositories relatifs à l'étudiant (directs et indirects via groupes).
+        Supporte le GET conditionnel (ETag / If-None-Match) : 304 si rien n'a changé.
         """
         conn = None
         try:
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
 
-            # Étape 1: Récupérer infos étudiants, groupes et années
-            query = """
-            SELECT
-                s.id AS student_id,
-                s.surname AS student_surname,
-                s.name AS student_name,
-                s.no_etudiant AS student_no_etudiant,
-                s.class AS student_class,
-                g.id AS group_id,
-                g.name AS group_name,
-                g.year AS group_year,
-                ys.id_annee AS assigned_year
-            FROM
-                `students` s
-            LEFT JOIN
-                `groups_students` gs ON s.id = gs.id_student
-            LEFT JOIN
-                `groups` g ON gs.id_group = g.id
-            LEFT JOIN
-                `years_students` ys ON s.id = ys.id_student
-            """
-            params = ()
+            etag, last_modified = get_version_stamp(cursor, STUDENTS_TABLES, scope=st_id or "")
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
 
-            if st_id:
-                query += " WHERE s.id = %s"
-                params = (st_id,)
-            query += " ORDER BY s.surname, s.name, s.class, g.name, g.year, ys.id_annee;"
-
-            cursor.execute(query, params)
-            students_data = {}
-            for row in cursor.fetchall():
-                student_id = row['student_id']
-                if student_id not in students_data:
-                    students_data[student_id] = {
-                        "id": row['student_id'],
-                        "surname": row['student_surname'],
-                        "name": row['student_name'],
-                        "no_etudiant": row['student_no_etudiant'],
-                        "class": row['student_class'],
-                        "git_usernames": [], # Initialize an empty list for git usernames
-                        "groups": [],
-                        "years_assigned": [],
-                        "repositories_projet": [],
-                        "repositories_td": []
-                    }
-
-                # Add group if not already present
-                if row['group_id'] is not None:
-                    group_info = {
-                        "id": row['group_id'],
-                        "name": row['group_name'],
-                        "year": row['group_year']
-                    }
-                    if group_info not in students_data[student_id]["groups"]:
-                        students_data[student_id]["groups"].append(group_info)
-
-                # Add year if not already present
-                if row['assigned_year'] is not None:
-                    if row['assigned_year'] not in students_data[student_id]["years_assigned"]:
-                        students_data[student_id]["years_assigned"].append(row['assigned_year'])
-
-            # ===============================
-            # Étape 2: Récupérer les comptes Git pour chaque étudiant
-            # ===============================
-            for student_id, student in students_data.items():
-                cursor.execute("""
-                    SELECT git_username
-                    FROM student_git_accounts
-                    WHERE id_student = %s
-                """, (student_id,))
-                git_accounts = cursor.fetchall()
-                student['git_usernames'] = [account['git_username'] for account in git_accounts]
-
-            # ===============================
-            # Étape 3: Récupérer les repositories pour chaque étudiant
-            # ===============================
-            for student_id, student in students_data.items(): # Loop again for repositories
-                # Repositories linked directly to the student (category 'TD')
-                cursor.execute("""
-                    SELECT r.id, r.name, r.category, r.owner, r.repo_url
-                    FROM repositories_students rs
-                    INNER JOIN repositories r ON rs.id_repo = r.id
-                    WHERE rs.id_student = %s
-                    AND r.category = 'TD'
-                """, (student_id,))
-                repos_directs = cursor.fetchall()
-                student['repositories_td'] = repos_directs # Directly assign list of dicts
-
-                # Repositories linked to the student's groups (category 'projet')
-                group_ids = [g['id'] for g in student['groups']]
-                if group_ids:
-                    format_strings = ','.join(['%s'] * len(group_ids))
-                    cursor.execute(f"""
-                        SELECT DISTINCT r.id, r.name, r.category, r.owner, r.repo_url, rg.id_group
-                        FROM repositories_groups rg
-                        INNER JOIN repositories r ON rg.id_repo = r.id
-                        WHERE rg.id_group IN ({format_strings})
-                        AND r.category = 'projet'
-                    """, tuple(group_ids))
-                    repos_groupes = cursor.fetchall()
-                    student['repositories_projet'] = repos_groupes # Directly assign list of dicts
+            # Lecture directe de la table matérialisée `student_overview`
+            # (maintenue par triggers), sinon reconstruction par jointures.
+            students = self._get_from_overview(cursor, st_id)
+            if students is None:
+                students = self._get_from_tables(cursor, st_id)
 
             if st_id:
-                if students_data:
-                    return list(students_data.values())[0], 200
+                if students:
+                    return students[0], 200, cache_headers(etag, last_modified)
                 else:
                     return {"message": "Étudiant non trouvé"}, 404
             else:
-                return list(students_data.values()), 200
+                return students, 200, cache_headers(etag, last_modified)
         except Exception as e:
             app.logger.error(f"Error fetching student data: {e}", exc_info=True) # Log full traceback
             return {"error": str(e)}, 500
         finally:
             if conn:
-                conn.close()
\ No newline at end of file
+                conn.close()
+
+    @staticmethod
+    def _get_from_overview(cursor, st_id=None):
+        """
+        Liste des étudiants lue en une requête indexée sur `student_overview`.
+        Retourne None si la table n'existe pas (migration 003 non appliquée).
+        """
+        query = "SELECT overview FROM student_overview"
+        params = ()
+        if st_id:
+            query += " WHERE id_student = %s"
+            params = (st_id,)
+        query += " ORDER BY surname, name, class"
+        try:
+            cursor.execute(query, params)
+        except mysql.connector.errors.ProgrammingError as e:
+            if e.errno != errorcode.ER_NO_SUCH_TABLE:
+                raise
+            app.logger.debug("Table student_overview absente : lecture par jointures.")
+            return None
+        return [json.loads(row['overview']) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _get_from_tables(cursor, st_id=None):
+        """Reconstruit la liste des étudiants à partir des tables normalisées."""
+        # Étape 1: Récupérer infos étudiants, groupes et années
+        query = """
+        SELECT
+            s.id AS student_id,
+            s.surname AS student_surname,
+            s.name AS student_name,
+            s.no_etudiant AS student_no_etudiant,
+            s.class AS student_class,
+            g.id AS group_id,
+            g.name AS group_name,
+            g.year AS group_year,
+            ys.id_annee AS assigned_year
+        FROM
+            `students` s
+        LEFT JOIN
+            `groups_students` gs ON s.id = gs.id_student
+        LEFT JOIN
+            `groups` g ON gs.id_group = g.id
+        LEFT JOIN
+            `years_students` ys ON s.id = ys.id_student
+        """
+        params = ()
+
+        if st_id:
+            query += " WHERE s.id = %s"
+            params = (st_id,)
+        query += " ORDER BY s.surname, s.name, s.class, g.name, g.year, ys.id_annee;"
+
+        cursor.execute(query, params)
+        students_data = {}
+        for row in cursor.fetchall():
+            student_id = row['student_id']
+            if student_id not in students_data:
+                students_data[student_id] = {
+                    "id": row['student_id'],
+                    "surname": row['student_surname'],
+                    "name": row['student_name'],
+                    "no_etudiant": row['student_no_etudiant'],
+                    "class": row['student_class'],
+                    "git_usernames": [], # Initialize an empty list for git usernames
+                    "groups": [],
+                    "years_assigned": [],
+                    "repositories_projet": [],
+                    "repositories_td": []
+                }
+
+            # Add group if not already present
+            if row['group_id'] is not None:
+                group_info = {
+                    "id": row['group_id'],
+                    "name": row['group_name'],
+                    "year": row['group_year']
+                }
+                if group_info not in students_data[student_id]["groups"]:
+                    students_data[student_id]["groups"].append(group_info)
+
+            # Add year if not already present
+            if row['assigned_year'] is not None:
+                if row['assigned_year'] not in students_data[student_id]["years_assigned"]:
+                    students_data[student_id]["years_assigned"].append(row['assigned_year'])
+
+        # ===============================
+        # Étape 2: Récupérer les comptes Git pour chaque étudiant
+        # ===============================
+        for student_id, student in students_data.items():
+            cursor.execute("""
+                SELECT git_username
+                FROM student_git_accounts
+                WHERE id_student = %s
+            """, (student_id,))
+            git_accounts = cursor.fetchall()
+            student['git_usernames'] = [account['git_username'] for account in git_accounts]
+
+        # ===============================
+        # Étape 3: Récupérer les repositories pour chaque étudiant
+        # ===============================
+        for student_id, student in students_data.items(): # Loop again for repositories
+            # Repositories linked directly to the student (category 'TD')
+            cursor.execute("""
+                SELECT r.id, r.name, r.category, r.owner, r.repo_url
+                FROM repositories_students rs
+                INNER JOIN repositories r ON rs.id_repo = r.id
+                WHERE rs.id_student = %s
+                AND r.category = 'TD'
+            """, (student_id,))
+            repos_directs = cursor.fetchall()
+            student['repositories_td'] = repos_directs # Directly assign list of dicts
+
+            # Repositories linked to the student's groups (category 'projet')
+            group_ids = [g['id'] for g in student['groups']]
+            if group_ids:
+                format_strings = ','.join(['%s'] * len(group_ids))
+                cursor.execute(f"""
+                    SELECT DISTINCT r.id, r.name, r.category, r.owner, r.repo_url, rg.id_group
+                    FROM repositories_groups rg
+                    INNER JOIN repositories r ON rg.id_repo = r.id
+                    WHERE rg.id_group IN ({format_strings})
+                    AND r.category = 'projet'
+                """, tuple(group_ids))
+                repos_groupes = cursor.fetchall()
+                student['repositories_projet'] = repos_groupes # Directly assign list of dicts
+
+        return list(students_data.values())
\ No newline at end of file
@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import ijson  # décodage JSON incrémental des gros payloads /api/analysis-data
+from flask import current_app as app
+from .instrumentation import timed
+from . import metrics
+
+
+class ArcheologistClient:
+    """
+    Client HTTP partagé vers le service Node.js « archeologist ».
+    Une seule session (pool de connexions keep-alive) est réutilisée par
+    tous les appels, avec timeouts et retry exponentiel.
+    """
+
+    def __init__(self, base_url: str, connect_timeout: float, read_timeout: float,
+                 retries: int, backoff: float, pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Les POST (/api/analyze) ne sont rejoués que sur erreur de connexion :
+        # une analyse déjà démarrée côté Node ne doit pas être relancée.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            with timed("archeologist"):
+                return self.session.get(self.url(path), **kwargs)
+        finally:
+            metrics.observe_archeologist_call("GET", path, time.perf_counter() - start)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            with timed("archeologist"):
+                return self.session.post(self.url(path), **kwargs)
+        finally:
+            metrics.observe_archeologist_call("POST", path, time.perf_counter() - start)
+
+    def analyze(self, repo_url: str, local: bool = True) -> requests.Response:
+        """Lance l'analyse d'un dépôt (POST /api/analyze)."""
+        return self.post("/api/analyze", json={"repoUrl": repo_url, "local": local})
+
+    def get_analysis_file_paths(self, analysis_id) -> Dict[str, Any]:
+        """
+        Ne récupère de /api/analysis-data que ce dont le post-traitement a besoin :
+        status, message, data.id et les chemins (clés) de data.file_changes.
+        Le payload est décodé en flux avec ijson : ni la liste `codeEvolution` ni
+        les valeurs de `file_changes` ne sont matérialisées en mémoire. Le payload
+        complet n'est jamais décodé côté Flask (voir AnalysisDataAPI, qui le relaie).
+        """
+        with self.get("/api/analysis-data", params={"analysisId": analysis_id}, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            try:
+                return _stream_file_paths(response.raw)
+            except ijson.JSONError as e:
+                raise ValueError(f"analysis-data invalide : {e}") from e
+
+
+def _stream_file_paths(stream) -> Dict[str, Any]:
+    summary = {"status": None, "message": None, "id": None, "file_paths": []}
+    for prefix, event, value in ijson.parse(stream):
+        if prefix == "data.file_changes" and event == "map_key":
+            summary["file_paths"].append(value)
+        elif prefix in ("status", "message") and event == "string":
+            summary[prefix] = value
+        elif prefix == "data.id" and event in ("number", "string"):
+            summary["id"] = value
+    return summary
+
+
+_client: Optional[ArcheologistClient] = None
+_client_lock = threading.Lock()
+
+
+def get_archeologist_client() -> ArcheologistClient:
+    """Retourne le client partagé (créé à la première utilisation depuis la config Flask)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                config = app.config
+                _client = ArcheologistClient(
+                    base_url=config["ARCHEOLOGIST_URL"],
+                    connect_timeout=config["ARCHEOLOGIST_CONNECT_TIMEOUT"],
+                    read_timeout=config["ARCHEOLOGIST_READ_TIMEOUT"],
+                    retries=config["ARCHEOLOGIST_RETRIES"],
+                    backoff=config["ARCHEOLOGIST_BACKOFF"],
+                )
+    return _client
@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Petit cache mémoire (par processus) à durée de vie limitée, thread-safe.
+    Compte les hits/misses pour pouvoir régler le TTL.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Incrémenté par invalidate() : une valeur chargée avant une invalidation n'est pas mémorisée
+        self._generation = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Retourne la valeur en cache, ou appelle `loader()` et la mémorise (read-through)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            if generation != self._generation:
+                # Invalidé pendant le chargement : la valeur est peut-être déjà périmée
+                return value
+            if len(self._entries) >= self.max_entries:
+                self._evict_expired(now)
+                if len(self._entries) >= self.max_entries:
+                    # Toujours plein : on retire l'entrée qui expire le plus tôt
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Supprime une entrée, ou tout le cache si `key` est None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def _evict_expired(self, now: float):
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "ttl": self.ttl,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, ttl: float) -> TTLCache:
+    """Retourne (en le créant au besoin) le cache nommé `name`."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = TTLCache(name, ttl)
+        return _caches[name]
+
+
+def invalidate_repository_listings():
+    """
+    À appeler dès que les liens repositories_groups / repositories_students
+    ou repositories.analysisId changent.
+    """
+    for name in ("group_repositories", "student_repositories"):
+        cache = _caches.get(name)
+        if cache:
+            cache.invalidate()
+
+
+def all_cache_stats():
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
@@ -1,22 +1,25 @@
 import mysql.connector
 from flask import current_app
+from .instrumentation import timed, InstrumentedConnection
+from . import metrics
 
 def get_db_connection(instanciation = False):
-    print("Tentative de connexion à la base de données MySQL...")
     """Créer une connexion à la base de données MySQL."""
+    current_app.logger.debug("Tentative de connexion à la base de données MySQL...")
     try:
-        conn = mysql.connector.connect(
-            host=current_app.config['DB_HOST'],
-            user=current_app.config['DB_USER'],
-            password=current_app.config['DB_PASSWORD'],
-            database=current_app.config['DB_NAME'],
-            port=current_app.config['DB_PORT']
-        )
-        
-        return conn
+        with timed("db"):
+            conn = mysql.connector.connect(
+                host=current_app.config['DB_HOST'],
+                user=current_app.config['DB_USER'],
+                password=current_app.config['DB_PASSWORD'],
+                database=current_app.config['DB_NAME'],
+                port=current_app.config['DB_PORT']
+            )
+
+        metrics.observe_db_connection(ok=True)
+        return InstrumentedConnection(conn)
     except mysql.connector.Error as err:
+        metrics.observe_db_connection(ok=False)
         if(instanciation == False):
-            print(f"Erreur de connexion MySQL : {err}")
+            current_app.logger.error(f"Erreur de connexion MySQL : {err}")
         return None
-        
-        
@@ -1,5 +1,8 @@
+import fcntl
 import os
 import subprocess
+import time
+from contextlib import contextmanager
 from urllib.parse import urlparse
 from pathlib import Path
 from git import Repo, GitCommandError, InvalidGitRepositoryError  # nécessite 'pip install gitpython'
@@ -8,6 +11,42 @@ import logging
 from flask import current_app as app
 import shutil
 from flask_restful import Resource, reqparse
+from .git_runner import run_git
+from .git_reader import read_symbolic_ref, resolve_ref
+
+# Répertoire des clones (volume partagé avec le service archeologist)
+CLONES_DIR = os.getenv("CLONES_DIR", "/app/clones")
+
+# Réserve d'objets partagée (dépôt nu) : les clones y empruntent les objets
+# communs (historique du template du cours) via `--reference-if-able` au lieu
+# d'en garder chacun une copie. Par défaut <dossier des clones>/.objects.git ;
+# CLONES_SHARED_OBJECTS=false revient à des clones autonomes.
+SHARED_OBJECTS_ENABLED = os.getenv("CLONES_SHARED_OBJECTS", "true").lower() in ("1", "true", "yes")
+OBJECT_POOL_DIR = os.getenv("CLONES_OBJECT_POOL")
+# Un dépôt récupéré dans la réserve depuis moins de CLONES_POOL_FETCH_INTERVAL secondes
+# n'est pas récupéré de nouveau (plan d'une classe puis clone de chaque dépôt, par exemple)
+POOL_FETCH_INTERVAL = float(os.getenv("CLONES_POOL_FETCH_INTERVAL", 300))
+
+# Après chaque clone / mise à jour : commit-graph (avec filtres de Bloom des chemins
+# modifiés) et multi-pack-index avec bitmaps d'accessibilité, écrits de façon
+# incrémentale. Profite aux parcours d'historique du backend comme d'archeologist.
+COMMIT_GRAPH_ENABLED = os.getenv("CLONES_COMMIT_GRAPH", "true").lower() in ("1", "true", "yes")
+
+
+@contextmanager
+def _pool_lock(pool_path):
+    """
+    Verrou exclusif de la réserve (flock sur <réserve>/.lock) : récupérations et
+    maintenance (repack, commit-graph) ne se chevauchent pas, entre threads comme
+    entre workers.
+    """
+    os.makedirs(pool_path, exist_ok=True)
+    with open(os.path.join(pool_path, ".lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 class DirManager(Resource):
@@ -60,20 +99,146 @@ class DirManager(Resource):
             raise Exception(f"Erreur inattendue : {e}")
 
     @staticmethod
-    def clone_update_repo(repo_url, base_dir="/app/clones"):
-        repo_name = DirManager.name_from_url(repo_url)
-        clone_path = Path(base_dir) / repo_name
-        clone_path.parent.mkdir(parents=True, exist_ok=True)
+    def head_commit(repo_path):
+        """SHA du commit actuellement extrait dans le clone."""
+        return resolve_ref(str(repo_path), "HEAD")
+
+    @staticmethod
+    def current_branch(repo_path):
+        """Branche extraite ("HEAD" si détaché), lue dans .git/HEAD sans lancer git."""
+        target = read_symbolic_ref(repo_path, "HEAD")
+        return target[len("refs/heads/"):] if target and target.startswith("refs/heads/") else "HEAD"
+
+    @staticmethod
+    def default_branch(repo_path):
+        """Branche par défaut du remote origin (refs/remotes/origin/HEAD)."""
+        target = read_symbolic_ref(repo_path, "refs/remotes/origin/HEAD")
+        if target is None:
+            target = run_git(
+                ["symbolic-ref", "refs/remotes/origin/HEAD"], repo=repo_path, text=True
+            ).stdout.strip()
+        return target.split("/")[-1]
+
+    @staticmethod
+    def object_pool(base_dir=CLONES_DIR):
+        """Chemin de la réserve d'objets partagée, ou None si désactivée."""
+        if not SHARED_OBJECTS_ENABLED:
+            return None
+        return OBJECT_POOL_DIR or os.path.join(str(base_dir), ".objects.git")
+
+    @staticmethod
+    def fetch_into_pool(pool_path, repo_url, repo_name, maintain=True):
+        """
+        Récupère les branches de `repo_url` dans la réserve, sous refs/pool/<nom>/ :
+        la négociation avec le serveur tient compte des objets déjà présents (ceux
+        du template), seuls les commits propres au dépôt sont téléchargés.
+        Les objets de la réserve ne sont jamais élagués (gc.pruneExpire=never), les
+        clones pouvant encore en dépendre après un push forcé.
+        Récupération et maintenance (`maintain`, voir write_indexes) se font sous le verrou
+        de la réserve ; un dépôt récupéré depuis moins de POOL_FETCH_INTERVAL est ignoré.
+        Retourne True si le dépôt a été récupéré.
+        """
+        with _pool_lock(pool_path):
+            marker = os.path.join(pool_path, "fetched", repo_name)
+            try:
+                if time.time() - os.path.getmtime(marker) < POOL_FETCH_INTERVAL:
+                    return False
+            except OSError:
+                pass
+            if not os.path.isdir(os.path.join(pool_path, "objects")):
+                run_git(["init", "--bare", "--quiet", pool_path], report_as=pool_path, text=True)
+                run_git(["config", "gc.pruneExpire", "never"], repo=pool_path, text=True)
+            run_git(
+                ["fetch", "--quiet", "--no-tags", "--prune", repo_url,
+                 f"+refs/heads/*:refs/pool/{repo_name}/heads/*"],
+                repo=pool_path, text=True
+            )
+            os.makedirs(os.path.dirname(marker), exist_ok=True)
+            Path(marker).touch()
+            if maintain:
+                DirManager.write_indexes(pool_path)
+        return True
 
-        # Authentification
+    @staticmethod
+    def write_indexes(repo_path):
+        """
+        Met à jour les index de parcours du dépôt, sans jamais faire échouer l'appelant :
+          - `commit-graph write --reachable --changed-paths --split` : seuls les nouveaux
+            commits sont ajoutés (graphe découpé en couches), avec leurs filtres de Bloom
+            utilisés par `git log -- <chemins>` ;
+          - `repack --geometric=2 -d --write-midx` : les objets isolés de la dernière
+            récupération passent dans un pack, et les petits packs sont fusionnés jusqu'à ce
+            que chaque pack fasse au moins le double du précédent (progression géométrique :
+            quelques packs seulement, sans tout réécrire à chaque fois), tous couverts par le
+            multi-pack-index. Le bitmap (-b) exige que le dépôt contienne tous ses objets : il
+            n'est pas écrit pour un clone qui emprunte ceux de la réserve partagée (qui, elle,
+            a le sien).
+        """
+        if not COMMIT_GRAPH_ENABLED:
+            return
+        git_dir = os.path.join(repo_path, ".git")
+        objects_dir = os.path.join(git_dir if os.path.isdir(git_dir) else repo_path, "objects")
+        borrows_objects = os.path.exists(os.path.join(objects_dir, "info", "alternates"))
+        for args in (
+            ["commit-graph", "write", "--reachable", "--changed-paths", "--split"],
+            ["repack", "--geometric=2", "-d", "-q", "--write-midx"] + (["-l"] if borrows_objects else ["-b"]),
+        ):
+            result = run_git(args, repo=repo_path, check=False, text=True)
+            if result.returncode != 0:
+                app.logger.warning(f"git {args[0]} a échoué pour {repo_path} : {result.stderr.strip()}")
+
+    @staticmethod
+    def clone(repo_url, clone_path, repo_name, base_dir=CLONES_DIR):
+        """`git clone --no-single-branch`, en empruntant les objets de la réserve partagée si possible."""
+        args = ["clone", "--no-single-branch"]
+        pool_path = DirManager.object_pool(base_dir)
+        if pool_path:
+            try:
+                DirManager.fetch_into_pool(pool_path, repo_url, repo_name)
+                args += ["--reference-if-able", pool_path]
+            except subprocess.CalledProcessError as e:
+                app.logger.warning(f"Réserve d'objets indisponible, clone autonome ({e.stderr})")
+        run_git(args + [repo_url, clone_path], report_as=clone_path, text=True)
+
+    @staticmethod
+    def authenticated_url(repo_url):
+        """URL de `repo_url` avec GITHUB_TOKEN (seulement nécessaire pour GitHub, pas pour un dépôt local)."""
+        if not repo_url.startswith("https://github.com/"):
+            return repo_url
         token = os.environ.get("GITHUB_TOKEN")
         if not token:
             raise EnvironmentError("GITHUB_TOKEN manquant dans les variables d'environnement")
-        
-        repo_url_with_token = repo_url.replace(
-            "https://github.com/",
-            f"https://{token}@github.com/"
-        ) if repo_url.startswith("https://github.com/") else repo_url
+        return repo_url.replace("https://github.com/", f"https://{token}@github.com/")
+
+    @staticmethod
+    def update_pool(repo_urls, base_dir=CLONES_DIR):
+        """
+        Récupère les branches de chaque dépôt dans la réserve partagée (voir fetch_into_pool),
+        avant tout clone : la cohorte est alors complète pour repérer son historique commun.
+        Un dépôt inaccessible est seulement signalé (son clone échouera plus tard).
+        """
+        pool_path = DirManager.object_pool(base_dir)
+        if pool_path is None:
+            return
+        fetched = False
+        for repo_url in repo_urls:
+            try:
+                fetched |= DirManager.fetch_into_pool(pool_path, DirManager.authenticated_url(repo_url),
+                                                      DirManager.name_from_url(repo_url), maintain=False)
+            except (subprocess.CalledProcessError, EnvironmentError) as e:
+                app.logger.warning(f"{repo_url} absent de la réserve d'objets : {getattr(e, 'stderr', None) or e}")
+        if fetched:
+            # Une seule maintenance pour toute la cohorte
+            with _pool_lock(pool_path):
+                DirManager.write_indexes(pool_path)
+
+    @staticmethod
+    def clone_update_repo(repo_url, base_dir=CLONES_DIR):
+        repo_name = DirManager.name_from_url(repo_url)
+        clone_path = Path(base_dir) / repo_name
+        clone_path.parent.mkdir(parents=True, exist_ok=True)
+
+        repo_url_with_token = DirManager.authenticated_url(repo_url)
 
         clone_path_str = str(clone_path)
         
@@ -82,69 +247,40 @@ class DirManager(Resource):
                 # 1. Vérifier et corriger l'état du dépôt
                 try:
                     # Obtenir la branche actuelle
-                    current_branch = subprocess.check_output(
-                        ["git", "-C", clone_path_str, "rev-parse", "--abbrev-ref", "HEAD"],
-                        stderr=subprocess.PIPE,
-                        universal_newlines=True
-                    ).strip()
+                    current_branch = DirManager.current_branch(clone_path_str)
                     
                     # Si en detached HEAD, on se remet sur la branche par défaut
                     if current_branch == "HEAD":
                         # Trouver la branche par défaut
-                        default_branch = subprocess.check_output(
-                            ["git", "-C", clone_path_str, "symbolic-ref", "refs/remotes/origin/HEAD"],
-                            stderr=subprocess.PIPE,
-                            universal_newlines=True
-                        ).strip().split("/")[-1]
+                        default_branch = DirManager.default_branch(clone_path_str)
                         
                         # Checkout de la branche par défaut
-                        subprocess.check_call(
-                            ["git", "-C", clone_path_str, "checkout", default_branch],
-                            stderr=subprocess.PIPE
-                        )
+                        run_git(["checkout", default_branch], repo=clone_path_str, text=True)
                         current_branch = default_branch
                     
                     # 2. Mise à jour propre
-                    subprocess.check_call(
-                        ["git", "-C", clone_path_str, "pull", "origin", current_branch],
-                        stderr=subprocess.PIPE
-                    )
+                    run_git(["pull", "origin", current_branch], repo=clone_path_str, text=True)
                     
                 except subprocess.CalledProcessError as e:
                     # Fallback: reclone si le dépôt est corrompu
                     app.logger.warning(f"Réinitialisation du dépôt ({e.stderr})")
                     shutil.rmtree(clone_path)
-                    subprocess.check_call(
-                        ["git", "clone", "--no-single-branch", repo_url_with_token, clone_path_str],
-                        stderr=subprocess.PIPE
-                    )
+                    DirManager.clone(repo_url_with_token, clone_path_str, repo_name, base_dir)
             else:
                 # Clone initial
                 if clone_path.exists():
                     shutil.rmtree(clone_path)
-                subprocess.check_call(
-                    ["git", "clone", "--no-single-branch", repo_url_with_token, clone_path_str],
-                    stderr=subprocess.PIPE
-                )
+                DirManager.clone(repo_url_with_token, clone_path_str, repo_name, base_dir)
             
             # Post-traitement garantissant qu'on est sur la bonne branche
-            default_branch = subprocess.check_output(
-                ["git", "-C", clone_path_str, "symbolic-ref", "refs/remotes/origin/HEAD"],
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            ).strip().split("/")[-1]
+            default_branch = DirManager.default_branch(clone_path_str)
             
-            subprocess.check_call(
-                ["git", "-C", clone_path_str, "checkout", default_branch],
-                stderr=subprocess.PIPE
-            )
+            run_git(["checkout", default_branch], repo=clone_path_str, text=True)
             
             # Mise à jour complète du dépôt
-            subprocess.check_call(
-                ["git", "-C", clone_path_str, "pull", "--all"],
-                stderr=subprocess.PIPE
-            )
-            
+            run_git(["pull", "--all"], repo=clone_path_str, text=True)
+
+            DirManager.write_indexes(clone_path_str)
             return clone_path_str
             
         except subprocess.CalledProcessError as e:
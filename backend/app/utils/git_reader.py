@@ -0,0 +1,395 @@
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .git_runner import run_git, record_command, repo_name
+
+# Séparateurs du format `git log` (absents des champs lus)
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+_LOG_FORMAT = _RECORD + _FIELD.join(("%H", "%P", "%an", "%ae", "%aI", "%cI", "%s")) + _FIELD
+# Même format, auteur corrigé par le .mailmap du dépôt (%aN / %aE)
+_LOG_FORMAT_MAILMAP = _RECORD + _FIELD.join(("%H", "%P", "%aN", "%aE", "%aI", "%cI", "%s")) + _FIELD
+_HEADER_FIELDS = 7
+
+# Toutes les branches (locales et distantes) et tags : équivalent de --all sans
+# refs/stash ni refs/notes, dont les commits ne font pas partie du travail rendu
+ALL_REFS = ("--branches", "--remotes", "--tags", "HEAD")
+
+
+class FileChange:
+    """Fichier modifié par un commit (équivalent du ModifiedFile de PyDriller, sans le patch)."""
+    __slots__ = ("old_path", "new_path", "added_lines", "deleted_lines")
+
+    def __init__(self, old_path: str, new_path: str, added_lines: int, deleted_lines: int):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.added_lines = added_lines
+        self.deleted_lines = deleted_lines
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path
+
+
+class GitCommit:
+    """Commit lu par GitReader.iter_commits. `author_date` / `committer_date` sont tz-aware."""
+    __slots__ = ("hash", "parents", "author_name", "author_email", "author_date", "committer_date", "msg",
+                 "modified_files")
+
+    def __init__(self, hash, parents, author_name, author_email, author_date, committer_date, msg, modified_files):
+        self.hash = hash
+        self.parents = parents
+        self.author_name = author_name
+        self.author_email = author_email
+        self.author_date = author_date
+        self.committer_date = committer_date
+        self.msg = msg
+        self.modified_files = modified_files
+
+    @property
+    def merge(self) -> bool:
+        return len(self.parents) > 1
+
+
+class GitReader:
+    """
+    Lecture d'un dépôt sans lancer un processus git par requête :
+      - objets (blobs, arbres, résolution de révisions) via un unique
+        `git cat-file --batch` persistant, démarré à la première lecture ;
+      - historique via un seul `git log --numstat -z -M` lu en flux.
+    À utiliser comme gestionnaire de contexte (ou appeler close()).
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = str(repo_path)
+        self._batch = None
+        self._lock = threading.Lock()
+        self._batch_time = 0.0
+        self._batch_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Objets -------------------------------------------------------------
+
+    def read_object(self, spec: str) -> Optional[Tuple[str, str, bytes]]:
+        """(sha, type, contenu) de l'objet désigné par `spec` (ex. "HEAD:src/a.py"), ou None s'il n'existe pas."""
+        if "\n" in spec:
+            return None
+        with self._lock:
+            start = time.perf_counter()
+            if self._batch is None:
+                self._batch = subprocess.Popen(
+                    ["git", "-C", self.repo_path, "cat-file", "--batch"],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                )
+            try:
+                self._batch.stdin.write(spec.encode("utf-8", errors="surrogateescape") + b"\n")
+                self._batch.stdin.flush()
+                header = self._batch.stdout.readline().split()
+                if len(header) != 3:  # "<spec> missing" / "<spec> ambiguous"
+                    return None
+                size = int(header[2])
+                content = self._batch.stdout.read(size + 1)[:size]
+                self._batch_bytes += size
+                return header[0].decode(), header[1].decode(), content
+            finally:
+                self._batch_time += time.perf_counter() - start
+
+    def resolve(self, revision: str) -> Optional[str]:
+        """SHA de l'objet désigné par `revision`, ou None."""
+        obj = self.read_object(revision)
+        return obj[0] if obj else None
+
+    def read_blob(self, revision: str, path: str) -> Optional[bytes]:
+        obj = self.read_object(f"{revision}:{path}")
+        return obj[2] if obj and obj[1] == "blob" else None
+
+    def read_blobs(self, revision: str, paths: Iterable[str]) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """(chemin, contenu ou None) pour chaque chemin de `revision`."""
+        for path in paths:
+            yield path, self.read_blob(revision, path)
+
+    def list_tree(self, revision: str = "HEAD") -> List[str]:
+        """Chemins de tous les fichiers (blobs) de `revision`, sous-modules exclus."""
+        root = self.read_object(f"{revision}^{{tree}}")
+        if root is None:
+            return []
+        paths = []
+        pending = [("", root[2])]
+        while pending:
+            prefix, data = pending.pop()
+            for mode, name, sha in _parse_tree(data):
+                path = prefix + name
+                if mode == b"40000":
+                    subtree = self.read_object(sha)
+                    if subtree:
+                        pending.append((path + "/", subtree[2]))
+                elif mode != b"160000":
+                    paths.append(path)
+        paths.sort()
+        return paths
+
+    # --- Historique ---------------------------------------------------------
+
+    def iter_commits(self, revisions: Sequence[str] = ("HEAD",), reverse: bool = True,
+                     extra_args: Sequence[str] = (), all_refs: bool = False,
+                     exclude: Sequence[str] = (), mailmap=False,
+                     paths: Sequence[str] = (), sparse: bool = False,
+                     numstat: bool = True, commits: Optional[Sequence[str]] = None) -> Iterator[GitCommit]:
+        """
+        Commits accessibles depuis `revisions`, du plus ancien au plus récent par défaut
+        (ordre de PyDriller), avec les lignes ajoutées/supprimées par fichier
+        (renommages détectés). Comme PyDriller, un commit de merge n'a pas de fichiers modifiés.
+        `all_refs` : parcourt l'union des commits de toutes les branches et tags (ALL_REFS) ;
+        git ne renvoie qu'une fois un commit commun à plusieurs branches.
+        `exclude` : commits dont l'historique est ignoré (`--not`, ex. historique du template).
+        `mailmap` : True pour des auteurs corrigés par le .mailmap du dépôt, ou chemin d'un
+        fichier mailmap supplémentaire (mailmap.file).
+        `paths` : ne parcourt que les commits touchant ces chemins (et ne compte que leurs
+        lignes) ; git utilise alors les filtres de Bloom du commit-graph s'il en a un
+        (voir DirManager.write_indexes). Avec `sparse`, tous les commits sont gardés et
+        seuls les fichiers comptés sont limités à `paths` (pathspecs d'exclusion, voir
+        path_filters) : les fichiers exclus ne sont jamais comparés.
+        `numstat` : False pour les seuls en-têtes (aucun diff calculé, `modified_files` vide).
+        `commits` : lit exactement ces commits, dans cet ordre (`--no-walk`, SHAs passés
+        sur l'entrée standard), au lieu de parcourir l'historique de `revisions`.
+        Lève subprocess.CalledProcessError si git échoue (ex. dépôt vide).
+        """
+        if all_refs:
+            revisions = ALL_REFS
+        argv = ["git", "-C", self.repo_path]
+        if isinstance(mailmap, str):
+            argv += ["-c", f"mailmap.file={mailmap}"]
+        argv += ["log", "--no-color", "-z", f"--format={_LOG_FORMAT_MAILMAP if mailmap else _LOG_FORMAT}"]
+        if numstat:
+            argv += ["--numstat", "-M"]
+        if sparse and paths:
+            argv += ["--full-history", "--sparse"]
+        if commits is not None:
+            argv += ["--no-walk=unsorted", "--stdin"] + list(extra_args)
+        else:
+            if reverse:
+                argv.append("--reverse")
+            argv += list(extra_args) + list(revisions)
+            if exclude:
+                argv += ["--not"] + list(exclude)
+        argv += ["--"] + list(paths)
+
+        start = time.perf_counter()
+        process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   stdin=subprocess.PIPE if commits is not None else subprocess.DEVNULL)
+        if commits is not None:
+            # git lit toutes les révisions de --stdin avant d'écrire quoi que ce soit
+            process.stdin.write("".join(sha + "\n" for sha in commits).encode())
+            process.stdin.close()
+        read_bytes = 0
+        exit_code = -1
+        try:
+            buffer = b""
+            while True:
+                chunk = process.stdout.read(65536)
+                if not chunk:
+                    break
+                read_bytes += len(chunk)
+                buffer += chunk
+                records = buffer.split(_RECORD.encode())
+                buffer = records.pop()
+                for record in records:
+                    if record:
+                        yield _parse_commit(record)
+            if buffer:
+                yield _parse_commit(buffer)
+
+            stderr = process.stderr.read()
+            exit_code = process.wait()
+            if exit_code != 0:
+                raise subprocess.CalledProcessError(exit_code, argv, None, stderr.decode(errors="replace"))
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+            record_command("git log", argv, repo_name(self.repo_path), time.perf_counter() - start,
+                           exit_code, read_bytes)
+
+    def branch_tips(self) -> List[Tuple[str, str]]:
+        """
+        (nom de branche, sha) des branches locales et distantes ; une branche locale et
+        sa copie distante (origin/x) portent le même nom (voir _branch_name).
+        """
+        refs = run_git(["for-each-ref", "--format=%(objectname) %(refname)", "refs/heads", "refs/remotes"],
+                       repo=self.repo_path, text=True).stdout.split()
+        tips = []
+        for sha, ref in zip(refs[::2], refs[1::2]):
+            name = _branch_name(ref)
+            if name is not None:
+                tips.append((name, sha))
+        return tips
+
+    def branch_membership(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        {sha: (branches contenant le commit, triées)} pour les branches locales et
+        distantes, une branche locale et sa copie distante (origin/x) ne comptant qu'une fois.
+        Chaque branche est un bit propagé des pointes vers les parents (voir reachability).
+        """
+        bits: Dict[str, int] = {}
+        tips: Dict[str, int] = {}
+        for name, sha in self.branch_tips():
+            bit = bits.setdefault(name, 1 << len(bits))
+            tips[sha] = tips.get(sha, 0) | bit
+        if not tips:
+            return {}
+
+        names = sorted(bits, key=bits.get)
+        membership: Dict[str, Tuple[str, ...]] = {}
+        labels: Dict[int, Tuple[str, ...]] = {}
+        for sha, _, mask in self.reachability(tips):
+            label = labels.get(mask)
+            if label is None:
+                label = labels[mask] = tuple(sorted(n for i, n in enumerate(names) if mask >> i & 1))
+            membership[sha] = label
+        return membership
+
+    def reachability(self, tips: Dict[str, int]) -> Iterator[Tuple[str, List[str], int]]:
+        """
+        (sha, parents, masque) pour chaque commit accessible depuis les clés de `tips`
+        ({sha: masque de bits}) : le masque d'un commit est l'union de ceux des pointes
+        qui y mènent. Un seul `git rev-list --topo-order --parents`, les enfants sortant
+        toujours avant leurs parents.
+        """
+        masks: Dict[str, int] = {}
+        output = run_git(["rev-list", "--topo-order", "--parents"] + list(tips),
+                         repo=self.repo_path, text=True).stdout
+        for line in output.splitlines():
+            sha, *parents = line.split()
+            mask = masks.pop(sha, 0) | tips.get(sha, 0)
+            for parent in parents:
+                masks[parent] = masks.get(parent, 0) | mask
+            yield sha, parents, mask
+
+    def close(self):
+        with self._lock:
+            if self._batch is None:
+                return
+            batch, self._batch = self._batch, None
+            batch.stdin.close()
+            exit_code = batch.wait()
+            batch.stdout.close()
+            record_command("git cat-file", ["git", "-C", self.repo_path, "cat-file", "--batch"],
+                           repo_name(self.repo_path), self._batch_time, exit_code, self._batch_bytes)
+
+
+def _parse_tree(data: bytes):
+    """Entrées (mode, nom, sha hexadécimal) d'un objet tree brut."""
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        nul = data.index(b"\0", space)
+        mode = data[pos:space]
+        name = data[space + 1:nul].decode("utf-8", errors="surrogateescape")
+        sha = data[nul + 1:nul + 21].hex()
+        pos = nul + 21
+        yield mode, name, sha
+
+
+def _parse_commit(record: bytes) -> GitCommit:
+    text = record.decode("utf-8", errors="surrogateescape")
+    fields = text.split(_FIELD, _HEADER_FIELDS)
+    sha, parents, author_name, author_email, author_date, committer_date, msg = fields[:_HEADER_FIELDS]
+    stats = fields[_HEADER_FIELDS].lstrip("\0\n") if len(fields) > _HEADER_FIELDS else ""
+
+    modified_files = []
+    tokens = stats.split("\0")
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if not token:
+            continue
+        added, deleted, path = token.split("\t", 2)
+        old_path = new_path = path
+        if not path:  # renommage : "<a>\t<d>\t\0<ancien>\0<nouveau>"
+            old_path, new_path = tokens[i], tokens[i + 1]
+            i += 2
+        # "-" : fichier binaire, compté 0 ligne comme PyDriller
+        modified_files.append(FileChange(
+            old_path, new_path,
+            int(added) if added.isdigit() else 0,
+            int(deleted) if deleted.isdigit() else 0,
+        ))
+
+    return GitCommit(
+        sha,
+        parents.split(),
+        author_name,
+        author_email,
+        datetime.fromisoformat(author_date),
+        datetime.fromisoformat(committer_date),
+        msg,
+        modified_files,
+    )
+
+
+def _branch_name(ref: str) -> Optional[str]:
+    """"main" pour refs/heads/main et refs/remotes/origin/main ; None pour refs/remotes/<remote>/HEAD."""
+    if ref.startswith("refs/heads/"):
+        return ref[len("refs/heads/"):]
+    if ref.endswith("/HEAD"):
+        return None
+    if ref.startswith("refs/remotes/origin/"):
+        return ref[len("refs/remotes/origin/"):]
+    return ref[len("refs/remotes/"):]
+
+
+def _git_dir(repo_path: str) -> str:
+    path = os.path.join(repo_path, ".git")
+    return path if os.path.isdir(path) else repo_path
+
+
+def read_symbolic_ref(repo_path: str, ref: str = "HEAD") -> Optional[str]:
+    """
+    Cible d'une référence symbolique (ex. "refs/heads/main" pour HEAD), lue dans
+    les fichiers du dépôt sans lancer git. None si `ref` n'est pas symbolique
+    (HEAD détaché) ou n'existe pas.
+    """
+    try:
+        with open(os.path.join(_git_dir(str(repo_path)), ref), encoding="utf-8") as f:
+            content = f.read().strip()
+    except OSError:
+        return None
+    return content[len("ref: "):] if content.startswith("ref: ") else None
+
+
+def resolve_ref(repo_path: str, ref: str = "HEAD") -> str:
+    """SHA d'une référence (fichiers loose, puis packed-refs), avec repli sur `git rev-parse`."""
+    git_dir = _git_dir(str(repo_path))
+    for _ in range(5):  # suit les références symboliques
+        target = read_symbolic_ref(repo_path, ref)
+        if target is None:
+            break
+        ref = target
+    try:
+        with open(os.path.join(git_dir, ref), encoding="utf-8") as f:
+            sha = f.read().strip()
+        if len(sha) == 40:
+            return sha
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref and not line.startswith(("#", "^")):
+                    return parts[0]
+    except OSError:
+        pass
+    return run_git(["rev-parse", ref], repo=repo_path, text=True).stdout.strip()
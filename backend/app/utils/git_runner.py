@@ -0,0 +1,154 @@
+import heapq
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from .instrumentation import timed
+from . import metrics
+
+# Jetons éventuellement présents dans les URLs (https://<token>@github.com/...)
+_CREDENTIALS = re.compile(r"(https?://)[^/@\s]+@")
+
+
+def _redact(arg: str) -> str:
+    return _CREDENTIALS.sub(r"\1***@", arg)
+
+
+class GitCostReport:
+    """
+    Rapport glissant, en mémoire et par processus, du coût des commandes git
+    et des outils externes : pour chaque dépôt, les dernières exécutions,
+    les plus coûteuses et un agrégat par commande.
+    """
+
+    def __init__(self, max_repos: int = 500, recent: int = 50, top: int = 20):
+        self.max_repos = max_repos
+        self.recent = recent
+        self.top = top
+        self._repos: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def record(self, command: str, argv: Sequence[str], repo: Optional[str], duration: float,
+               exit_code: int, output_bytes: int):
+        entry = {
+            "command": command,
+            "argv": [_redact(str(a)) for a in argv],
+            "duration_ms": round(duration * 1000, 1),
+            "exit_code": exit_code,
+            "output_bytes": output_bytes,
+            "at": time.time(),
+        }
+        key = repo or "-"
+        with self._lock:
+            stats = self._repos.get(key)
+            if stats is None:
+                stats = {"recent": deque(maxlen=self.recent), "top": [], "commands": {}}
+                self._repos[key] = stats
+                if len(self._repos) > self.max_repos:
+                    self._repos.popitem(last=False)
+            else:
+                self._repos.move_to_end(key)
+
+            stats["recent"].append(entry)
+            self._sequence += 1
+            item = (duration, self._sequence, entry)
+            if len(stats["top"]) < self.top:
+                heapq.heappush(stats["top"], item)
+            elif duration > stats["top"][0][0]:
+                heapq.heapreplace(stats["top"], item)
+
+            agg = stats["commands"].setdefault(
+                command, {"count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0, "output_bytes": 0}
+            )
+            agg["count"] += 1
+            agg["failures"] += 1 if exit_code != 0 else 0
+            agg["total_ms"] = round(agg["total_ms"] + entry["duration_ms"], 1)
+            agg["max_ms"] = max(agg["max_ms"], entry["duration_ms"])
+            agg["output_bytes"] += output_bytes
+
+    def snapshot(self, repo: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """Dépôts triés par temps git cumulé décroissant, avec leurs opérations les plus coûteuses."""
+        with self._lock:
+            items = [(repo, self._repos[repo])] if repo in self._repos else (
+                [] if repo else list(self._repos.items())
+            )
+            repos = []
+            for name, stats in items:
+                commands = {c: dict(a) for c, a in stats["commands"].items()}
+                repos.append({
+                    "repo": name,
+                    "total_ms": round(sum(a["total_ms"] for a in commands.values()), 1),
+                    "count": sum(a["count"] for a in commands.values()),
+                    "commands": commands,
+                    "most_expensive": [dict(e) for _, _, e in sorted(stats["top"], key=lambda i: i[0], reverse=True)],
+                    "recent": [dict(e) for e in stats["recent"]],
+                })
+        repos.sort(key=lambda r: r["total_ms"], reverse=True)
+        return {"pid": os.getpid(), "repos": repos[:limit]}
+
+    def clear(self):
+        with self._lock:
+            self._repos.clear()
+
+
+git_report = GitCostReport()
+
+
+def record_command(command: str, argv: Sequence[str], repo: Optional[str], duration: float,
+                   exit_code: int, output_bytes: int):
+    """Enregistre une exécution (rapport git, métriques). Utilisé aussi pour les processus longs (cat-file --batch)."""
+    git_report.record(command, argv, repo, duration, exit_code, output_bytes)
+    metrics.observe_git_command(command, duration, exit_code)
+
+
+def _run(argv: List[str], command: str, category: str, repo: Optional[str], check: bool, **kwargs):
+    start = time.perf_counter()
+    exit_code = -1
+    output_bytes = 0
+    try:
+        with timed(category):
+            result = subprocess.run(argv, capture_output=True, **kwargs)
+        exit_code = result.returncode
+        output_bytes = _size(result.stdout) + _size(result.stderr)
+    finally:
+        record_command(command, argv, repo, time.perf_counter() - start, exit_code, output_bytes)
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, [_redact(str(a)) for a in argv],
+                                            result.stdout, result.stderr)
+    return result
+
+
+def run_git(args: Sequence[str], repo: Optional[str] = None, check: bool = True,
+            report_as: Optional[str] = None, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Lance `git [-C repo] <args>` en capturant stdout/stderr et enregistre la commande,
+    le dépôt, la durée, le code de sortie et le volume de sortie.
+    `report_as` : chemin du dépôt à utiliser dans le rapport quand `repo` n'est pas
+    passé (ex. destination d'un `git clone`).
+    Lève subprocess.CalledProcessError (jetons masqués) si `check` et code de sortie non nul.
+    Les autres arguments (text, input, timeout, env...) sont passés à subprocess.run.
+    """
+    argv = ["git"] + (["-C", str(repo)] if repo else []) + [str(a) for a in args]
+    return _run(argv, f"git {args[0]}", "git", repo_name(repo or report_as), check, **kwargs)
+
+
+def run_tool(argv: Sequence[str], repo: Optional[str] = None, check: bool = True, **kwargs) -> subprocess.CompletedProcess:
+    """Comme run_git, pour un outil externe (git-statistic, gitstats, repo-analyzer...)."""
+    argv = [str(a) for a in argv]
+    return _run(argv, os.path.basename(argv[0]), "tool", repo_name(repo), check, **kwargs)
+
+
+def repo_name(repo: Optional[str]) -> Optional[str]:
+    """Clé d'un dépôt dans le rapport (nom du dossier du clone)."""
+    return os.path.basename(os.path.normpath(str(repo))) if repo else None
+
+
+def _size(output) -> int:
+    if not output:
+        return 0
+    return len(output.encode("utf-8", errors="surrogateescape")) if isinstance(output, str) else len(output)
@@ -0,0 +1,203 @@
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from flask import current_app as app
+
+from . import metrics
+from .dir_manager import CLONES_DIR, DirManager
+from .git_reader import GitReader
+from .instrumentation import timed
+
+# Indicateurs « GitHub » d'un dépôt (branches, PR, reviews, CI/CD), selon la source :
+#   "github" : API GitHub (réseau, jeton, quota) ; chaque relevé complet est gardé
+#              comme instantané, et en cas d'échec on retombe sur "local" ;
+#   "local"  : aucun appel réseau. Branches comptées dans les refs du clone, PR
+#              fusionnées déduites des messages de merge de GitHub ; reviews, CI et PR
+#              ouvertes/fermées lues dans le dernier instantané s'il y en a un.
+
+SOURCES = ("github", "local")
+
+FIELDS = ("nb_branches", "nb_pr_total", "nb_pr_open", "nb_pr_closed", "nb_pr_merged",
+          "nb_reviews", "nb_ci_total", "nb_ci_success", "nb_ci_failure")
+
+# "Merge pull request #12 from owner/branch" (merge commit) et "Titre (#12)"
+# (squash / rebase depuis l'interface GitHub)
+_MERGE_PR = re.compile(r"^Merge pull request #(\d+) from ")
+_SQUASH_PR = re.compile(r"\(#(\d+)\)\s*$")
+
+
+def _github_get(url, **kwargs):
+    """GET sur l'API GitHub, en relevant le quota restant (métrique github_rate_limit_remaining)."""
+    response = requests.get(url, **kwargs)
+    metrics.observe_github_response(response)
+    return response
+
+
+def repository_metrics(repo_url: str, token: Optional[str] = None, source: Optional[str] = None,
+                       repo_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Indicateurs FIELDS du dépôt, plus "metrics_source" ("github" ou "local") et, quand
+    un instantané de l'API a servi, "metrics_snapshot_at" (timestamp du relevé).
+    `source` : voir SOURCES (défaut : GITHUB_METRICS_SOURCE). `repo_path` : clone local
+    (déduit de l'URL par défaut).
+    """
+    source = source or app.config["GITHUB_METRICS_SOURCE"]
+    if source not in SOURCES:
+        raise ValueError(f"Source d'indicateurs inconnue : {source} (attendu : {', '.join(SOURCES)})")
+    if source == "github":
+        try:
+            with timed("github"):
+                result = github_metrics(repo_url, token)
+            return dict(result, metrics_source="github")
+        except Exception as e:
+            app.logger.warning(f"Erreur GitHub API pour {repo_url}, indicateurs locaux : {e}")
+    return local_metrics(repo_url, repo_path)
+
+
+def github_metrics(repo_url: str, token: Optional[str] = None) -> Dict[str, int]:
+    """Indicateurs lus sur l'API GitHub ; un relevé complet est enregistré comme instantané."""
+    _get = _github_get
+    parsed = urlparse(repo_url)
+    owner, repo = parsed.path.strip("/").replace(".git", "").split("/", 1)
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    complete = True
+
+    # -- Branches
+    bres = _get(f"https://api.github.com/repos/{owner}/{repo}/branches", headers=headers)
+    if not bres.ok:
+        raise RuntimeError(f"branches : HTTP {bres.status_code}")
+    nb_branches = len(bres.json())
+
+    # -- Pull‐requests (toutes)
+    prs = []
+    page = 1
+    while True:
+        r = _get(
+            f"https://api.github.com/repos/{owner}/{repo}/pulls?state=all&per_page=100&page={page}",
+            headers=headers
+        )
+        if not r.ok:
+            complete = False
+            break
+        batch = r.json()
+        if not batch:
+            break
+        prs.extend(batch)
+        page += 1
+
+    # -- Code reviews
+    nb_reviews = 0
+    for pr in prs:
+        num = pr.get("number")
+        rr = _get(f"https://api.github.com/repos/{owner}/{repo}/pulls/{num}/reviews", headers=headers)
+        if rr.ok:
+            nb_reviews += len(rr.json())
+        else:
+            complete = False
+
+    # -- CI/CD via GitHub Actions
+    runs = []
+    page = 1
+    while True:
+        cr = _get(
+            f"https://api.github.com/repos/{owner}/{repo}/actions/runs?per_page=100&page={page}",
+            headers=headers
+        )
+        if not cr.ok:
+            complete = False
+            break
+        data = cr.json().get("workflow_runs", [])
+        if not data:
+            break
+        runs.extend(data)
+        page += 1
+
+    result = {
+        "nb_branches": nb_branches,
+        "nb_pr_total": len(prs),
+        "nb_pr_open": sum(1 for pr in prs if pr.get("state") == "open"),
+        "nb_pr_closed": sum(1 for pr in prs if pr.get("state") == "closed"),
+        "nb_pr_merged": sum(1 for pr in prs if pr.get("merged_at") is not None),
+        "nb_reviews": nb_reviews,
+        "nb_ci_total": len(runs),
+        "nb_ci_success": sum(1 for run in runs if run.get("conclusion") == "success"),
+        "nb_ci_failure": sum(1 for run in runs if run.get("conclusion") not in (None, "success")),
+    }
+    if complete:
+        save_snapshot(DirManager.name_from_url(repo_url), result)
+    return result
+
+
+def local_metrics(repo_url: str, repo_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Indicateurs calculés sans réseau sur le clone (voir l'en-tête du module). Sans
+    instantané, les PR connues sont les seules PR fusionnées (toutes fermées) et les
+    reviews / CI valent 0.
+    """
+    name = DirManager.name_from_url(repo_url)
+    repo_path = repo_path or os.path.join(CLONES_DIR, name)
+    snapshot = load_snapshot(name)
+    result = {field: 0 for field in FIELDS}
+    if snapshot:
+        result.update({field: snapshot.get(field, 0) for field in FIELDS})
+
+    with timed("history"), GitReader(repo_path) as reader:
+        result["nb_branches"] = len({branch for branch, _ in reader.branch_tips()})
+        merged = set()
+        for commit in reader.iter_commits(all_refs=True, numstat=False):
+            match = _MERGE_PR.match(commit.msg) or _SQUASH_PR.search(commit.msg)
+            if match:
+                merged.add(int(match.group(1)))
+
+    # Fusions postérieures à l'instantané : des PR qu'il voyait ouvertes d'abord, puis
+    # des PR qu'il ne connaissait pas
+    new_merges = max(0, len(merged) - result["nb_pr_merged"])
+    were_open = min(new_merges, result["nb_pr_open"])
+    result["nb_pr_open"] -= were_open
+    result["nb_pr_merged"] += new_merges
+    result["nb_pr_closed"] += new_merges
+    result["nb_pr_total"] += new_merges - were_open
+    result["metrics_source"] = "local"
+    if snapshot:
+        result["metrics_snapshot_at"] = snapshot.get("fetched_at")
+    return result
+
+
+def _snapshot_path(repo_name: str) -> str:
+    return os.path.join(app.config["GITHUB_SNAPSHOT_DIR"] or os.path.join(CLONES_DIR, ".github"),
+                        f"{repo_name}.json")
+
+
+def save_snapshot(repo_name: str, values: Dict[str, int]):
+    """Enregistre un relevé de l'API (écriture atomique : fichier temporaire puis renommage)."""
+    path = _snapshot_path(repo_name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Un fichier temporaire unique par écriture : deux threads (ou workers) peuvent
+        # enregistrer le même dépôt en même temps
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path),
+                                         prefix=f".{repo_name}.", suffix=".tmp", delete=False) as f:
+            json.dump(dict(values, fetched_at=int(time.time())), f)
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+    except OSError as e:
+        app.logger.warning(f"Instantané GitHub de {repo_name} non enregistré : {e}")
+
+
+def load_snapshot(repo_name: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_snapshot_path(repo_name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,187 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from flask import current_app as app, g, has_app_context, request
+from . import metrics
+
+# Catégories de temps mesurées (ordre d'affichage dans Server-Timing)
+CATEGORIES = ("db", "git", "tool", "history", "radon", "github", "archeologist")
+
+PROFILE_HEADER = "X-Profile"
+
+request_logger = logging.getLogger("app.requests")
+
+
+@contextmanager
+def timed(category: str):
+    """
+    Ajoute la durée du bloc à la catégorie `category` de la requête en cours
+    (sans contexte d'application, seule la métrique Prometheus est alimentée).
+    Les catégories peuvent se chevaucher (ex. radon dans une boucle history).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe_operation(category, elapsed)
+        if has_app_context():
+            timings = g.setdefault("_timings", {})
+            total, count = timings.get(category, (0.0, 0))
+            timings[category] = (total + elapsed, count + 1)
+
+
+class InstrumentedCursor:
+    """Curseur mysql-connector dont les exécutions et lectures sont mesurées (catégorie « db »)."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        with timed("db"):
+            return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        with timed("db"):
+            return self._cursor.executemany(*args, **kwargs)
+
+    def callproc(self, *args, **kwargs):
+        with timed("db"):
+            return self._cursor.callproc(*args, **kwargs)
+
+    def fetchone(self):
+        with timed("db"):
+            return self._cursor.fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        with timed("db"):
+            return self._cursor.fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        with timed("db"):
+            return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connexion mysql-connector qui renvoie des InstrumentedCursor et mesure commit/rollback."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._closed = False
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+    def commit(self):
+        with timed("db"):
+            return self._conn.commit()
+
+    def rollback(self):
+        with timed("db"):
+            return self._conn.rollback()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            metrics.observe_db_connection_closed()
+        return self._conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _before_request():
+    g._request_start = time.perf_counter()
+    g._timings = {}
+    if app.config.get("PROFILING_ENABLED") and request.headers.get(PROFILE_HEADER):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Un seul profileur actif à la fois (Python >= 3.12) : requête non profilée
+            app.logger.warning("Profilage ignoré : un autre profil est déjà en cours")
+            return
+        g._profiler = profiler
+
+
+def _after_request(response):
+    start = g.pop("_request_start", None)
+    if start is None:
+        return response
+    duration = time.perf_counter() - start
+    timings = g.get("_timings", {})
+
+    profiler = g.pop("_profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        profile_file = _save_profile(profiler)
+        if profile_file:
+            response.headers["X-Profile-File"] = profile_file
+
+    ordered = sorted(timings, key=lambda c: (CATEGORIES.index(c) if c in CATEGORIES else len(CATEGORIES), c))
+    server_timing = [f"{c};dur={timings[c][0] * 1000:.1f};desc=\"{timings[c][1]} call(s)\"" for c in ordered]
+    server_timing.append(f"total;dur={duration * 1000:.1f}")
+    response.headers["Server-Timing"] = ", ".join(server_timing)
+    metrics.observe_request(_resource_name(), request.method, response.status_code, duration)
+
+    request_logger.info(json.dumps({
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round(duration * 1000, 1),
+        "timings": {c: {"ms": round(timings[c][0] * 1000, 1), "count": timings[c][1]} for c in ordered},
+    }))
+    return response
+
+
+def _resource_name():
+    """Nom de la ressource Flask-RESTful (ex. StatsAPI), sinon de l'endpoint."""
+    view = app.view_functions.get(request.endpoint)
+    view_class = getattr(view, "view_class", None)
+    if view_class is not None:
+        return view_class.__name__
+    return request.endpoint or "unknown"
+
+
+def _save_profile(profiler):
+    """Écrit le profil (.prof, lisible avec pstats/snakeviz) et journalise les fonctions les plus coûteuses."""
+    profile_dir = Path(app.config.get("PROFILE_DIR") or "profiles")
+    try:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        path = profile_dir / f"{int(time.time() * 1000)}-{request.endpoint or 'unknown'}.prof"
+        profiler.dump_stats(str(path))
+    except OSError as e:
+        app.logger.warning(f"Impossible d'enregistrer le profil : {e}")
+        return None
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+    app.logger.info(f"Profil de {request.method} {request.path} ({path}) :\n{summary.getvalue()}")
+    return str(path)
+
+
+def init_instrumentation(app):
+    """Enregistre les hooks de mesure par requête (Server-Timing, log structuré, profilage à la demande)."""
+    if not request_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        request_logger.addHandler(handler)
+        request_logger.propagate = False
+    request_logger.setLevel(logging.INFO if app.config.get("REQUEST_LOG_ENABLED", True) else logging.WARNING)
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
@@ -6,12 +6,17 @@ from typing import Dict, List, Any
 import mysql.connector
 from flask import current_app as app
 from .database import get_db_connection
+from .cache import invalidate_repository_listings
+from .owner_matcher import OwnerInference
 
 class JSONToDB:
 
     @staticmethod
     def get_json_path(filename: str) -> str:
-        """Returns the full path to a JSON file in the 'data/' directory."""
+        """Returns the full path to a JSON file in the 'data/' directory (or DATA_DIR if configured)."""
+        data_dir = app.config.get("DATA_DIR")
+        if data_dir:
+            return str(Path(data_dir) / filename)
         base_dir = Path(app.root_path).parent
         app.logger.debug(f"Import --- ", base_dir / 'data' / filename)
         return str(base_dir / 'data' / filename)
@@ -63,12 +68,14 @@ class JSONToDB:
             
             # Import repositories, linking them to students/groups
             # Pass student_no_to_db_id directly to avoid reloading students.json in _import_groups
-            JSONToDB._import_repositories(cursor, repositories_data, student_no_to_db_id, group_name_year_to_db_id)
+            ambiguous = JSONToDB._import_repositories(cursor, repositories_data, student_no_to_db_id, group_name_year_to_db_id)
 
             # Import configurable deadlines
             JSONToDB._import_deadlines(cursor, deadlines_data)
             
             conn.commit()
+            invalidate_repository_listings()
+            JSONToDB._report_ambiguous_links(ambiguous)
             app.logger.info("JSON to DB import successful.")
             return True
             
@@ -84,6 +91,26 @@ class JSONToDB:
                 conn.close()
     ## Internal Helper Methods
 
+    @staticmethod
+    def _report_ambiguous_links(ambiguous: List[Dict]):
+        """
+        Summarizes the ambiguous inferred links in one structured log line and, if
+        AMBIGUOUS_LINKS_FILE is set, writes them there so they can be made explicit in
+        repositories.json. Nothing is written when there is no ambiguous link.
+        """
+        if not ambiguous:
+            return
+        app.logger.warning(f"Ambiguous inferred repository links: {json.dumps(ambiguous, ensure_ascii=False)}")
+        path = app.config.get("AMBIGUOUS_LINKS_FILE")
+        if not path:
+            return
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(ambiguous, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            app.logger.warning(f"Could not write {path}: {e}")
+
     @staticmethod
     def _load_json(filename: str) -> Any:
         """Loads a JSON file from the 'data/' folder."""
@@ -233,8 +260,10 @@ class JSONToDB:
         return group_name_year_to_db_id
 
     @staticmethod
-    def _import_repositories(cursor, data: List[Dict], student_no_to_db_id: Dict[str, int], group_name_year_to_db_id: Dict[tuple, int]):
-        """Imports repositories and their relationships, prioritizing explicit links from JSON."""
+    def _import_repositories(cursor, data: List[Dict], student_no_to_db_id: Dict[str, int], group_name_year_to_db_id: Dict[tuple, int]) -> List[Dict]:
+        """Imports repositories and their relationships, prioritizing explicit links from JSON.
+        Returns the repositories whose inferred link was ambiguous (chosen link and tied candidates).
+        """
         
         # Pre-fetch all student Git accounts and map them to their DB IDs for efficient lookup
         git_username_to_student_db_id = {}
@@ -242,6 +271,14 @@ class JSONToDB:
         for row in cursor.fetchall():
             git_username_to_student_db_id[row['git_username'].lower()] = row['id']
 
+        # Name inference matcher, built once from every group name and git username
+        inference = OwnerInference()
+        for (group_name, group_year), group_db_id in group_name_year_to_db_id.items():
+            inference.add_group(group_name, group_db_id, label=f"{group_name} ({group_year})")
+        for git_user, student_db_id in git_username_to_student_db_id.items():
+            inference.add_user(git_user, student_db_id)
+        ambiguous = []
+
         for repo in data:
             name = repo.get('name', '')
             owner = repo.get('owner', '')
@@ -326,34 +363,38 @@ class JSONToDB:
                     app.logger.debug(f"Linked repo '{name}' to student via owner '{owner}' (fallback)")
 
             if not is_linked:
-                # Fallback: Try to infer group link from repo name
-                for (group_name, group_year), group_db_id in group_name_year_to_db_id.items():
-                    # More robust matching: check for "grX" or explicit group name
-                    if f"gr{group_name}".lower() in name.lower() or group_name.lower() in name.lower():
+                # Fallback: infer a group (names "grX" or "X"), then a student (git username), from the repo name
+                chosen, ties = inference.infer(name)
+                if chosen:
+                    if chosen["kind"] == "group":
                         cursor.execute(
                             "INSERT IGNORE INTO repositories_groups (id_repo, id_group) VALUES (%s, %s)",
-                            (db_id, group_db_id)
+                            (db_id, chosen["target"])
                         )
-                        is_linked = True
-                        app.logger.debug(f"Linked repo '{name}' to group '{group_name}' ({group_year}) via name inference (fallback)")
-                        break # Link to the first matching group found
-
-            if not is_linked:
-                # Fallback: If still not linked, try linking to a student by matching git usernames in repo name
-                for git_user, student_db_id in git_username_to_student_db_id.items():
-                    if git_user.lower() in name.lower():
+                        app.logger.debug(f"Linked repo '{name}' to group '{chosen['label']}' via name inference (fallback)")
+                    else:
                         cursor.execute(
                             "INSERT IGNORE INTO repositories_students (id_repo, id_student) VALUES (%s, %s)",
-                            (db_id, student_db_id)
+                            (db_id, chosen["target"])
+                        )
+                        app.logger.debug(f"Linked repo '{name}' to student via name match '{chosen['label']}' (fallback)")
+                    is_linked = True
+                    if ties:
+                        ambiguous.append({
+                            "repository": name,
+                            "linked_to": chosen["label"],
+                            "candidates": [c["label"] for c in ties],
+                        })
+                        app.logger.warning(
+                            f"Ambiguous name inference for repo '{name}': linked to {chosen['kind']} '{chosen['label']}', "
+                            f"also matching {', '.join(repr(c['label']) for c in ties)}"
                         )
-                        is_linked = True
-                        app.logger.debug(f"Linked repo '{name}' to student via name match '{git_user}' (fallback)")
-                        break
 
             if not is_linked:
                 app.logger.warning(f"Repository '{name}' not linked to any student or group (no explicit or inferred link found).")
 
-        app.logger.info(f"Import completed for {len(data)} repositories.")
+        app.logger.info(f"Import completed for {len(data)} repositories ({len(ambiguous)} ambiguous inferred links).")
+        return ambiguous
 
     @staticmethod
     def _import_deadlines(cursor, data: Dict[str, List[Dict]]):
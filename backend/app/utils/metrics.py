@@ -0,0 +1,171 @@
+import functools
+import os
+import threading
+import time
+
+# Métriques Prometheus (optionnel) : sans prometheus_client, les fonctions
+# d'enregistrement ne font rien et /metrics répond 501.
+try:
+    from prometheus_client import (
+        CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess,
+    )
+except ImportError:
+    Counter = Gauge = Histogram = None
+    CONTENT_TYPE_LATEST = "text/plain; charset=utf-8"
+
+# Avec gunicorn, PROMETHEUS_MULTIPROC_DIR doit pointer vers un dossier vide partagé
+# par les workers (voir gunicorn.conf.py) : chaque worker y écrit ses valeurs et
+# /metrics agrège tous les fichiers.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+
+if Counter is not None:
+    REQUESTS = Counter(
+        "api_requests_total", "Requêtes HTTP traitées", ["resource", "method", "status"]
+    )
+    REQUEST_LATENCY = Histogram(
+        "api_request_duration_seconds", "Durée de traitement des requêtes HTTP", ["resource", "method"],
+        buckets=DURATION_BUCKETS,
+    )
+    OPERATIONS = Histogram(
+        "operation_duration_seconds", "Durée des opérations mesurées (db, git, tool, history, radon, github, archeologist)",
+        ["operation"], buckets=DURATION_BUCKETS,
+    )
+    GIT_COMMANDS = Counter(
+        "git_commands_total", "Commandes git et outils externes lancés", ["command", "status"]
+    )
+    GIT_COMMAND_DURATION = Histogram(
+        "git_command_duration_seconds", "Durée des commandes git et outils externes", ["command"],
+        buckets=DURATION_BUCKETS,
+    )
+    DB_CONNECTIONS = Counter(
+        "db_connections_total", "Connexions MySQL ouvertes (ou en échec)", ["status"]
+    )
+    DB_CONNECTIONS_OPEN = Gauge(
+        "db_connections_open", "Connexions MySQL actuellement ouvertes", multiprocess_mode="livesum"
+    )
+    ARCHEOLOGIST_LATENCY = Histogram(
+        "archeologist_request_duration_seconds", "Durée des appels au service archeologist", ["method", "path"],
+        buckets=DURATION_BUCKETS,
+    )
+    GITHUB_RATE_LIMIT_REMAINING = Gauge(
+        "github_rate_limit_remaining", "Dernière valeur de X-RateLimit-Remaining renvoyée par l'API GitHub",
+        multiprocess_mode="livemin",
+    )
+    ANALYSES_IN_FLIGHT = Gauge(
+        "analyses_in_flight", "Analyses de dépôt en cours", multiprocess_mode="livesum"
+    )
+    CLONE_STORE_BYTES = Gauge(
+        "clone_store_size_bytes", "Taille du dossier des clones", multiprocess_mode="livemax"
+    )
+
+_clone_store_lock = threading.Lock()
+_clone_store_measured_at = 0.0
+
+
+def observe_request(resource: str, method: str, status: int, duration: float):
+    if Counter is None:
+        return
+    REQUESTS.labels(resource, method, str(status)).inc()
+    REQUEST_LATENCY.labels(resource, method).observe(duration)
+
+
+def observe_operation(operation: str, duration: float):
+    if Counter is None:
+        return
+    OPERATIONS.labels(operation).observe(duration)
+
+
+def observe_git_command(command: str, duration: float, exit_code: int):
+    if Counter is None:
+        return
+    GIT_COMMANDS.labels(command, "ok" if exit_code == 0 else "error").inc()
+    GIT_COMMAND_DURATION.labels(command).observe(duration)
+
+
+def observe_archeologist_call(method: str, path: str, duration: float):
+    if Counter is None:
+        return
+    ARCHEOLOGIST_LATENCY.labels(method, path).observe(duration)
+
+
+def observe_db_connection(ok: bool):
+    if Counter is None:
+        return
+    DB_CONNECTIONS.labels("ok" if ok else "error").inc()
+    if ok:
+        DB_CONNECTIONS_OPEN.inc()
+
+
+def observe_db_connection_closed():
+    if Counter is None:
+        return
+    DB_CONNECTIONS_OPEN.dec()
+
+
+def observe_github_response(response):
+    """Relève le quota restant de l'API GitHub à partir des en-têtes de la réponse."""
+    if Counter is None:
+        return
+    remaining = getattr(response, "headers", {}).get("X-RateLimit-Remaining")
+    if remaining is not None and str(remaining).isdigit():
+        GITHUB_RATE_LIMIT_REMAINING.set(int(remaining))
+
+
+def track_in_flight_analysis(func):
+    """Décorateur : compte les appels en cours de `func` dans analyses_in_flight."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if Counter is None:
+            return func(*args, **kwargs)
+        ANALYSES_IN_FLIGHT.inc()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            ANALYSES_IN_FLIGHT.dec()
+    return wrapper
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    return total
+
+
+def refresh_clone_store_size(clones_dir: str, max_age: float):
+    """Recalcule la taille du dossier des clones au plus une fois toutes les `max_age` secondes."""
+    global _clone_store_measured_at
+    if Counter is None:
+        return
+    with _clone_store_lock:
+        if time.monotonic() - _clone_store_measured_at < max_age:
+            return
+        _clone_store_measured_at = time.monotonic()
+    CLONE_STORE_BYTES.set(_directory_size(clones_dir))
+
+
+def render_latest():
+    """Retourne (corps, content-type) de l'exposition Prometheus, ou (None, None) si indisponible."""
+    if Counter is None:
+        return None, None
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,125 @@
+from collections import deque
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Rattachement d'un dépôt à un groupe ou à un étudiant d'après son nom, lors de
+# l'import JSON : tous les motifs (noms de groupes, « gr<nom> », identifiants git)
+# sont compilés une fois dans un automate d'Aho-Corasick, et un seul passage sur
+# le nom du dépôt donne toutes les correspondances, quel que soit le nombre de
+# groupes et de comptes git.
+
+
+class PatternMatcher:
+    """Automate d'Aho-Corasick : toutes les occurrences de tous les motifs en un passage."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]  # (longueur du motif, valeur)
+        self._built = True
+
+    def add(self, pattern: str, value: Any):
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+        self._built = False
+
+    def _build(self):
+        """Liens d'échec, en largeur ; chaque état hérite des sorties de son lien d'échec."""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """(début, fin, valeur) de chaque occurrence d'un motif dans `text`."""
+        if not self._built:
+            self._build()
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._out[state]:
+                yield end - length, end, value
+
+
+class OwnerInference:
+    """
+    Candidats propriétaires d'un dépôt d'après son nom (casse ignorée) :
+      - groupes : « gr<nom> » ou « <nom> » (« gr07 », « gr007 » pour le groupe 7) ;
+      - étudiants : un de leurs identifiants git.
+    Classement : motif délimité d'abord (pas collé à une lettre ou un chiffre : le
+    groupe « 2 » ne l'emporte pas sur un identifiant git dans « tds_2025_jdupont »),
+    puis groupes avant étudiants (comme l'ancienne inférence), puis motif le plus long
+    (« gr12 » avant « gr1 »), puis ordre d'ajout.
+    Le choix est ambigu si un autre candidat du même type est lui aussi délimité (ou,
+    faute de candidat délimité, aussi long).
+    """
+
+    def __init__(self):
+        self._matcher = PatternMatcher()
+        self._order = 0
+
+    def add_group(self, group_name: str, target: Hashable, label: Optional[str] = None):
+        group_name = str(group_name).strip().lower()
+        patterns = {group_name, f"gr{group_name}"} if group_name else set()
+        if group_name.isdigit():
+            # numéros complétés par des zéros dans les noms de dépôts (« gr007 »)
+            patterns.update(f"gr{group_name:0>{width}}" for width in (2, 3))
+        for pattern in sorted(patterns):
+            self._matcher.add(pattern, ("group", target, label or group_name, self._order))
+        self._order += 1
+
+    def add_user(self, git_username: str, target: Hashable):
+        username = (git_username or "").strip().lower()
+        if username:
+            self._matcher.add(username, ("student", target, username, self._order))
+            self._order += 1
+
+    def candidates(self, repo_name: str) -> List[Dict[str, Any]]:
+        """Candidats du dépôt, du meilleur au moins bon (un par cible, sa meilleure occurrence)."""
+        text = (repo_name or "").lower()
+        best: Dict[Tuple[str, Hashable], Dict[str, Any]] = {}
+        for start, end, (kind, target, label, order) in self._matcher.iter_matches(text):
+            bounded = ((start == 0 or not text[start - 1].isalnum())
+                       and (end == len(text) or not text[end].isalnum()))
+            candidate = {"kind": kind, "target": target, "label": label, "match": text[start:end],
+                         "bounded": bounded, "length": end - start, "order": order}
+            current = best.get((kind, target))
+            if current is None or _rank(candidate) < _rank(current):
+                best[(kind, target)] = candidate
+        return sorted(best.values(), key=_rank)
+
+    def infer(self, repo_name: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(candidat retenu ou None, candidats à égalité avec lui : vide si le choix est net)."""
+        candidates = self.candidates(repo_name)
+        if not candidates:
+            return None, []
+        chosen = candidates[0]
+        ties = [c for c in candidates[1:]
+                if c["kind"] == chosen["kind"] and c["bounded"] == chosen["bounded"]
+                and (chosen["bounded"] or c["length"] == chosen["length"])]
+        return chosen, ties
+
+
+def _rank(candidate: Dict[str, Any]):
+    return (not candidate["bounded"], candidate["kind"] != "group", -candidate["length"], candidate["order"])
@@ -0,0 +1,132 @@
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from flask import current_app as app
+
+from .cache import get_cache
+
+# Contenu exclu par défaut des comptes de lignes/fichiers : dépendances embarquées,
+# sorties de build, fichiers générés (lockfiles, minifiés, notebooks) et binaires.
+# Syntaxe de type .gitignore : « dossier/ » = ce dossier partout, « *.ext » = partout,
+# un motif contenant « / » est relatif à la racine du dépôt.
+DEFAULT_EXCLUDES = (
+    "node_modules/", "bower_components/", "vendor/", "venv/", ".venv/", "__pycache__/",
+    "dist/", "build/", "target/", "out/", ".next/", "coverage/",
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock",
+    "composer.lock", "Cargo.lock", "Gemfile.lock",
+    "*.min.js", "*.min.css", "*.map", "*.ipynb",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.ico", "*.bmp", "*.svg", "*.pdf",
+    "*.zip", "*.gz", "*.tar", "*.7z", "*.rar", "*.jar", "*.war", "*.class",
+    "*.exe", "*.dll", "*.so", "*.dylib", "*.o", "*.a", "*.pyc",
+    "*.mp3", "*.mp4", "*.wav", "*.avi", "*.mov", "*.woff", "*.woff2", "*.ttf", "*.eot",
+    "*.db", "*.sqlite", "*.sqlite3",
+)
+
+
+def _to_glob(pattern: str) -> str:
+    """Motif de type .gitignore → glob git (pathspec :(glob)) relatif à la racine."""
+    pattern = pattern.strip()
+    directory = pattern.endswith("/")
+    pattern = pattern.strip("/")
+    if "/" not in pattern:
+        pattern = "**/" + pattern
+    return pattern + "/**" if directory else pattern
+
+
+def _expand(globs: Iterable[str]) -> List[str]:
+    """Un motif qui désigne un dossier désigne aussi son contenu (« src » → « src/** »)."""
+    out = []
+    for glob in globs:
+        out.append(glob)
+        if not glob.endswith("/**"):
+            out.append(glob + "/**")
+    return out
+
+
+def _glob_regex(glob: str):
+    """Expression régulière équivalente à un glob git (** traverse les dossiers, * non)."""
+    out, i = [], 0
+    while i < len(glob):
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == len(glob):
+            out.append("/.*")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif glob[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif glob[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(glob[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z", re.IGNORECASE)
+
+
+class PathFilter:
+    """
+    Règles d'inclusion/exclusion de chemins, appliquées :
+      - par git, sous forme de pathspecs (`pathspecs()`), avant tout calcul de diff ;
+      - en Python (`allows()`), pour des listes de fichiers venant d'ailleurs
+        (archeologist, arbre du commit analysé).
+    Sans règle d'inclusion, tout ce qui n'est pas exclu est retenu. La casse est
+    ignorée (« IMG.PNG » est un « *.png »).
+    """
+
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = ()):
+        self.include = [_to_glob(p) for p in include if p.strip()]
+        self.exclude = [_to_glob(p) for p in exclude if p.strip()]
+        self._include_re = [_glob_regex(g) for g in _expand(self.include)]
+        self._exclude_re = [_glob_regex(g) for g in _expand(self.exclude)]
+
+    def pathspecs(self) -> List[str]:
+        return ([f":(glob,icase){g}" for g in _expand(self.include)]
+                + [f":(glob,icase,exclude){g}" for g in _expand(self.exclude)])
+
+    def allows(self, path: str) -> bool:
+        if self._include_re and not any(r.match(path) for r in self._include_re):
+            return False
+        return not any(r.match(path) for r in self._exclude_re)
+
+    def filter(self, paths: Iterable[str]) -> List[str]:
+        return [p for p in paths if self.allows(p)]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [p.strip() for p in (value or "").split(",") if p.strip()]
+
+
+def _load_overrides(path: Optional[str]) -> Dict[str, Dict]:
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        app.logger.warning(f"Fichier de filtres de chemins {path} illisible : {e}")
+        return {}
+
+
+def path_filter_for(repo_name: Optional[str] = None, include: Sequence[str] = ()) -> PathFilter:
+    """
+    Filtre applicable au dépôt `repo_name` (nom du clone) :
+      exclusions = DEFAULT_EXCLUDES (sauf PATH_FILTERS_DEFAULTS=false) + PATH_EXCLUDES,
+      inclusions = PATH_INCLUDES + `include` (chemins demandés par l'appelant),
+    puis surcharges du dépôt lues dans PATH_FILTERS_FILE (JSON) :
+      {"<nom du dépôt>": {"include": [...], "exclude": [...], "defaults": false}}
+    """
+    overrides = get_cache("path_filters", 60).get_or_load(
+        "overrides", lambda: _load_overrides(app.config["PATH_FILTERS_FILE"])
+    ).get(repo_name or "", {})
+
+    use_defaults = overrides.get("defaults", app.config["PATH_FILTERS_DEFAULTS"])
+    exclude = (list(DEFAULT_EXCLUDES) if use_defaults else []) + _split(app.config["PATH_EXCLUDES"])
+    exclude += overrides.get("exclude", [])
+    include = _split(app.config["PATH_INCLUDES"]) + list(include) + overrides.get("include", [])
+    return PathFilter(include, exclude)
@@ -0,0 +1,210 @@
+import math
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+from flask import current_app as app
+
+from .git_reader import GitCommit, GitReader
+
+# Analyse approchée des très gros dépôts : l'historique complet est lu sans diff
+# (en-têtes seuls, peu coûteux), puis seuls les commits d'un échantillon sont
+# comparés (`git log --numstat --no-walk`). Les comptes par commit (auteurs, dates,
+# branches) restent exacts ; les comptes de lignes et de fichiers sont extrapolés
+# (estimateur d'Horvitz-Thompson stratifié) avec une marge d'erreur à 95 %.
+#
+# Modes :
+#   "exact"  : aucun échantillonnage (défaut) ;
+#   "stride" : un commit sur `every` ;
+#   "time"   : `size` commits répartis sur SAMPLING_STRATA périodes de même durée,
+#              proportionnellement au nombre de commits de chaque période ;
+#   "auto"   : exact jusqu'à SAMPLING_TARGET_COMMITS commits, "stride" au-delà.
+
+MODES = ("exact", "auto", "stride", "time")
+_Z95 = 1.96
+
+
+class Sampling:
+    """Paramètres d'échantillonnage d'une analyse (voir MODES)."""
+
+    def __init__(self, mode: str = "exact", every: Optional[int] = None, size: Optional[int] = None,
+                 strata: int = 10):
+        if mode not in MODES:
+            raise ValueError(f"Mode d'échantillonnage inconnu : {mode} (attendu : {', '.join(MODES)})")
+        if every is not None and every < 1:
+            raise ValueError("sample_every doit être au moins 1")
+        if size is not None and size < 2:
+            raise ValueError("sample_size doit être au moins 2")
+        self.mode = mode
+        self.every = every
+        self.size = size
+        self.strata = max(1, strata)
+
+    @classmethod
+    def from_args(cls, mode: Optional[str] = None, every: Optional[int] = None,
+                  size: Optional[int] = None) -> "Sampling":
+        """Paramètres d'une requête, complétés par SAMPLING_MODE / SAMPLING_TARGET_COMMITS / SAMPLING_STRATA."""
+        mode = (mode or app.config["SAMPLING_MODE"]).lower()
+        if mode == "stride" and every is None:
+            mode = "auto"
+        return cls(mode, int(every) if every is not None else None,
+                   int(size) if size is not None else app.config["SAMPLING_TARGET_COMMITS"],
+                   app.config["SAMPLING_STRATA"])
+
+    @property
+    def exact(self) -> bool:
+        return self.mode == "exact"
+
+
+class SampledHistory:
+    """
+    Historique d'un dépôt parcouru selon `sampling` : itérer donne des (commit, poids).
+    Un commit échantillonné a ses `modified_files` et un poids N_h / n_h (nombre de
+    commits de sa strate / nombre échantillonné) ; les autres n'ont que leur en-tête
+    et un poids 0. Sans échantillonnage, chaque commit a ses fichiers et un poids de 1.
+    Pendant le parcours, `add(clé, valeur)` enregistre la contribution du commit
+    courant à un total estimé, dont `margin(clé)` donne la marge d'erreur.
+    Les autres arguments sont ceux de GitReader.iter_commits.
+    """
+
+    def __init__(self, reader: GitReader, sampling: Optional[Sampling] = None, **walk):
+        self.reader = reader
+        self.sampling = sampling or Sampling()
+        self.walk = walk
+        self.population = 0
+        self.sample_size = 0
+        self.exact = True
+        self._every: Optional[int] = None
+        # strate -> [N_h, n_h] ; (clé, strate) -> [Σy, Σy²]
+        self._strata: Dict[int, List[int]] = {}
+        self._sums: Dict[Tuple[Hashable, int], List[float]] = defaultdict(lambda: [0.0, 0.0])
+        self._pending: Dict[Hashable, float] = defaultdict(float)
+        self._stratum: Optional[int] = None
+
+    def __iter__(self) -> Iterator[Tuple[GitCommit, float]]:
+        if self.sampling.exact:
+            for commit in self.reader.iter_commits(**self.walk):
+                self.population += 1
+                yield commit, 1
+            self.sample_size = self.population
+            return
+
+        headers = list(self.reader.iter_commits(numstat=False, **self.walk))
+        self.population = len(headers)
+        selected = self._select(headers)
+        self.sample_size = len(selected)
+        self.exact = all(n == N for N, n in self._strata.values())
+
+        walk = {k: v for k, v in self.walk.items() if k in ("mailmap", "paths", "sparse")}
+        detailed = {c.hash: c for c in self.reader.iter_commits(commits=[headers[i].hash for i in sorted(selected)],
+                                                                 **walk)}
+        for i, header in enumerate(headers):
+            self._flush()
+            self._stratum = stratum = selected.get(i)
+            if stratum is None:
+                yield header, 0.0
+                continue
+            N, n = self._strata[stratum]
+            yield detailed.get(header.hash, header), (1 if self.exact else N / n)
+        self._flush()
+
+    # --- Sélection ----------------------------------------------------------
+
+    def _select(self, headers: Sequence[GitCommit]) -> Dict[int, int]:
+        """{indice dans `headers`: strate} des commits à comparer ; remplit self._strata."""
+        N = len(headers)
+        mode, size = self.sampling.mode, self.sampling.size or N
+        if mode == "auto":
+            mode = "stride"
+            self._every = max(1, math.ceil(N / size))
+        elif mode == "stride":
+            self._every = self.sampling.every
+
+        if mode == "stride":
+            k = self._every
+            selected = {i: 0 for i in range(k // 2 if N > k // 2 else 0, N, k)}
+            self._strata = {0: [N, len(selected)]} if N else {}
+            return selected
+
+        # "time" : strates de même durée (date d'auteur), allocation proportionnelle
+        if not N:
+            return {}
+        dates = [c.author_date.timestamp() for c in headers]
+        start, span = min(dates), (max(dates) - min(dates)) or 1.0
+        count = self.sampling.strata
+        members: Dict[int, List[int]] = defaultdict(list)
+        for i, ts in enumerate(dates):
+            members[min(count - 1, int((ts - start) / span * count))].append(i)
+
+        selected = {}
+        for stratum, indices in members.items():
+            N_h = len(indices)
+            n_h = min(N_h, max(2, round(size * N_h / N)))
+            # n_h commits régulièrement espacés dans la strate (résultat reproductible)
+            for j in range(n_h):
+                selected[indices[int((j + 0.5) * N_h / n_h)]] = stratum
+            self._strata[stratum] = [N_h, n_h]
+        return selected
+
+    # --- Estimation ---------------------------------------------------------
+
+    def add(self, key: Hashable, value: float = 1):
+        """Ajoute `value` à la contribution du commit courant au total `key` (ignoré si exact ou non tiré)."""
+        if not self.exact and self._stratum is not None:
+            self._pending[key] += value
+
+    def _flush(self):
+        for key, value in self._pending.items():
+            sums = self._sums[(key, self._stratum)]
+            sums[0] += value
+            sums[1] += value * value
+        self._pending.clear()
+
+    def estimate(self, key: Hashable) -> float:
+        return sum(N / n * self._sums[(key, h)][0] for h, (N, n) in self._strata.items() if (key, h) in self._sums)
+
+    def margin(self, key: Hashable) -> float:
+        """Demi-largeur de l'intervalle de confiance à 95 % du total `key` (0 si exact)."""
+        if self.exact:
+            return 0.0
+        variance = 0.0
+        for h, (N, n) in self._strata.items():
+            if n >= N or (key, h) not in self._sums:
+                continue
+            total, squares = self._sums[(key, h)]
+            # Un seul commit tiré dans la strate : dispersion inconnue, majorée par y²
+            s2 = (squares - total * total / n) / (n - 1) if n > 1 else total * total
+            variance += N * N * (1 - n / N) * s2 / n
+        return _Z95 * math.sqrt(max(variance, 0.0))
+
+    def report(self, margins: Optional[Dict[str, Hashable]] = None,
+               sample_only: Sequence[str] = ()) -> Dict[str, Any]:
+        """
+        Résumé pour la réponse : {"mode", "exact", "population", "sample", "confidence"},
+        plus "every" / "strata" selon le mode et, hors mode exact, "margins" :
+        {nom: {"estimate", "margin", "relative"}} pour chaque clé de `margins`, et
+        "sample_only" : les champs `sample_only` de la réponse, calculés sur les seuls
+        commits tirés (ni extrapolés ni assortis d'une marge).
+        """
+        result: Dict[str, Any] = {
+            "mode": self.sampling.mode,
+            "exact": self.exact,
+            "population": self.population,
+            "sample": self.sample_size,
+            "confidence": 0.95,
+        }
+        if self._every is not None:
+            result["every"] = self._every
+        if self.sampling.mode == "time":
+            result["strata"] = len(self._strata)
+        if not self.exact and sample_only:
+            result["sample_only"] = list(sample_only)
+        if not self.exact and margins:
+            result["margins"] = {}
+            for name, key in margins.items():
+                estimate, margin = self.estimate(key), self.margin(key)
+                result["margins"][name] = {
+                    "estimate": round(estimate),
+                    "margin": round(margin),
+                    "relative": round(margin / estimate, 4) if estimate else None,
+                }
+        return result
@@ -0,0 +1,125 @@
+import hashlib
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import current_app as app
+
+from .cache import get_cache
+from .dir_manager import DirManager
+from .git_reader import GitReader
+from .git_runner import run_git
+from .instrumentation import timed
+from .path_filters import path_filter_for
+
+# Historique du template du cours, commun à tous les dépôts de TD : il est repéré
+# une fois (dépôt template configuré, ou commits partagés par la cohorte dans la
+# réserve d'objets des clones), résumé une fois, puis exclu du parcours de chaque
+# étudiant (`git log ... --not <pointes du template>`).
+
+
+def detect_template(cohort: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Historique du template, ou None si aucun n'est repéré (ou TEMPLATE_HISTORY_MODE=off) :
+      {"source": "template_repo" | "cohort", "tips": [sha...],
+       "commits", "additions", "deletions", "files"}
+    `tips` sont les commits les plus récents du template ; leurs ancêtres en font partie.
+    Mode "auto" : TEMPLATE_REPO_URL s'il est configuré, sinon les commits accessibles
+    depuis au moins TEMPLATE_MIN_SHARE des dépôts de `cohort` (noms de clones), et au
+    moins deux. Sans cohorte (analyse d'un seul dépôt), seul TEMPLATE_REPO_URL est utilisé.
+    """
+    if app.config["TEMPLATE_HISTORY_MODE"] == "off":
+        return None
+    try:
+        return _detect(cohort)
+    except Exception as e:
+        app.logger.warning(f"Historique du template non déterminé : {e}")
+        return None
+
+
+def _detect(cohort: Iterable[str]) -> Optional[Dict[str, Any]]:
+    cache = get_cache("template_history", app.config["TEMPLATE_CACHE_TTL"])
+
+    template_url = app.config["TEMPLATE_REPO_URL"]
+    if template_url:
+        return cache.get_or_load(("template_repo", template_url), lambda: _load_template_repo(template_url))
+
+    pool_path = DirManager.object_pool()
+    if pool_path is None or not os.path.isdir(pool_path):
+        return None
+    refs = _pool_refs(pool_path, set(cohort))
+    if len({name for name, _ in refs}) < 2:
+        return None
+    # Les pointes font partie de la clé : un nouveau dépôt dans la réserve invalide l'entrée
+    min_share = app.config["TEMPLATE_MIN_SHARE"]
+    fingerprint = hashlib.sha1(repr((refs, min_share)).encode()).hexdigest()
+    return cache.get_or_load(("cohort", pool_path, fingerprint),
+                             lambda: _load_cohort(pool_path, refs, min_share))
+
+
+def present_tips(reader: GitReader, template: Optional[Dict[str, Any]]) -> List[str]:
+    """Pointes du template lisibles depuis le dépôt de `reader` (objets propres ou réserve partagée)."""
+    if not template:
+        return []
+    return [sha for sha in template["tips"] if reader.resolve(sha)]
+
+
+def _pool_refs(pool_path: str, cohort: set):
+    """[(nom du dépôt, sha)] des branches rangées dans la réserve sous refs/pool/<nom>/heads/."""
+    output = run_git(["for-each-ref", "--format=%(objectname) %(refname)", "refs/pool"],
+                     repo=pool_path, text=True).stdout.split()
+    refs = []
+    for sha, ref in zip(output[::2], output[1::2]):
+        name = ref.split("/")[2]
+        if name in cohort:
+            refs.append((name, sha))
+    return sorted(refs)
+
+
+def _load_cohort(pool_path: str, refs, min_share: float) -> Optional[Dict[str, Any]]:
+    bits: Dict[str, int] = {}
+    tips: Dict[str, int] = {}
+    for name, sha in refs:
+        bit = bits.setdefault(name, 1 << len(bits))
+        tips[sha] = tips.get(sha, 0) | bit
+    threshold = max(2, math.ceil(min_share * len(bits)))
+
+    # Un commit partagé par assez de dépôts l'est aussi de ses ancêtres : l'ensemble
+    # partagé est décrit par ses commits sans enfant partagé.
+    boundary = []
+    below_shared = set()
+    with timed("history"), GitReader(pool_path) as reader:
+        for sha, parents, mask in reader.reachability(tips):
+            if bin(mask).count("1") < threshold:
+                continue
+            if sha not in below_shared:
+                boundary.append(sha)
+            below_shared.update(parents)
+    if not boundary:
+        return None
+    return _summarize("cohort", pool_path, boundary)
+
+
+def _load_template_repo(template_url: str) -> Optional[Dict[str, Any]]:
+    path = DirManager.clone_update_repo(template_url)
+    output = run_git(["for-each-ref", "--format=%(objectname)", "refs/remotes/origin"],
+                     repo=path, text=True).stdout.split()
+    boundary = sorted(set(output))
+    if not boundary:
+        return None
+    return _summarize("template_repo", path, boundary)
+
+
+def _summarize(source: str, repo_path: str, boundary: List[str]) -> Dict[str, Any]:
+    """Parcourt une seule fois l'historique du template (totaux exclus des analyses)."""
+    template = {"source": source, "tips": boundary, "commits": 0, "additions": 0, "deletions": 0, "files": 0}
+    with timed("history"), GitReader(repo_path) as reader:
+        for commit in reader.iter_commits(revisions=boundary, paths=path_filter_for().pathspecs(), sparse=True):
+            template["commits"] += 1
+            for mod in commit.modified_files:
+                template["additions"] += mod.added_lines
+                template["deletions"] += mod.deleted_lines
+                template["files"] += 1
+    app.logger.info(f"Historique du template ({source}) : {template['commits']} commits, "
+                    f"{len(boundary)} pointe(s)")
+    return template
@@ -0,0 +1,85 @@
+import hashlib
+from datetime import timezone
+from typing import Iterable, Optional, Tuple
+
+import mysql.connector
+from flask import current_app as app, request, Response
+from werkzeug.http import quote_etag, http_date
+from .database import get_db_connection
+
+# Tables lues par chaque ressource : leur numéro de version (table `change_log`,
+# incrémenté par trigger à chaque INSERT/UPDATE/DELETE) sert à construire l'ETag.
+STUDENTS_TABLES = (
+    "students", "groups_students", "groups", "years_students",
+    "student_git_accounts", "repositories_students", "repositories_groups", "repositories",
+)
+GROUPS_TABLES = ("groups", "groups_students", "students")
+GROUP_REPOSITORIES_TABLES = ("repositories_groups", "repositories")
+STUDENT_REPOSITORIES_TABLES = ("repositories_students", "repositories")
+
+
+def get_version_stamp(cursor, tables: Iterable[str], scope: str = "") -> Tuple[Optional[str], Optional[object]]:
+    """
+    Lit les compteurs de `change_log` pour `tables` (une seule petite requête)
+    et retourne (etag, last_modified). Retourne (None, None) si la table
+    `change_log` n'existe pas (migration non appliquée) : pas de GET conditionnel.
+    """
+    tables = tuple(tables)
+    format_strings = ','.join(['%s'] * len(tables))
+    try:
+        cursor.execute(
+            f"SELECT table_name, version, updated_at FROM change_log WHERE table_name IN ({format_strings})",
+            tables
+        )
+        rows = cursor.fetchall()
+    except mysql.connector.Error as e:
+        app.logger.debug(f"change_log indisponible, ETag désactivé : {e}")
+        return None, None
+
+    versions = {row["table_name"]: row["version"] for row in rows}
+    stamp = ";".join(f"{t}={versions.get(t, 0)}" for t in tables)
+    etag = hashlib.sha1(f"{request.endpoint}|{scope}|{stamp}".encode()).hexdigest()[:20]
+    last_modified = max((row["updated_at"] for row in rows if row["updated_at"]), default=None)
+    if last_modified is not None:
+        # DATETIME naïf écrit en UTC par les triggers (UTC_TIMESTAMP())
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return etag, last_modified
+
+
+def fetch_version_stamp(tables: Iterable[str], scope: str = "") -> Tuple[Optional[str], Optional[object]]:
+    """Comme get_version_stamp, avec sa propre connexion (pour les ressources servies depuis un cache)."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        return get_version_stamp(conn.cursor(dictionary=True), tables, scope)
+    finally:
+        if conn:
+            conn.close()
+
+
+def is_not_modified(etag: Optional[str], last_modified=None) -> bool:
+    """Vrai si la requête (If-None-Match / If-Modified-Since) correspond à la version courante."""
+    if etag is None:
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        since = request.if_modified_since
+        since = since.astimezone(timezone.utc) if since.tzinfo else since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(etag: Optional[str], last_modified=None) -> dict:
+    headers = {}
+    if etag is not None:
+        headers["ETag"] = quote_etag(etag)
+        # Le client doit revalider à chaque fois (la revalidation coûte une requête minuscule)
+        headers["Cache-Control"] = "no-cache"
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: Optional[str], last_modified=None) -> Response:
+    return Response(status=304, headers=cache_headers(etag, last_modified))
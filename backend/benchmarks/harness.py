@@ -0,0 +1,98 @@
+"""
+Mesure, sauvegarde et comparaison des benchmarks (équivalent minimal de
+pytest-benchmark, sans dépendance supplémentaire).
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCHMARKS = {}
+
+
+def benchmark(name, rounds=5, warmup=1, group=None):
+    """
+    Enregistre une fonction de benchmark. La fonction reçoit le contexte
+    (dict préparé par le runner) et retourne la fonction à chronométrer,
+    ce qui permet d'exclure la préparation de la mesure.
+    Si elle retourne None, le benchmark est ignoré (prérequis absent).
+    """
+    def decorator(func):
+        BENCHMARKS[name] = {"func": func, "rounds": rounds, "warmup": warmup, "group": group or name}
+        return func
+    return decorator
+
+
+def measure(target, rounds, warmup):
+    """Chronomètre `target` et retourne les statistiques (en secondes)."""
+    for _ in range(warmup):
+        target()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        target()
+        timings.append(time.perf_counter() - start)
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def machine_info():
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        # Les noyaux mesurés passent presque tous par git : sa version fait partie de la référence
+        git_version = subprocess.check_output(
+            ["git", "--version"], stderr=subprocess.DEVNULL, universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        git_version = None
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "node": platform.node(),
+        "git": git_version,
+    }
+
+
+def save_results(path, results, params):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"machine_info": machine_info(), "params": params, "benchmarks": results}, f, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, threshold, stat="median"):
+    """
+    Compare `current` à `baseline` (résultats de save_results) sur la statistique `stat`.
+    Retourne une liste de (nom, ancien, nouveau, variation, régression).
+    Une régression est une variation relative supérieure à `threshold` (0.2 = +20 %).
+    """
+    rows = []
+    for name, stats in current.items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if not old:
+            continue
+        variation = (stats[stat] - old[stat]) / old[stat] if old[stat] else 0.0
+        rows.append((name, old[stat], stats[stat], variation, variation > threshold))
+    return rows
@@ -0,0 +1,342 @@
+"""
+Micro-benchmarks des noyaux d'analyse, sur des dépôts synthétiques fixes
+(générés une fois par tools.synth_data, graine constante).
+
+Benchmarks :
+  - clone_cold / clone_update      DirManager.clone_update_repo (dépôt nu local)
+  - analyze_student                StatsAPI.analyze_student (API GitHub simulée)
+  - lancer_audit                   AuditAPI.lancer_audit
+  - post_processing                notes_td.perform_post_processing_analysis
+  - walk_pydriller / walk_git_reader
+                                   parcours complet de l'historique (lignes par
+                                   fichier) : PyDriller contre GitReader
+  - path_walk_plain / path_walk_commit_graph
+  - rev_list_plain / rev_list_commit_graph
+                                   historique limité à un fichier, et
+                                   `rev-list --all`, sans puis avec commit-graph
+                                   et bitmaps (DirManager.write_indexes)
+  - owner_inference                rattachement par nom de 2 000 dépôts (OwnerInference,
+                                   2 000 étudiants et 300 groupes synthétiques)
+  - import_json_data               JSONToDB.import_json_data (avec --db seulement :
+                                   écrit dans la base configurée par DB_*)
+
+Usage (depuis backend/) :
+    python -m benchmarks.run --save benchmarks/results/baseline.json
+    python -m benchmarks.run --compare benchmarks/results/baseline.json [--threshold 0.2]
+
+Avec --compare, le code de sortie vaut 1 si un benchmark est plus lent que la
+référence de plus de --threshold (comparaison des médianes). Si le fichier de
+référence n'existe pas encore, les résultats y sont enregistrés (première
+exécution sur la machine de mesure) et le code de sortie vaut 0.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from .harness import BENCHMARKS, benchmark, measure, save_results, load_results, compare_results
+
+
+class _GitHubStubResponse:
+    """Réponse vide de l'API GitHub : aucune branche, PR ni exécution CI."""
+    ok = True
+    status_code = 200
+
+    def __init__(self, url):
+        self.url = url
+
+    def json(self):
+        return {"workflow_runs": []} if "/actions/runs" in self.url else []
+
+
+def _github_stub(url, *args, **kwargs):
+    return _GitHubStubResponse(url)
+
+
+def prepare_fixtures(work_dir, commits, files_per_commit, file_size, seed):
+    """Crée (une seule fois par jeu de paramètres) les dépôts nus et les JSON synthétiques."""
+    from tools import synth_data
+
+    fixture_dir = Path(work_dir) / f"fixtures-c{commits}-f{files_per_commit}-s{file_size}-seed{seed}"
+    if not (fixture_dir / "repositories.json").exists():
+        synth_data.main([
+            "--out", str(fixture_dir), "--students", "200", "--groups", "40", "--seed", str(seed),
+        ])
+    repos_dir = fixture_dir / "repos"
+    synth_data.create_git_repository(
+        repos_dir / "bench_td.git", synth_data.random.Random(f"{seed}-td"),
+        commits, files_per_commit, file_size, ["bench.student"], 2025,
+    )
+    synth_data.create_git_repository(
+        repos_dir / "bench_projet.git", synth_data.random.Random(f"{seed}-projet"),
+        commits, files_per_commit, file_size, ["bench.alice", "bench.bob", "bench.chloe"], 2025,
+    )
+    return fixture_dir
+
+
+@benchmark("clone_cold", rounds=3, group="clone")
+def bench_clone_cold(ctx):
+    from app.utils.dir_manager import DirManager
+
+    base = Path(ctx["work_dir"]) / "clones_cold"
+    shutil.rmtree(base, ignore_errors=True)
+    counter = iter(range(10**6))
+
+    def run():
+        DirManager.clone_update_repo(ctx["td_url"], base_dir=str(base / str(next(counter))))
+    return run
+
+
+@benchmark("clone_update", rounds=5, group="clone")
+def bench_clone_update(ctx):
+    from app.utils.dir_manager import DirManager
+
+    DirManager.clone_update_repo(ctx["td_url"])
+    return lambda: DirManager.clone_update_repo(ctx["td_url"])
+
+
+@benchmark("analyze_student", rounds=3)
+def bench_analyze_student(ctx):
+    from app.routes.stats import StatsAPI
+
+    api = StatsAPI()
+
+    def run():
+        with mock.patch("requests.get", _github_stub):
+            result = api.analyze_student(1, "Bench", "STUDENT", ctx["td_url"], None, {"global": "18:00"}, None)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+    return run
+
+
+@benchmark("lancer_audit", rounds=3)
+def bench_lancer_audit(ctx):
+    from app.routes.audit import AuditAPI
+
+    api = AuditAPI()
+
+    def run():
+        result = api.lancer_audit(ctx["projet_url"])
+        if "error" in result:
+            raise RuntimeError(result["error"])
+    return run
+
+
+@benchmark("post_processing", rounds=5)
+def bench_post_processing(ctx):
+    from app.utils.dir_manager import DirManager
+    from app.modules.notes_td import perform_post_processing_analysis
+
+    clone_path = DirManager.clone_update_repo(ctx["projet_url"])
+    paths = subprocess.check_output(["git", "-C", clone_path, "ls-files"], universal_newlines=True).split()
+    analysis_data = {"file_changes": {path: [] for path in paths}}
+    return lambda: perform_post_processing_analysis(analysis_data, clone_path)
+
+
+@benchmark("walk_pydriller", rounds=3, group="history")
+def bench_walk_pydriller(ctx):
+    from app.utils.dir_manager import DirManager
+
+    try:
+        from pydriller import Repository
+    except ImportError:
+        print("  (pydriller absent, benchmark ignoré)")
+        return None
+    clone_path = DirManager.clone_update_repo(ctx["projet_url"])
+
+    def run():
+        for commit in Repository(clone_path).traverse_commits():
+            for mod in commit.modified_files:
+                mod.added_lines, mod.deleted_lines
+    return run
+
+
+@benchmark("walk_git_reader", rounds=3, group="history")
+def bench_walk_git_reader(ctx):
+    from app.utils.dir_manager import DirManager
+    from app.utils.git_reader import GitReader
+
+    clone_path = DirManager.clone_update_repo(ctx["projet_url"])
+
+    def run():
+        with GitReader(clone_path) as reader:
+            for commit in reader.iter_commits():
+                for mod in commit.modified_files:
+                    mod.added_lines, mod.deleted_lines
+    return run
+
+
+def _graph_fixture(ctx, indexed):
+    """Clone autonome du dépôt projet, avec ou sans index de parcours, et un fichier à suivre."""
+    from app.utils.dir_manager import DirManager
+
+    path = Path(ctx["work_dir"]) / ("graph_indexed" if indexed else "graph_plain")
+    if not path.exists():
+        subprocess.run(["git", "clone", "--quiet", "--no-local", ctx["projet_url"], str(path)], check=True)
+        if indexed:
+            DirManager.write_indexes(str(path))
+    tracked = subprocess.check_output(["git", "-C", str(path), "ls-files"], universal_newlines=True).split()
+    return str(path), tracked[0]
+
+
+def _bench_path_walk(ctx, indexed):
+    from app.utils.git_reader import GitReader
+
+    path, tracked = _graph_fixture(ctx, indexed)
+
+    def run():
+        with GitReader(path) as reader:
+            for _ in reader.iter_commits(paths=[tracked]):
+                pass
+    return run
+
+
+def _bench_rev_list(ctx, indexed):
+    path, _ = _graph_fixture(ctx, indexed)
+    return lambda: subprocess.run(["git", "-C", path, "rev-list", "--count", "--all"],
+                                  check=True, stdout=subprocess.DEVNULL)
+
+
+@benchmark("path_walk_plain", rounds=5, group="commit-graph")
+def bench_path_walk_plain(ctx):
+    return _bench_path_walk(ctx, indexed=False)
+
+
+@benchmark("path_walk_commit_graph", rounds=5, group="commit-graph")
+def bench_path_walk_commit_graph(ctx):
+    return _bench_path_walk(ctx, indexed=True)
+
+
+@benchmark("rev_list_plain", rounds=5, group="commit-graph")
+def bench_rev_list_plain(ctx):
+    return _bench_rev_list(ctx, indexed=False)
+
+
+@benchmark("rev_list_commit_graph", rounds=5, group="commit-graph")
+def bench_rev_list_commit_graph(ctx):
+    return _bench_rev_list(ctx, indexed=True)
+
+
+@benchmark("owner_inference", rounds=5)
+def bench_owner_inference(ctx):
+    from app.utils.owner_matcher import OwnerInference
+    from tools import synth_data
+
+    rng = synth_data.random.Random("owner-inference")
+    students, groups = synth_data.generate_roster(rng, 2000, 300, 2025)
+    names = [repo["name"] for repo in synth_data.generate_repositories(students, groups, 2025)]
+
+    def run():
+        inference = OwnerInference()
+        for group in groups:
+            inference.add_group(group["name"], (group["name"], group["year"]))
+        for n, student in enumerate(students):
+            for username in student["git_usernames"]:
+                inference.add_user(username, n)
+        for name in names:
+            inference.infer(name)
+    return run
+
+
+@benchmark("import_json_data", rounds=3)
+def bench_import_json_data(ctx):
+    from app.utils.database import get_db_connection
+    from app.utils.json_to_db import JSONToDB
+
+    if not ctx["with_db"]:
+        return None
+    conn = get_db_connection(instanciation=True)
+    if conn is None:
+        print("  (base injoignable, benchmark ignoré)")
+        return None
+    conn.close()
+
+    def run():
+        if not JSONToDB.import_json_data():
+            raise RuntimeError("import JSON échoué")
+    return run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "repo-analyzer-bench"),
+                        help="dossier des dépôts synthétiques et des clones (réutilisé entre deux lancements)")
+    parser.add_argument("--commits", type=int, default=300)
+    parser.add_argument("--files-per-commit", type=int, default=4)
+    parser.add_argument("--file-size", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", action="append", help="ne lancer que ce benchmark (répétable)")
+    parser.add_argument("--rounds", type=int, help="forcer le nombre de mesures par benchmark")
+    parser.add_argument("--db", dest="with_db", action="store_true", help="inclure import_json_data")
+    parser.add_argument("--save", help="écrire les résultats dans ce fichier JSON (référence)")
+    parser.add_argument("--compare", help="comparer à ce fichier de référence")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="ralentissement relatif toléré avant de signaler une régression (défaut : 0.2)")
+    args = parser.parse_args(argv)
+
+    work_dir = Path(args.work_dir)
+    fixture_dir = prepare_fixtures(work_dir, args.commits, args.files_per_commit, args.file_size, args.seed)
+
+    # Doit précéder l'import de l'application (CLONES_DIR est lu à l'import de DirManager)
+    os.environ["CLONES_DIR"] = str(work_dir / "clones")
+    from flask import Flask
+    from app.config import Config
+
+    app = Flask("benchmarks")
+    app.config.from_object(Config)
+    app.config["DATA_DIR"] = str(fixture_dir)
+
+    ctx = {
+        "work_dir": str(work_dir),
+        "with_db": args.with_db,
+        "td_url": (fixture_dir / "repos" / "bench_td.git").resolve().as_uri(),
+        "projet_url": (fixture_dir / "repos" / "bench_projet.git").resolve().as_uri(),
+    }
+
+    results = {}
+    with app.app_context():
+        for name, spec in BENCHMARKS.items():
+            if args.only and name not in args.only:
+                continue
+            target = spec["func"](ctx)
+            if target is None:
+                print(f"{name:<24} ignoré")
+                continue
+            stats = measure(target, args.rounds or spec["rounds"], spec["warmup"])
+            stats["group"] = spec["group"]
+            results[name] = stats
+            print(f"{name:<24} median {stats['median'] * 1000:>9.1f} ms   min {stats['min'] * 1000:>9.1f} ms   "
+                  f"stddev {stats['stddev'] * 1000:>7.1f} ms   ({stats['rounds']} mesures)")
+
+    params = {"commits": args.commits, "files_per_commit": args.files_per_commit,
+              "file_size": args.file_size, "seed": args.seed}
+    if args.save:
+        save_results(args.save, results, params)
+        print(f"Résultats enregistrés dans {args.save}")
+
+    if not args.compare:
+        return 0
+
+    if not os.path.exists(args.compare):
+        save_results(args.compare, results, params)
+        print(f"Pas de référence : résultats enregistrés dans {args.compare}")
+        return 0
+
+    baseline = load_results(args.compare)
+    if baseline.get("params") != params:
+        print(f"Attention : paramètres différents de la référence ({baseline.get('params')})")
+    rows = compare_results(baseline, results, args.threshold)
+    print(f"\nComparaison avec {args.compare} (médianes, seuil +{args.threshold:.0%})")
+    for name, old, new, variation, regression in rows:
+        flag = "RÉGRESSION" if regression else "ok"
+        print(f"{name:<24} {old * 1000:>9.1f} ms -> {new * 1000:>9.1f} ms  {variation:+7.1%}  {flag}")
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
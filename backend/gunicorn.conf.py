@@ -0,0 +1,36 @@
+# Configuration gunicorn (depuis backend/) : gunicorn -c gunicorn.conf.py main:app
+#
+# Les métriques Prometheus sont agrégées entre workers via PROMETHEUS_MULTIPROC_DIR :
+# le dossier est vidé à la lecture de cette configuration et les valeurs « live » d'un worker
+# arrêté sont retirées à sa sortie.
+
+import os
+import shutil
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+# Un seul worker par défaut : les caches TTL (et leur invalidation après une écriture)
+# et le rapport git (/api/git/report) sont propres à chaque processus. Le travail lourd
+# (git, radon, archeologist) se fait dans des sous-processus ou des appels réseau, les
+# threads suffisent. Avec GUNICORN_WORKERS > 1, les autres workers peuvent servir des
+# listes de dépôts périmées jusqu'à REPOSITORY_CACHE_TTL et chacun a son propre rapport git.
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+# Les analyses (clone + historique git + archeologist) peuvent durer plusieurs minutes
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 900))
+# create_app() importe les JSON dans la base : une seule fois, dans le master, avant le fork
+preload_app = True
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+# Vidé dès la lecture de la configuration par le master : avec preload_app, l'application
+# (et donc prometheus_client) est chargée avant le hook on_starting
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,37 @@
+import subprocess
+from unittest import mock
+
+from flask import Flask
+
+from app.config import Config
+from app.routes.analysis import AnalysisAPI
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def test_snapshot_complexities_run_off_the_request_thread(tmp_path):
+    """La complexité du snapshot (thread dédié, sans contexte applicatif) doit atteindre le post-traitement."""
+    repo = tmp_path / "td_repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    (repo / "module.py").write_text("def f(x):\n    if x:\n        return 1\n    return 0\n")
+    _git(repo, "add", ".")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+
+    flask_app = Flask("tests")
+    flask_app.config.from_object(Config)
+    post_processing = mock.Mock(return_value={"status": "success"})
+    with flask_app.test_request_context(), \
+            mock.patch("app.routes.analysis.DirManager.clone_update_repo", return_value=str(repo)), \
+            mock.patch("app.routes.analysis.code_archeologist_analysis",
+                       return_value={"status": "success", "analysisId": 7}), \
+            mock.patch("app.routes.analysis.process_post_analysis_request", post_processing):
+        payload, status = AnalysisAPI.run_analysis("file:///td_repo", "code_archeologist", 1)
+
+    assert status == 200
+    assert "complexity_ms" in payload["timings"]
+    analysis_id, clone_path, complexities = post_processing.call_args.args
+    assert (analysis_id, clone_path) == (7, str(repo))
+    assert complexities == {"module.py": 2}
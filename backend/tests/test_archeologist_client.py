@@ -0,0 +1,19 @@
+import io
+import json
+
+from app.utils.archeologist_client import _stream_file_paths
+
+
+def test_stream_file_paths_keeps_only_the_post_processing_fields():
+    payload = {
+        "status": "success",
+        "message": "ok",
+        "data": {
+            "id": 12,
+            "codeEvolution": [{"commit": str(i), "blame": {"a.py": i}} for i in range(50)],
+            "file_changes": {"src/a.py": {"count": 3}, "README.md": {"count": 1}},
+        },
+    }
+    summary = _stream_file_paths(io.BytesIO(json.dumps(payload).encode()))
+    assert summary == {"status": "success", "message": "ok", "id": 12,
+                       "file_paths": ["src/a.py", "README.md"]}
@@ -0,0 +1,73 @@
+import subprocess
+import threading
+from unittest import mock
+
+from flask import Flask
+
+from app.utils import dir_manager
+from app.utils.dir_manager import DirManager
+
+
+def _make_repos(tmp_path, count):
+    urls = []
+    for i in range(count):
+        repo = tmp_path / f"src{i}"
+        repo.mkdir()
+        git = lambda *args: subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+        git("init", "-q")
+        (repo / "f.txt").write_text(str(i))
+        git("add", ".")
+        git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+        urls.append(repo.as_uri())
+    return urls
+
+
+def test_update_pool_serializes_fetches_and_skips_recent_ones(tmp_path):
+    """Récupérations concurrentes dans la réserve, puis un second passage qui ne refait rien."""
+    urls = _make_repos(tmp_path, 4)
+    flask_app = Flask("tests")
+    commands = []
+    run_git = dir_manager.run_git
+
+    def spy(args, **kwargs):
+        commands.append(args[0])
+        return run_git(args, **kwargs)
+
+    with mock.patch.object(dir_manager, "run_git", spy):
+        def update(url):
+            with flask_app.app_context():
+                DirManager.update_pool([url], base_dir=tmp_path / "clones")
+
+        threads = [threading.Thread(target=update, args=(url,)) for url in urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert commands.count("fetch") == 4
+
+        commands.clear()
+        with flask_app.app_context():
+            DirManager.update_pool(urls, base_dir=tmp_path / "clones")
+        assert commands == []
+
+    refs = subprocess.run(["git", "for-each-ref", "--format=%(refname)", "refs/pool"],
+                          cwd=tmp_path / "clones" / ".objects.git", capture_output=True, text=True).stdout.split()
+    assert sorted(ref.split("/")[2] for ref in refs) == [f"src{i}" for i in range(4)]
+
+
+def test_pool_maintenance_consolidates_packs(tmp_path):
+    """Une récupération par commit ne fait pas grossir indéfiniment le nombre de packs de la réserve."""
+    (url,) = _make_repos(tmp_path, 1)
+    source = tmp_path / "src0"
+    pool = tmp_path / "clones" / ".objects.git"
+    flask_app = Flask("tests")
+    with flask_app.app_context(), mock.patch.object(dir_manager, "POOL_FETCH_INTERVAL", 0):
+        for i in range(8):
+            (source / f"g{i}.txt").write_text(str(i))
+            subprocess.run(["git", "add", "."], cwd=source, check=True)
+            subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", str(i)],
+                           cwd=source, check=True)
+            DirManager.update_pool([url], base_dir=tmp_path / "clones")
+    packs = list((pool / "objects" / "pack").glob("*.pack"))
+    assert len(packs) <= 3
+    assert list((pool / "objects" / "pack").glob("multi-pack-index*.bitmap"))
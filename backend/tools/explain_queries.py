@@ -0,0 +1,162 @@
+"""
+Vérification des plans d'exécution des requêtes SQL émises par les routes.
+
+Lance l'application contre une base MySQL seedée (import JSON de create_app),
+appelle les routes de lecture avec le client de test Flask en enregistrant
+chaque SELECT exécuté, puis lance un EXPLAIN sur chacun. Le script échoue
+(code de sortie 1) si un plan contient un parcours complet (`type = ALL`)
+d'une table d'au moins --min-rows lignes, sauf pour la table principale d'une
+requête de listing sans WHERE (parcours complet attendu).
+
+Usage (depuis backend/, avec les variables DB_* de la base de test) :
+    python -m tools.explain_queries [--min-rows 100]
+
+Pour des plans représentatifs, seeder d'abord un volume réaliste de données.
+"""
+
+import argparse
+import re
+import sys
+from contextlib import contextmanager
+
+import mysql.connector.cursor
+try:
+    import mysql.connector.cursor_cext as cursor_cext
+except ImportError:
+    cursor_cext = None
+
+from app import create_app
+from app.routes.stats import StatsAPI
+from app.routes.analysis import AnalysisAPI
+from app.utils.database import get_db_connection
+
+
+class QueryRecorder:
+    """Enregistre les SELECT exécutés par n'importe quel curseur mysql-connector."""
+
+    def __init__(self):
+        self.queries = {}
+        self.enabled = True
+
+    def install(self):
+        classes = [mysql.connector.cursor.MySQLCursor]
+        if cursor_cext is not None:
+            classes.append(cursor_cext.CMySQLCursor)
+        for cls in classes:
+            original = cls.execute
+
+            def execute(cursor, operation, params=(), *args, _original=original, **kwargs):
+                if self.enabled and operation.lstrip().upper().startswith("SELECT"):
+                    self.queries.setdefault(_normalize(operation), (operation, params))
+                return _original(cursor, operation, params, *args, **kwargs)
+
+            cls.execute = execute
+
+    @contextmanager
+    def paused(self):
+        self.enabled = False
+        try:
+            yield
+        finally:
+            self.enabled = True
+
+
+def _normalize(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def exercise_routes(app, recorder):
+    """Appelle les routes de lecture avec des identifiants existants."""
+    client = app.test_client()
+
+    with app.app_context(), recorder.paused():
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT MIN(id_student) AS id FROM repositories_students")
+        student_id = cursor.fetchone()["id"] or 1
+        cursor.execute("SELECT MIN(id_group) AS id FROM repositories_groups")
+        group_id = cursor.fetchone()["id"] or 1
+        conn.close()
+
+    for url in (
+        "/api/students",
+        f"/api/students/{student_id}",
+        "/api/groups",
+        f"/api/groups/{group_id}",
+        f"/api/groups/{group_id}/repositories",
+        f"/api/students/{student_id}/repositories",
+    ):
+        response = client.get(url)
+        print(f"GET {url} -> {response.status_code}")
+
+    # /api/stats : seules les requêtes SQL nous intéressent, pas l'analyse git
+    StatsAPI.analyze_student = lambda self, *args, **kwargs: {}
+    response = client.post("/api/stats")
+    print(f"POST /api/stats -> {response.status_code}")
+
+    # /api/analyze (lot) : résolution des dépôts uniquement
+    with app.app_context():
+        AnalysisAPI.resolve_batch_repositories(group_id=group_id)
+        AnalysisAPI.resolve_batch_repositories(student_id=student_id)
+        AnalysisAPI.resolve_batch_repositories(repo_ids=[1, 2, 3])
+
+
+def explain_all(app, recorder, min_rows):
+    failures = []
+    with app.app_context(), recorder.paused():
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        cursor.execute(
+            "SELECT TABLE_NAME AS name, TABLE_ROWS AS table_rows FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        table_rows = {row["name"]: row["table_rows"] or 0 for row in cursor.fetchall()}
+
+        for sql, params in recorder.queries.values():
+            if "information_schema" in sql:
+                continue
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchall()
+            has_where = " WHERE " in f" {_normalize(sql).upper()} "
+            print(f"\n{_normalize(sql)[:120]}")
+            for position, row in enumerate(plan):
+                print(f"  {row['table']!s:<24} type={row['type']!s:<8} key={row['key']!s:<32} rows={row['rows']}")
+                if row["type"] != "ALL":
+                    continue
+                table = _base_table(row["table"], sql)
+                if table_rows.get(table, 0) < min_rows:
+                    continue
+                if position == 0 and not has_where:
+                    continue  # listing complet de la table principale
+                failures.append((sql, row))
+        conn.close()
+    return failures
+
+
+def _base_table(alias, sql):
+    """Retrouve le nom de table derrière un alias de la requête."""
+    match = re.search(rf"(?:FROM|JOIN)\s+`?(\w+)`?\s+(?:AS\s+)?{re.escape(str(alias))}\b", sql, re.IGNORECASE)
+    return match.group(1) if match else alias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=100,
+                        help="ignorer les parcours complets de tables plus petites que ce seuil")
+    args = parser.parse_args(argv)
+
+    recorder = QueryRecorder()
+    recorder.install()
+    app = create_app()
+
+    exercise_routes(app, recorder)
+    failures = explain_all(app, recorder, args.min_rows)
+
+    print(f"\n{len(recorder.queries)} requêtes analysées, {len(failures)} parcours complet(s).")
+    for sql, row in failures:
+        print(f"FULL SCAN sur {row['table']} : {_normalize(sql)[:160]}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
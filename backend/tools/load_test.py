@@ -0,0 +1,154 @@
+"""
+Test de charge de l'API (à lancer contre une instance seedée avec tools.synth_data).
+
+N threads envoient pendant --duration secondes un mélange pondéré de requêtes :
+GET /api/students, GET /api/groups, POST /api/stats et POST /api/audit (dont
+le repo_url est tiré de repositories.json du jeu synthétique). Affiche ensuite,
+par endpoint, le nombre de requêtes, les erreurs, le débit et les latences
+p50/p90/p95/p99/max.
+
+Usage (depuis backend/) :
+    DATA_DIR=/tmp/synth python main.py   # dans un autre terminal
+    python -m tools.load_test --base-url http://localhost:5000 --data /tmp/synth --threads 8 --duration 60
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import requests
+
+DEFAULT_MIX = "students=50,groups=30,stats=5,audit=15"
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - {"students", "groups", "stats", "audit"}
+    if unknown:
+        raise ValueError(f"Scénario(s) inconnu(s) : {', '.join(sorted(unknown))}")
+    return weights
+
+
+class LoadTest:
+    def __init__(self, base_url, repo_urls, weights, timeout, seed):
+        self.base_url = base_url.rstrip("/")
+        self.repo_urls = repo_urls
+        self.names = [name for name, weight in weights.items() if weight > 0]
+        self.weights = [weights[name] for name in self.names]
+        self.timeout = timeout
+        self.seed = seed
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def _request(self, session, rng, name):
+        if name == "students":
+            return session.get(f"{self.base_url}/api/students", timeout=self.timeout)
+        if name == "groups":
+            return session.get(f"{self.base_url}/api/groups", timeout=self.timeout)
+        if name == "stats":
+            return session.post(f"{self.base_url}/api/stats", json={}, timeout=self.timeout)
+        return session.post(f"{self.base_url}/api/audit", json={"repo_url": rng.choice(self.repo_urls)}, timeout=self.timeout)
+
+    def worker(self, index, deadline):
+        rng = random.Random(f"{self.seed}-{index}")
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            name = rng.choices(self.names, self.weights)[0]
+            if name == "audit" and not self.repo_urls:
+                continue
+            start = time.perf_counter()
+            try:
+                ok = self._request(session, rng, name).status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies[name].append(elapsed)
+                if not ok:
+                    self.errors[name] += 1
+        session.close()
+
+    def run(self, nb_threads, duration):
+        deadline = time.monotonic() + duration
+        threads = [threading.Thread(target=self.worker, args=(i, deadline), daemon=True) for i in range(nb_threads)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.monotonic() - start)
+
+    def report(self, wall_time):
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "throughput": round(len(values) / wall_time, 2),
+                **{f"p{p}_ms": round(percentile(values, p) * 1000, 1) for p in (50, 90, 95, 99)},
+                "max_ms": round(values[-1] * 1000, 1),
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        return {
+            "duration_s": round(wall_time, 2),
+            "requests": total,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "throughput": round(total / wall_time, 2) if wall_time else 0,
+            "endpoints": endpoints,
+        }
+
+
+def load_repo_urls(data_dir):
+    if not data_dir:
+        return []
+    with open(Path(data_dir) / "repositories.json", encoding="utf-8") as f:
+        return [repo["repo_url"] for repo in json.load(f) if repo.get("repo_url")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--data", help="dossier généré par tools.synth_data (pour les repo_url de /api/audit)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="durée du test (secondes)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"poids par scénario (défaut : {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_out", help="écrire aussi le rapport dans ce fichier JSON")
+    args = parser.parse_args(argv)
+
+    test = LoadTest(args.base_url, load_repo_urls(args.data), parse_mix(args.mix), args.timeout, args.seed)
+    report = test.run(args.threads, args.duration)
+
+    print(f"{report['requests']} requêtes en {report['duration_s']} s "
+          f"({report['throughput']} req/s), {report['errors']} erreur(s)")
+    print(f"{'endpoint':<10} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, e in report["endpoints"].items():
+        print(f"{name:<10} {e['requests']:>7} {e['errors']:>5} {e['throughput']:>8} {e['p50_ms']:>8} "
+              f"{e['p90_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8} {e['max_ms']:>8}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
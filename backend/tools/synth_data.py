@@ -0,0 +1,185 @@
+"""
+Générateur de jeu de données synthétique (reproductible via --seed).
+
+Produit, dans --out :
+  - students.json, groups.json, repositories.json, deadlines.json au format
+    de backend/data/ (importables en lançant l'API avec DATA_DIR=<out>) ;
+  - avec --git, un dépôt git nu par repository (repos/<name>.git), rempli via
+    `git fast-import` avec --commits commits de --files-per-commit fichiers
+    d'environ --file-size octets. Les URLs de repositories.json pointent alors
+    vers ces dépôts locaux (file://), clonables par DirManager.
+
+Usage (depuis backend/) :
+    python -m tools.synth_data --out /tmp/synth --students 2000 --groups 300 --git --commits 200
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+CLASSES = ("MIAGE-FA", "MIAGE-FI", "IM")
+FIRST_NAMES = ("Alice", "Bob", "Chloé", "David", "Emma", "Farid", "Gaëlle", "Hugo", "Inès", "Jules",
+               "Karim", "Léa", "Mamadou", "Nina", "Omar", "Pauline", "Quentin", "Rania", "Sami", "Tom")
+SURNAMES = ("MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "RICHARD", "PETIT", "DURAND", "LEROY",
+            "MOREAU", "SIMON", "LAURENT", "LEFEBVRE", "MICHEL", "GARCIA", "DAVID", "BERTRAND", "ROUX")
+EXTENSIONS = (".py", ".py", ".js", ".html", ".css", ".md")
+
+
+def generate_roster(rng, nb_students, nb_groups, year):
+    students = []
+    for i in range(nb_students):
+        # Suffixe numérique : (name, surname) reste unique, comme le suppose JSONToDB
+        students.append({
+            "surname": f"{rng.choice(SURNAMES)}{i}",
+            "name": rng.choice(FIRST_NAMES),
+            "no_etudiant": f"{40000000 + i:08d}",
+            "class": rng.choice(CLASSES),
+            "git_usernames": [f"synth.user{i}"] + ([f"synth-alt{i}"] if rng.random() < 0.1 else []),
+            "years": [year],
+        })
+
+    groups = [{"name": str(j + 1), "year": year, "members": []} for j in range(nb_groups)]
+    if groups:
+        for student in students:
+            group = rng.choice(groups)
+            group["members"].append({"nom": student["surname"], "prenom": student["name"]})
+    return students, groups
+
+
+def generate_repositories(students, groups, year, owner="synth-org"):
+    repositories = []
+    for student in students:
+        repositories.append({
+            "name": f"synth_{year}_tds_{student['git_usernames'][0]}",
+            "owner": owner,
+            "linked_student": {"name": student["name"], "surname": student["surname"]},
+        })
+    for group in groups:
+        repositories.append({
+            "name": f"synth_{year}_projets_gr{int(group['name']):03d}",
+            "owner": owner,
+            "linked_group": {"name": group["name"], "year": group["year"]},
+        })
+    return repositories
+
+
+def generate_deadlines(year):
+    saturdays = []
+    day = datetime(year, 1, 1)
+    while day.weekday() != 5:
+        day += timedelta(days=1)
+    for n in range(10):
+        saturdays.append((day + timedelta(weeks=n)).strftime("%Y-%m-%d"))
+    return {
+        "IM_deadlines": [{"event_date": d, "event_time": "17:00", "description": f"TD{n + 1}"} for n, d in enumerate(saturdays)],
+        "MIAGE_deadlines": [{"event_date": d, "event_time": "18:00", "description": f"TD{n + 1}"} for n, d in enumerate(saturdays)],
+        "project_deadlines": [{"event_date": saturdays[-1], "event_time": "19:00", "description": "Deadline Projet Final"}],
+    }
+
+
+def _file_content(rng, size):
+    lines = []
+    total = 0
+    while total < size:
+        if rng.random() < 0.3:
+            line = f"def f_{rng.randrange(10**6)}(x):\n    if x > {rng.randrange(100)}:\n        return x\n    return -x\n"
+        else:
+            line = f"# {rng.getrandbits(64):016x} {rng.getrandbits(64):016x}\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode()
+
+
+def create_git_repository(path, rng, nb_commits, files_per_commit, file_size, authors, year):
+    """Crée un dépôt nu et y importe un historique synthétique avec `git fast-import`."""
+    path = Path(path)
+    if path.exists():
+        return
+    subprocess.run(["git", "init", "--quiet", "--bare", str(path)], check=True)
+    subprocess.run(["git", "--git-dir", str(path), "symbolic-ref", "HEAD", "refs/heads/main"], check=True)
+
+    nb_files = max(files_per_commit * 3, 5)
+    files = [f"src/module_{n}{rng.choice(EXTENSIONS)}" for n in range(nb_files)]
+    # Commits majoritairement le samedi (jour de TD), sur un semestre
+    start = datetime(year, 1, 1, 9, 0, tzinfo=timezone.utc)
+    while start.weekday() != 5:
+        start += timedelta(days=1)
+
+    stream = bytearray()
+    for mark in range(1, nb_commits + 1):
+        when = start + timedelta(weeks=rng.randrange(15), hours=rng.randrange(10), minutes=rng.randrange(60))
+        if rng.random() < 0.2:
+            when += timedelta(days=rng.randrange(1, 6))
+        author = rng.choice(authors)
+        stamp = f"{int(when.timestamp())} +0000"
+        message = f"Commit {mark}\n".encode()
+        stream += b"commit refs/heads/main\n"
+        stream += f"mark :{mark}\n".encode()
+        stream += f"author {author} <{author}@users.noreply.github.com> {stamp}\n".encode()
+        stream += f"committer {author} <{author}@users.noreply.github.com> {stamp}\n".encode()
+        stream += f"data {len(message)}\n".encode() + message
+        if mark > 1:
+            stream += f"from :{mark - 1}\n".encode()
+        for file_path in rng.sample(files, min(files_per_commit, len(files))):
+            content = _file_content(rng, file_size)
+            stream += f"M 644 inline {file_path}\n".encode()
+            stream += f"data {len(content)}\n".encode() + content
+        stream += b"\n"
+
+    subprocess.run(["git", "--git-dir", str(path), "fast-import", "--quiet"], input=bytes(stream), check=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="dossier de sortie")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--git", action="store_true", help="générer aussi les dépôts git synthétiques")
+    parser.add_argument("--commits", type=int, default=100, help="commits par dépôt")
+    parser.add_argument("--files-per-commit", type=int, default=3)
+    parser.add_argument("--file-size", type=int, default=2000, help="taille approximative d'un fichier (octets)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    students, groups = generate_roster(rng, args.students, args.groups, args.year)
+    repositories = generate_repositories(students, groups, args.year)
+
+    repos_dir = out / "repos"
+    members_by_group = {g["name"]: [m["nom"] for m in g["members"]] for g in groups}
+    username_by_surname = {s["surname"]: s["git_usernames"][0] for s in students}
+    for repo in repositories:
+        bare_path = (repos_dir / f"{repo['name']}.git").resolve()
+        repo["repo_url"] = bare_path.as_uri() if args.git else f"https://github.com/{repo['owner']}/{repo['name']}"
+        if not args.git:
+            continue
+        if "linked_student" in repo:
+            authors = [username_by_surname[repo["linked_student"]["surname"]]]
+        else:
+            authors = [username_by_surname[s] for s in members_by_group[repo["linked_group"]["name"]]] or ["synth.nobody"]
+        create_git_repository(bare_path, random.Random(f"{args.seed}-{repo['name']}"), args.commits,
+                              args.files_per_commit, args.file_size, authors, args.year)
+
+    for filename, content in (
+        ("students.json", students),
+        ("groups.json", groups),
+        ("repositories.json", repositories),
+        ("deadlines.json", generate_deadlines(args.year)),
+    ):
+        with open(out / filename, "w", encoding="utf-8") as f:
+            json.dump(content, f, ensure_ascii=False, indent=1)
+
+    print(f"{len(students)} étudiants, {len(groups)} groupes, {len(repositories)} dépôts écrits dans {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
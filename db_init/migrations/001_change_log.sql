@@ -0,0 +1,186 @@
+--
+-- Migration 001 : journal des versions de tables (change_log)
+--
+-- Chaque INSERT / UPDATE / DELETE sur une table lue par les endpoints de
+-- lecture incrémente `change_log.version` pour cette table. L'API s'en sert
+-- pour calculer un ETag (GET conditionnel / 304 Not Modified) sans refaire
+-- les jointures.
+-- Note : les suppressions en cascade (ON DELETE CASCADE) ne déclenchent pas
+-- de trigger, mais la table parente est toujours incluse dans l'ETag des
+-- ressources concernées.
+-- `updated_at` (Last-Modified) est en UTC (UTC_TIMESTAMP()), quel que soit le
+-- fuseau de la session MySQL.
+--
+
+CREATE TABLE IF NOT EXISTS `change_log` (
+  `table_name` varchar(64) NOT NULL,
+  `version` bigint(20) NOT NULL DEFAULT 0,
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`table_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT IGNORE INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES
+  ('students', 0, UTC_TIMESTAMP()),
+  ('groups', 0, UTC_TIMESTAMP()),
+  ('groups_students', 0, UTC_TIMESTAMP()),
+  ('years_students', 0, UTC_TIMESTAMP()),
+  ('student_git_accounts', 0, UTC_TIMESTAMP()),
+  ('repositories', 0, UTC_TIMESTAMP()),
+  ('repositories_groups', 0, UTC_TIMESTAMP()),
+  ('repositories_students', 0, UTC_TIMESTAMP());
+
+DELIMITER $$
+
+--
+-- Triggers for `students`
+--
+DROP TRIGGER IF EXISTS `trg_students_changelog_insert`$$
+CREATE TRIGGER `trg_students_changelog_insert` AFTER INSERT ON `students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_students_changelog_update`$$
+CREATE TRIGGER `trg_students_changelog_update` AFTER UPDATE ON `students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_students_changelog_delete`$$
+CREATE TRIGGER `trg_students_changelog_delete` AFTER DELETE ON `students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+--
+-- Triggers for `groups`
+--
+DROP TRIGGER IF EXISTS `trg_groups_changelog_insert`$$
+CREATE TRIGGER `trg_groups_changelog_insert` AFTER INSERT ON `groups` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('groups', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_groups_changelog_update`$$
+CREATE TRIGGER `trg_groups_changelog_update` AFTER UPDATE ON `groups` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('groups', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_groups_changelog_delete`$$
+CREATE TRIGGER `trg_groups_changelog_delete` AFTER DELETE ON `groups` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('groups', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+--
+-- Triggers for `groups_students`
+--
+DROP TRIGGER IF EXISTS `trg_groups_students_changelog_insert`$$
+CREATE TRIGGER `trg_groups_students_changelog_insert` AFTER INSERT ON `groups_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('groups_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_groups_students_changelog_update`$$
+CREATE TRIGGER `trg_groups_students_changelog_update` AFTER UPDATE ON `groups_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('groups_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_groups_students_changelog_delete`$$
+CREATE TRIGGER `trg_groups_students_changelog_delete` AFTER DELETE ON `groups_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('groups_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+--
+-- Triggers for `years_students`
+--
+DROP TRIGGER IF EXISTS `trg_years_students_changelog_insert`$$
+CREATE TRIGGER `trg_years_students_changelog_insert` AFTER INSERT ON `years_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('years_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_years_students_changelog_update`$$
+CREATE TRIGGER `trg_years_students_changelog_update` AFTER UPDATE ON `years_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('years_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_years_students_changelog_delete`$$
+CREATE TRIGGER `trg_years_students_changelog_delete` AFTER DELETE ON `years_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('years_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+--
+-- Triggers for `student_git_accounts`
+--
+DROP TRIGGER IF EXISTS `trg_student_git_accounts_changelog_insert`$$
+CREATE TRIGGER `trg_student_git_accounts_changelog_insert` AFTER INSERT ON `student_git_accounts` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('student_git_accounts', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_student_git_accounts_changelog_update`$$
+CREATE TRIGGER `trg_student_git_accounts_changelog_update` AFTER UPDATE ON `student_git_accounts` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('student_git_accounts', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_student_git_accounts_changelog_delete`$$
+CREATE TRIGGER `trg_student_git_accounts_changelog_delete` AFTER DELETE ON `student_git_accounts` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('student_git_accounts', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+--
+-- Triggers for `repositories`
+--
+DROP TRIGGER IF EXISTS `trg_repositories_changelog_insert`$$
+CREATE TRIGGER `trg_repositories_changelog_insert` AFTER INSERT ON `repositories` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_changelog_update`$$
+CREATE TRIGGER `trg_repositories_changelog_update` AFTER UPDATE ON `repositories` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_changelog_delete`$$
+CREATE TRIGGER `trg_repositories_changelog_delete` AFTER DELETE ON `repositories` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+--
+-- Triggers for `repositories_groups`
+--
+DROP TRIGGER IF EXISTS `trg_repositories_groups_changelog_insert`$$
+CREATE TRIGGER `trg_repositories_groups_changelog_insert` AFTER INSERT ON `repositories_groups` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories_groups', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_groups_changelog_update`$$
+CREATE TRIGGER `trg_repositories_groups_changelog_update` AFTER UPDATE ON `repositories_groups` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories_groups', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_groups_changelog_delete`$$
+CREATE TRIGGER `trg_repositories_groups_changelog_delete` AFTER DELETE ON `repositories_groups` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories_groups', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+--
+-- Triggers for `repositories_students`
+--
+DROP TRIGGER IF EXISTS `trg_repositories_students_changelog_insert`$$
+CREATE TRIGGER `trg_repositories_students_changelog_insert` AFTER INSERT ON `repositories_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_students_changelog_update`$$
+CREATE TRIGGER `trg_repositories_students_changelog_update` AFTER UPDATE ON `repositories_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_students_changelog_delete`$$
+CREATE TRIGGER `trg_repositories_students_changelog_delete` AFTER DELETE ON `repositories_students` FOR EACH ROW BEGIN
+  INSERT INTO `change_log` (`table_name`, `version`, `updated_at`) VALUES ('repositories_students', 1, UTC_TIMESTAMP())
+  ON DUPLICATE KEY UPDATE `version` = `version` + 1, `updated_at` = UTC_TIMESTAMP();
+END$$
+
+DELIMITER ;
@@ -0,0 +1,39 @@
+--
+-- Migration 002 : index secondaires / couvrants pour les chemins de lecture fréquents
+--
+-- `repositories.name` est déjà indexé par sa contrainte UNIQUE (recherche par nom
+-- de JSONToDB._import_repositories).
+--
+
+--
+-- students : recherche par (surname, name) dans JSONToDB, tri de StudentsAPI.get
+-- (ORDER BY s.surname, s.name, s.class) et filtre par classe dans analyze_class.
+--
+ALTER TABLE `students`
+  ADD KEY `idx_students_surname_name_class` (`surname`, `name`, `class`),
+  ADD KEY `idx_students_class` (`class`);
+
+--
+-- repositories : filtres `r.category = 'TD'` / `'projet'` (analyze_class, StudentsAPI.get).
+-- L'id est inclus pour que l'index serve de jointure couvrante.
+--
+ALTER TABLE `repositories`
+  ADD KEY `idx_repositories_category` (`category`, `id`);
+
+--
+-- student_git_accounts : résolution username -> étudiant lors de l'import.
+--
+ALTER TABLE `student_git_accounts`
+  ADD KEY `idx_sga_git_username` (`git_username`, `id_student`);
+
+--
+-- groups : tri de GroupsAPI.get (ORDER BY g.year, g.name).
+--
+ALTER TABLE `groups`
+  ADD KEY `idx_groups_year_name` (`year`, `name`);
+
+--
+-- configurable_deadlines : lecture par type (deadlines d'une classe).
+--
+ALTER TABLE `configurable_deadlines`
+  ADD KEY `idx_deadlines_type_date` (`type`, `event_date`);
@@ -0,0 +1,257 @@
+--
+-- Migration 003 : vue matérialisée `student_overview`
+--
+-- Une ligne par étudiant avec, dans `overview`, le document JSON renvoyé par
+-- StudentsAPI.get (groupes, années, comptes git, repositories TD et projet).
+-- La table est maintenue par triggers : la liste des étudiants se lit alors
+-- en une seule requête indexée au lieu de jointures + N requêtes par étudiant.
+--
+
+CREATE TABLE IF NOT EXISTS `student_overview` (
+  `id_student` int(11) NOT NULL,
+  `surname` varchar(255) NOT NULL,
+  `name` varchar(255) NOT NULL,
+  `class` enum('MIAGE-FA','MIAGE-FI','IM') NOT NULL,
+  `overview` json NOT NULL,
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id_student`),
+  KEY `idx_student_overview_order` (`surname`, `name`, `class`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+DELIMITER $$
+
+--
+-- Procédures de rafraîchissement
+-- (GROUP_CONCAT ... ORDER BY garantit l'ordre des tableaux, ce que JSON_ARRAYAGG ne fait pas)
+--
+DROP PROCEDURE IF EXISTS `refresh_student_overview`$$
+CREATE PROCEDURE `refresh_student_overview`(IN p_student INT)
+BEGIN
+  SET SESSION group_concat_max_len = 16777216;
+
+  IF NOT EXISTS (SELECT 1 FROM `students` WHERE `id` = p_student) THEN
+    DELETE FROM `student_overview` WHERE `id_student` = p_student;
+  ELSE
+    REPLACE INTO `student_overview` (`id_student`, `surname`, `name`, `class`, `overview`)
+    SELECT
+      s.id, s.surname, s.name, s.class,
+      JSON_OBJECT(
+        'id', s.id,
+        'surname', s.surname,
+        'name', s.name,
+        'no_etudiant', s.no_etudiant,
+        'class', s.class,
+        'git_usernames', CAST(CONCAT('[', COALESCE((
+            SELECT GROUP_CONCAT(JSON_QUOTE(sga.git_username) ORDER BY sga.git_username)
+            FROM `student_git_accounts` sga
+            WHERE sga.id_student = p_student
+          ), ''), ']') AS JSON),
+        'groups', CAST(CONCAT('[', COALESCE((
+            SELECT GROUP_CONCAT(JSON_OBJECT('id', g.id, 'name', g.name, 'year', g.year) ORDER BY g.name, g.year)
+            FROM `groups_students` gs
+            INNER JOIN `groups` g ON gs.id_group = g.id
+            WHERE gs.id_student = p_student
+          ), ''), ']') AS JSON),
+        'years_assigned', CAST(CONCAT('[', COALESCE((
+            SELECT GROUP_CONCAT(ys.id_annee ORDER BY ys.id_annee)
+            FROM `years_students` ys
+            WHERE ys.id_student = p_student
+          ), ''), ']') AS JSON),
+        'repositories_projet', CAST(CONCAT('[', COALESCE((
+            SELECT GROUP_CONCAT(JSON_OBJECT(
+                'id', r.id, 'name', r.name, 'category', r.category,
+                'owner', r.owner, 'repo_url', r.repo_url, 'id_group', rg.id_group
+              ) ORDER BY r.id)
+            FROM `groups_students` gs
+            INNER JOIN `repositories_groups` rg ON rg.id_group = gs.id_group
+            INNER JOIN `repositories` r ON rg.id_repo = r.id
+            WHERE gs.id_student = p_student
+              AND r.category = 'projet'
+          ), ''), ']') AS JSON),
+        'repositories_td', CAST(CONCAT('[', COALESCE((
+            SELECT GROUP_CONCAT(JSON_OBJECT(
+                'id', r.id, 'name', r.name, 'category', r.category,
+                'owner', r.owner, 'repo_url', r.repo_url
+              ) ORDER BY r.id)
+            FROM `repositories_students` rs
+            INNER JOIN `repositories` r ON rs.id_repo = r.id
+            WHERE rs.id_student = p_student
+              AND r.category = 'TD'
+          ), ''), ']') AS JSON)
+      )
+    FROM `students` s
+    WHERE s.id = p_student;
+  END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS `refresh_group_students_overview`$$
+CREATE PROCEDURE `refresh_group_students_overview`(IN p_group INT)
+BEGIN
+  DECLARE done INT DEFAULT 0;
+  DECLARE v_student INT;
+  DECLARE cur CURSOR FOR SELECT `id_student` FROM `groups_students` WHERE `id_group` = p_group;
+  DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = 1;
+
+  OPEN cur;
+  read_loop: LOOP
+    FETCH cur INTO v_student;
+    IF done THEN
+      LEAVE read_loop;
+    END IF;
+    CALL refresh_student_overview(v_student);
+  END LOOP;
+  CLOSE cur;
+END$$
+
+DROP PROCEDURE IF EXISTS `refresh_repository_students_overview`$$
+CREATE PROCEDURE `refresh_repository_students_overview`(IN p_repo INT)
+BEGIN
+  DECLARE done INT DEFAULT 0;
+  DECLARE v_student INT;
+  DECLARE cur CURSOR FOR
+    SELECT rs.id_student FROM `repositories_students` rs WHERE rs.id_repo = p_repo
+    UNION
+    SELECT gs.id_student
+    FROM `repositories_groups` rg
+    INNER JOIN `groups_students` gs ON gs.id_group = rg.id_group
+    WHERE rg.id_repo = p_repo;
+  DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = 1;
+
+  OPEN cur;
+  read_loop: LOOP
+    FETCH cur INTO v_student;
+    IF done THEN
+      LEAVE read_loop;
+    END IF;
+    CALL refresh_student_overview(v_student);
+  END LOOP;
+  CLOSE cur;
+END$$
+
+DROP PROCEDURE IF EXISTS `rebuild_student_overview`$$
+CREATE PROCEDURE `rebuild_student_overview`()
+BEGIN
+  DECLARE done INT DEFAULT 0;
+  DECLARE v_student INT;
+  DECLARE cur CURSOR FOR SELECT `id` FROM `students`;
+  DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = 1;
+
+  DELETE FROM `student_overview`;
+  OPEN cur;
+  read_loop: LOOP
+    FETCH cur INTO v_student;
+    IF done THEN
+      LEAVE read_loop;
+    END IF;
+    CALL refresh_student_overview(v_student);
+  END LOOP;
+  CLOSE cur;
+END$$
+
+--
+-- Triggers for `students`
+--
+DROP TRIGGER IF EXISTS `trg_students_overview_insert`$$
+CREATE TRIGGER `trg_students_overview_insert` AFTER INSERT ON `students` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(NEW.id);
+END$$
+DROP TRIGGER IF EXISTS `trg_students_overview_update`$$
+CREATE TRIGGER `trg_students_overview_update` AFTER UPDATE ON `students` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(NEW.id);
+END$$
+DROP TRIGGER IF EXISTS `trg_students_overview_delete`$$
+CREATE TRIGGER `trg_students_overview_delete` AFTER DELETE ON `students` FOR EACH ROW BEGIN
+  DELETE FROM `student_overview` WHERE `id_student` = OLD.id;
+END$$
+
+--
+-- Triggers for `student_git_accounts`, `years_students`, `groups_students`
+--
+DROP TRIGGER IF EXISTS `trg_student_git_accounts_overview_insert`$$
+CREATE TRIGGER `trg_student_git_accounts_overview_insert` AFTER INSERT ON `student_git_accounts` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(NEW.id_student);
+END$$
+DROP TRIGGER IF EXISTS `trg_student_git_accounts_overview_delete`$$
+CREATE TRIGGER `trg_student_git_accounts_overview_delete` AFTER DELETE ON `student_git_accounts` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(OLD.id_student);
+END$$
+
+DROP TRIGGER IF EXISTS `trg_years_students_overview_insert`$$
+CREATE TRIGGER `trg_years_students_overview_insert` AFTER INSERT ON `years_students` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(NEW.id_student);
+END$$
+DROP TRIGGER IF EXISTS `trg_years_students_overview_delete`$$
+CREATE TRIGGER `trg_years_students_overview_delete` AFTER DELETE ON `years_students` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(OLD.id_student);
+END$$
+
+DROP TRIGGER IF EXISTS `trg_groups_students_overview_insert`$$
+CREATE TRIGGER `trg_groups_students_overview_insert` AFTER INSERT ON `groups_students` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(NEW.id_student);
+END$$
+DROP TRIGGER IF EXISTS `trg_groups_students_overview_delete`$$
+CREATE TRIGGER `trg_groups_students_overview_delete` AFTER DELETE ON `groups_students` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(OLD.id_student);
+END$$
+
+--
+-- Triggers for `groups`
+-- (ON DELETE CASCADE ne déclenche pas de trigger : les liens sont supprimés
+-- explicitement avant la suppression pour rafraîchir les étudiants concernés)
+--
+DROP TRIGGER IF EXISTS `trg_groups_overview_update`$$
+CREATE TRIGGER `trg_groups_overview_update` AFTER UPDATE ON `groups` FOR EACH ROW BEGIN
+  CALL refresh_group_students_overview(NEW.id);
+END$$
+DROP TRIGGER IF EXISTS `trg_groups_overview_delete`$$
+CREATE TRIGGER `trg_groups_overview_delete` BEFORE DELETE ON `groups` FOR EACH ROW BEGIN
+  DELETE FROM `groups_students` WHERE `id_group` = OLD.id;
+  DELETE FROM `repositories_groups` WHERE `id_group` = OLD.id;
+END$$
+
+--
+-- Triggers for `repositories`
+-- (seules les colonnes reprises dans l'aperçu déclenchent un rafraîchissement :
+-- l'écriture de `analysisId` après chaque analyse n'en provoque pas)
+--
+DROP TRIGGER IF EXISTS `trg_repositories_overview_update`$$
+CREATE TRIGGER `trg_repositories_overview_update` AFTER UPDATE ON `repositories` FOR EACH ROW BEGIN
+  IF NOT (OLD.name <=> NEW.name AND OLD.category <=> NEW.category
+          AND OLD.owner <=> NEW.owner AND OLD.repo_url <=> NEW.repo_url) THEN
+    CALL refresh_repository_students_overview(NEW.id);
+  END IF;
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_overview_delete`$$
+CREATE TRIGGER `trg_repositories_overview_delete` BEFORE DELETE ON `repositories` FOR EACH ROW BEGIN
+  DELETE FROM `repositories_students` WHERE `id_repo` = OLD.id;
+  DELETE FROM `repositories_groups` WHERE `id_repo` = OLD.id;
+END$$
+
+--
+-- Triggers for `repositories_students` / `repositories_groups`
+-- (exécutés après les triggers existants qui fixent la catégorie)
+--
+DROP TRIGGER IF EXISTS `trg_repositories_students_overview_insert`$$
+CREATE TRIGGER `trg_repositories_students_overview_insert` AFTER INSERT ON `repositories_students`
+FOR EACH ROW FOLLOWS `trg_repo_student_insert` BEGIN
+  CALL refresh_student_overview(NEW.id_student);
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_students_overview_delete`$$
+CREATE TRIGGER `trg_repositories_students_overview_delete` AFTER DELETE ON `repositories_students` FOR EACH ROW BEGIN
+  CALL refresh_student_overview(OLD.id_student);
+END$$
+
+DROP TRIGGER IF EXISTS `trg_repositories_groups_overview_insert`$$
+CREATE TRIGGER `trg_repositories_groups_overview_insert` AFTER INSERT ON `repositories_groups`
+FOR EACH ROW FOLLOWS `trg_repo_group_insert` BEGIN
+  CALL refresh_group_students_overview(NEW.id_group);
+END$$
+DROP TRIGGER IF EXISTS `trg_repositories_groups_overview_delete`$$
+CREATE TRIGGER `trg_repositories_groups_overview_delete` AFTER DELETE ON `repositories_groups` FOR EACH ROW BEGIN
+  CALL refresh_group_students_overview(OLD.id_group);
+END$$
+
+DELIMITER ;
+
+-- Remplissage initial
+CALL rebuild_student_overview();
@@ -192,12 +192,19 @@ function GroupAnalysis() {
       if (!response.ok) throw new Error(`Erreur serveur: ${response.status}`);
 
       const data = await response.json();
+      const analysisId = parseInt(data.result?.analysisId, 10);
+      if (!analysisId) throw new Error(data.error || 'Analyse non lancée.');
 
-      if (data.result?.data?.status !== 'completed') {
+      // Payload complet de l'analyse, relayé en flux par le backend
+      const dataResponse = await fetch(`http://127.0.0.1:5000/api/analysis/${analysisId}/data`);
+      if (!dataResponse.ok) throw new Error(`Erreur serveur: ${dataResponse.status}`);
+      const analysis = await dataResponse.json();
+
+      if (analysis.data?.status !== 'completed') {
         throw new Error('Aucune donnée de commits disponible.');
       }
 
-      const commitActivity = data.result.data.commit_activity || {};
+      const commitActivity = analysis.data.commit_activity || {};
       const totalCommits = Object.values(commitActivity).reduce(
         (acc, contributors) =>
           acc + Object.values(contributors).reduce((sum, c) => sum + c, 0),
@@ -207,7 +214,7 @@ function GroupAnalysis() {
       setChartsData(prev => ({
         ...prev,
         [repo.id]: {
-          analysisId: parseInt(data.result.data.id, 10),
+          analysisId,
           message: `Nombre de commits : ${totalCommits}`,
         },
       }));